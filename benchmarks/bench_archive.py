@@ -0,0 +1,73 @@
+"""Benchmark of opening a long series from a binary archive against parsing a csv export.
+
+Run with: python benchmarks/bench_archive.py
+"""
+import csv
+import os
+import os.path
+import sys
+import tempfile
+import time
+from array import array
+
+# Benchmark the working tree rather than an installed copy
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir))
+)
+
+from vinterunofficial import TimeSeries, open_archive, write_csv
+
+POINTS = 10_000_000
+CSV_POINTS = 1_000_000
+
+
+def make_series(points):
+    start = 1262304000000
+    return TimeSeries(
+        symbol="btc-usd-p-r",
+        timestamps=array("q", range(start, start + points * 1000, 1000)),
+        values=array("d", (16547.123456 + i * 0.01 for i in range(points))),
+    )
+
+
+def read_csv(filename):
+    """Parses a csv export into a TimeSeries, the way backtests load it today"""
+    timestamps = array("q")
+    values = array("d")
+    with open(filename, newline="") as f:
+        for row in csv.DictReader(f):
+            timestamps.append(int(row["timestamp"]))
+            values.append(float(row["value"]))
+    return TimeSeries(symbol="btc-usd-p-r", timestamps=timestamps, values=values)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        archive = os.path.join(directory, "btc.vts")
+        export = os.path.join(directory, "btc.csv")
+
+        started = time.perf_counter()
+        make_series(POINTS).to_archive(archive)
+        print(f"build + write, {POINTS} points: {time.perf_counter() - started:7.3f} s")
+
+        started = time.perf_counter()
+        series = open_archive(archive)
+        opened = time.perf_counter() - started
+        print(f"open archive,  {POINTS} points: {opened * 1e3:7.3f} ms")
+
+        started = time.perf_counter()
+        sum(series.values)
+        print(f"sum of values, {POINTS} points: {time.perf_counter() - started:7.3f} s")
+
+        write_csv(make_series(CSV_POINTS), export)
+        started = time.perf_counter()
+        read_csv(export)
+        parsed = time.perf_counter() - started
+        print(f"parse csv,     {CSV_POINTS} points: {parsed:7.3f} s")
+
+        # Release the mapping before the directory is removed
+        del series
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Benchmark of the csv export of save_data_to_file against the former row by row DictWriter code,
+and of the size and speed of the json and ndjson exports.
+
+Run with: python benchmarks/bench_export.py
+"""
+import csv
+import os
+import os.path
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Benchmark the working tree rather than an installed copy
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir))
+)
+
+from vinterunofficial import codec, write_csv, write_json, write_ndjson, iter_ndjson
+
+ROWS = 200000
+
+
+def history_rows():
+    for i in range(ROWS):
+        yield {
+            "created_at": "2023-01-01T00:00:00.000Z",
+            "date": "2023-01-01",
+            "symbol": "vnby-bold1-d",
+            "timestamp": 1672531200000 + i * 1000,
+            "value": 16547.123456 + i,
+            "weights": {"btc": 0.6, "eth": 0.4},
+        }
+
+
+def legacy_write_csv(data, filename, seprator=","):
+    """The csv branch of save_data_to_file before the streaming writer"""
+    with open(filename, "a") as f:
+        csv.DictWriter(
+            f, data[0].keys(), delimiter=seprator, lineterminator="\n"
+        ).writeheader()
+
+        for row in data:
+            for key, value in row.items():
+                if isinstance(value, (dict, list)):
+                    row[key] = codec.dumps(value)
+
+            csv.DictWriter(
+                f, row.keys(), delimiter=seprator, lineterminator="\n"
+            ).writerow(row)
+
+
+def measure(name, write):
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "export.csv")
+        started = time.perf_counter()
+        write(filename)
+        elapsed = time.perf_counter() - started
+
+        # Measured on a second run, tracing the allocations slows the export down
+        os.remove(filename)
+        tracemalloc.start()
+        write(filename)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    print(f"{name:22}: {elapsed:6.2f} s  peak {peak / 2**20:7.1f} MiB")
+
+
+def measure_ndjson():
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "export.json")
+        started = time.perf_counter()
+        write_json(list(history_rows()), filename)
+        elapsed = time.perf_counter() - started
+        print(
+            f"{'json (indented)':22}: {elapsed:6.2f} s  {os.path.getsize(filename) / 2**20:7.1f} MiB"
+        )
+
+        names = ["export.ndjson", "export.ndjson.gz"]
+        if sys.modules["vinterunofficial.export"].zstandard is not None:
+            names.append("export.ndjson.zst")
+
+        for name in names:
+            filename = os.path.join(directory, name)
+            started = time.perf_counter()
+            write_ndjson(history_rows(), filename)
+            written = time.perf_counter() - started
+            started = time.perf_counter()
+            for _ in iter_ndjson(filename):
+                pass
+            read = time.perf_counter() - started
+            print(
+                f"{name:22}: {written:6.2f} s  {os.path.getsize(filename) / 2**20:7.1f} MiB"
+                f"  read {read:6.2f} s"
+            )
+
+
+def main():
+    for backend in ["json"] + (["orjson"] if codec.orjson is not None else []):
+        codec.set_json_backend(backend)
+        print(f"{ROWS} rows, {backend} backend")
+        # The former code needs a list, the streaming writer takes the generator as is
+        measure(
+            "DictWriter per row", lambda f: legacy_write_csv(list(history_rows()), f)
+        )
+        measure("write_csv generator", lambda f: write_csv(history_rows(), f))
+        measure_ndjson()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Microbenchmark of building a DataFrame from a history result.
+
+Run with: python benchmarks/bench_frames.py (needs numpy and pandas)
+"""
+import os.path
+import sys
+import timeit
+
+# Benchmark the working tree rather than an installed copy
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir))
+)
+
+import pandas as pd
+from vinterunofficial import TimeSeries, to_pandas
+
+NUMBER = 10
+
+ROWS = [
+    {
+        "symbol": "btc-usd-p-r",
+        "timestamp": 1672531200000 + i * 1000,
+        "value": 16547.123456 + i,
+    }
+    for i in range(200_000)
+]
+
+
+def from_records(rows: list):
+    """The usual conversion of a list of rows"""
+    frame = pd.DataFrame.from_records(rows)
+    frame["timestamp"] = pd.to_datetime(frame["timestamp"], unit="ms", utc=True)
+    return frame.set_index("timestamp")
+
+
+def main():
+    series = TimeSeries.from_rows(ROWS)
+    cases = [
+        ("DataFrame.from_records ", lambda: from_records(ROWS)),
+        ("to_pandas(rows)        ", lambda: to_pandas(ROWS, fields=())),
+        ("TimeSeries.to_pandas() ", lambda: series.to_pandas(fields=())),
+    ]
+    for name, func in cases:
+        seconds = timeit.timeit(func, number=NUMBER)
+        print(f"{name}: {seconds / NUMBER * 1e3:8.2f} ms for {len(ROWS)} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Microbenchmark of the JSON backends of the codec module on a history page and a catalog.
+
+Run with: python benchmarks/bench_json_codec.py
+"""
+import os.path
+import sys
+import timeit
+
+# Benchmark the working tree rather than an installed copy
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir))
+)
+
+from vinterunofficial import codec
+
+NUMBER = 50
+
+HISTORY_PAGE = {
+    "message": "Success",
+    "data": [
+        {
+            "id": i,
+            "created_at": "2023-01-01T00:00:00.000Z",
+            "date": "2023-01-01",
+            "symbol": "btc-usd-p-r",
+            "timestamp": 1672531200000 + i * 1000,
+            "value": 16547.123456 + i,
+        }
+        for i in range(10000)
+    ],
+}
+
+CATALOG = {
+    "message": "Success",
+    "data": [
+        {
+            "symbol": f"vnby-asset{i}-d",
+            "weights": {f"coin{j}": 1 / 20 for j in range(20)},
+            "contrib": {f"coin{j}": 0.01 for j in range(20)},
+            "next_rebalance_date": "2023-08-01T00:00:00.000Z",
+            "previous_rebalance_date": "2023-07-01T00:00:00.000Z",
+        }
+        for i in range(500)
+    ],
+}
+
+
+def main():
+    backends = ["json"] + (["orjson"] if codec.orjson is not None else [])
+    if len(backends) == 1:
+        print("orjson is not installed, only the json backend is measured")
+
+    for name, payload in [("history page", HISTORY_PAGE), ("catalog", CATALOG)]:
+        body = codec.dumps(payload).encode()
+        for backend in backends:
+            codec.set_json_backend(backend)
+            decode = timeit.timeit(lambda: codec.loads(body), number=NUMBER)
+            encode = timeit.timeit(lambda: codec.dumps(payload), number=NUMBER)
+            print(
+                f"{name:12} {backend:6}: loads {decode / NUMBER * 1e3:7.2f} ms"
+                f"  dumps {encode / NUMBER * 1e3:7.2f} ms  ({len(body) // 1024} KiB)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Microbenchmark of url resolution: routing tables vs scanning the AssetUrl enum.
+
+Run with: python benchmarks/bench_url_routing.py
+"""
+import os.path
+import sys
+import timeit
+
+# Benchmark the working tree rather than an installed copy
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir))
+)
+
+from vinterunofficial import VinterUrl
+from vinterunofficial.config import AssetType, AssetUrl, Frequency
+
+NUMBER = 100_000
+
+
+def scan_get_url(asset_type: str, frequency: str) -> str:
+    """The enum scan VinterUrl.get_url used before the routing tables"""
+    [asset_type.value for asset_type in AssetType]
+    for asset_url in AssetUrl:
+        if (
+            asset_url.value["asset_type"].value == asset_type
+            and asset_url.value["frequency"].value == frequency
+        ):
+            return asset_url.value["url"]
+
+
+def scan_validate_frequency(frequency: str) -> None:
+    """The list rebuild VinterValidation.validate_frequency used before the frozensets"""
+    frequencies = [frequency.value for frequency in Frequency]
+    assert frequency in frequencies
+
+
+def scan_get_url_by_symbol(asset_type: str, symbol: str) -> str:
+    frequency = symbol.split("-")[-1]
+    scan_validate_frequency(frequency)
+    return scan_get_url(asset_type, frequency)
+
+
+def main():
+    # NAV daily is near the end of the enum, the worst case for the scan
+    cases = [
+        (
+            "scan     get_url_by_symbol",
+            lambda: scan_get_url_by_symbol("nav", "abc-usd-p-d"),
+        ),
+        (
+            "routing  get_url_by_symbol",
+            lambda: VinterUrl.get_url_by_symbol("nav", "abc-usd-p-d"),
+        ),
+    ]
+    for name, func in cases:
+        seconds = timeit.timeit(func, number=NUMBER)
+        print(f"{name}: {seconds / NUMBER * 1e9:8.0f} ns/call")
+
+
+if __name__ == "__main__":
+    main()
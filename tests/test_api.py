@@ -1,6 +1,8 @@
+import json
+import time
 import pytest
 import httpx
-from vinterunofficial import VinterAPI
+from vinterunofficial import VinterAPI, WindowCache, ActiveCatalog, PersistentCatalogCache, VinterUrl, VinterTime, TimeSeries, RetryPolicy, RateLimiter, build_client
 from unittest.mock import patch, Mock
 
 
@@ -543,10 +545,10 @@ def test_get_data_by_date():
         "params": {},
     }
 
-    expected_output = [{
+    expected_output = {"2021-01-01": {
         "symbol": "waves-usd-p-d",
         "date": "2021-01-01",
-    }]
+    }}
 
     with patch.object(api.httpx_client, "get", new_callable=Mock) as mock_get:
         mock_get.return_value = Mock(json=Mock(return_value=mock_response))
@@ -596,3 +598,528 @@ def test_get_data_by_time_invalid():
         mock_get.return_value = Mock(json=Mock(return_value=mock_response))
         with pytest.raises(ValueError):
             api.get_data_by_time(symbol="waves-usd-p-d", start="2021-01-01")
+
+def test_get_all_active_symbols_uses_cache():
+    api_key = "my_api_key"
+    asset_type = "multi_assets"
+    api = VinterAPI(api_key=api_key, asset_type=asset_type)
+    api.httpx_client = httpx.Client()
+    mock_response = {
+        "result": "success",
+        "message": "Success",
+        "data": [
+            {"symbol": "waves-usd-p-d", "weights": {"mockweight": 0.5}, "next_rebalance_date": "2023-01-01"},
+        ],
+        "params": {},
+    }
+
+    with patch.object(api.httpx_client, "get", new_callable=Mock) as mock_get:
+        mock_get.return_value = Mock(json=Mock(return_value=mock_response))
+        api.get_current_rebalance_weight(symbol="waves-usd-p-d")
+        api.get_next_rebalance_date(symbol="waves-usd-p-d")
+        assert mock_get.call_count == 1
+        assert api.cache_info()["hits"] == 1
+        assert api.cache_info()["misses"] == 1
+
+        api.invalidate_cache()
+        api.get_next_rebalance_date(symbol="waves-usd-p-d")
+        assert mock_get.call_count == 2
+
+def test_get_all_active_symbols_cache_disabled():
+    api_key = "my_api_key"
+    asset_type = "multi_assets"
+    api = VinterAPI(api_key=api_key, asset_type=asset_type, cache_ttl=0)
+    api.httpx_client = httpx.Client()
+    mock_response = {
+        "result": "success",
+        "message": "Success",
+        "data": [
+            {"symbol": "waves-usd-p-d", "contrib": ["waves-usd-p-r"]},
+        ],
+        "params": {},
+    }
+
+    with patch.object(api.httpx_client, "get", new_callable=Mock) as mock_get:
+        mock_get.return_value = Mock(json=Mock(return_value=mock_response))
+        api.get_all_active_symbols()
+        api.get_all_active_symbols()
+        assert mock_get.call_count == 2
+
+def test_filter_by_symbol_with_catalog():
+    """
+    Test that _filter_by_symbol looks up an ActiveCatalog by its index
+    """
+    api_key = "my_api_key"
+    asset_type = "multi_assets"
+    api = VinterAPI(api_key=api_key, asset_type=asset_type)
+    mock_data = ActiveCatalog([
+        {"symbol": "waves-usd-p-d", "contrib": ["waves-usd-p-r"]},
+        {"symbol": "ton-usdt-p-5-d", "contrib": ["ton-usdt-p-r"]},
+    ])
+    assert api._filter_by_symbol(mock_data, "waves-usd-p-d") == [
+        {"symbol": "waves-usd-p-d", "contrib": ["waves-usd-p-r"]},
+    ]
+    assert api._filter_by_symbol(mock_data, "btc-usd-p-d") == []
+
+def test_get_index_metadata():
+    api_key = "my_api_key"
+    asset_type = "multi_assets"
+    api = VinterAPI(api_key=api_key, asset_type=asset_type)
+    api.httpx_client = httpx.Client()
+    mock_response = {
+        "result": "success",
+        "message": "Success",
+        "data": [
+            {"symbol": "waves-usd-p-d", "weights": {"mockweight": 0.5}, "next_rebalance_date": "2023-01-01"},
+            {"symbol": "ton-usdt-p-5-d", "weights": {"mockweight": 1.0}, "previous_review_date": "2022-12-01"},
+        ],
+        "params": {},
+    }
+
+    with patch.object(api.httpx_client, "get", new_callable=Mock) as mock_get:
+        mock_get.return_value = Mock(json=Mock(return_value=mock_response))
+        result = api.get_index_metadata(["waves-usd-p-d", "ton-usdt-p-5-d"])
+        assert mock_get.call_count == 1
+        assert result["waves-usd-p-d"]["weights"] == {"mockweight": 0.5}
+        assert result["waves-usd-p-d"]["next_rebalance_date"] == "2023-01-01"
+        assert result["waves-usd-p-d"]["next_review_date"] is None
+        assert result["ton-usdt-p-5-d"]["previous_review_date"] == "2022-12-01"
+        assert set(result["ton-usdt-p-5-d"].keys()) == {
+            "weights",
+            "next_rebalance_weights",
+            "previous_rebalance_date",
+            "next_rebalance_date",
+            "previous_review_date",
+            "next_review_date",
+            "contrib",
+        }
+
+def test_get_index_metadata_invalid():
+    api_key = "my_api_key"
+    asset_type = "multi_assets"
+    api = VinterAPI(api_key=api_key, asset_type=asset_type)
+    api.httpx_client = httpx.Client()
+    mock_response = {
+        "result": "success",
+        "message": "Success",
+        "data": [
+            {"symbol": "waves-usd-p-d", "weights": {"mockweight": 0.5}},
+        ],
+        "params": {},
+    }
+
+    with patch.object(api.httpx_client, "get", new_callable=Mock) as mock_get:
+        mock_get.return_value = Mock(json=Mock(return_value=mock_response))
+        with pytest.raises(ValueError):
+            api.get_index_metadata(["waves-usd-p-d", "ton-usdt-p-5-d"])
+
+def test_get_latest_data_revalidates():
+    api_key = "my_api_key"
+    asset_type = "single_assets"
+    api = VinterAPI(api_key=api_key, asset_type=asset_type, revalidate=True)
+    api.httpx_client = httpx.Client()
+    mock_response = {
+        "result": "success",
+        "message": "Success",
+        "data": [{"symbol": "btc-usd-p-r", "timestamp": 1647724800, "value": 1000}],
+        "params": {"symbol": "btc-usd-p-r", "limit": 1},
+    }
+    first = Mock(status_code=200, headers={"ETag": '"abc"'}, json=Mock(return_value=mock_response))
+    not_modified = Mock(status_code=304, headers={}, json=Mock(side_effect=AssertionError))
+
+    with patch.object(api.httpx_client, "get", new_callable=Mock) as mock_get:
+        mock_get.side_effect = [first, not_modified]
+        assert api.get_latest_data("btc-usd-p-r") == mock_response["data"]
+        assert api.get_latest_data("btc-usd-p-r") == mock_response["data"]
+        assert mock_get.call_args_list[0].kwargs["headers"].get("If-None-Match") is None
+        assert mock_get.call_args_list[1].kwargs["headers"]["If-None-Match"] == '"abc"'
+        assert api.revalidation_cache.revalidated == 1
+
+def test_get_all_active_symbols_persistent_cache(tmp_path):
+    api_key = "my_api_key"
+    asset_type = "multi_assets"
+    path = str(tmp_path / "catalog.db")
+    mock_response = {
+        "result": "success",
+        "message": "Success",
+        "data": [
+            {"symbol": "waves-usd-p-d", "contrib": ["waves-usd-p-r"]},
+        ],
+        "params": {},
+    }
+
+    api = VinterAPI(api_key=api_key, asset_type=asset_type, persistent_cache=path)
+    api.httpx_client = httpx.Client()
+    with patch.object(api.httpx_client, "get", new_callable=Mock) as mock_get:
+        mock_get.return_value = Mock(json=Mock(return_value=mock_response))
+        assert api.get_all_active_symbols() == mock_response["data"]
+        assert mock_get.call_count == 1
+
+    # Another worker on the same host reads the catalog from disk
+    other = VinterAPI(api_key=api_key, asset_type=asset_type, persistent_cache=path)
+    other.httpx_client = httpx.Client()
+    with patch.object(other.httpx_client, "get", new_callable=Mock) as mock_get:
+        assert other.get_all_active_symbols() == mock_response["data"]
+        assert mock_get.call_count == 0
+
+def test_get_all_active_symbols_persistent_cache_stale(tmp_path):
+    api_key = "my_api_key"
+    asset_type = "multi_assets"
+    stale_cache = PersistentCatalogCache(str(tmp_path / "catalog.db"), ttl=0, stale_ttl=60)
+    stale_cache.set(VinterUrl.get_active_url(asset_type), [{"symbol": "old-usd-p-d"}])
+    mock_response = {
+        "result": "success",
+        "message": "Success",
+        "data": [{"symbol": "new-usd-p-d"}],
+        "params": {},
+    }
+
+    api = VinterAPI(api_key=api_key, asset_type=asset_type, persistent_cache=stale_cache)
+    api.httpx_client = httpx.Client()
+    with patch.object(api.httpx_client, "get", new_callable=Mock) as mock_get:
+        mock_get.return_value = Mock(json=Mock(return_value=mock_response))
+        # The stale catalog is served right away
+        assert api.get_all_active_symbols(symbol_only=True) == ["old-usd-p-d"]
+
+        for _ in range(100):
+            if api.cache_info()["size"] == 1 and api._get_active_catalog().get("new-usd-p-d"):
+                break
+            time.sleep(0.01)
+
+        assert mock_get.call_count == 1
+        assert api.get_all_active_symbols(symbol_only=True) == ["new-usd-p-d"]
+
+def mock_paged_get(rows):
+    """Returns a get that serves rows from start_time on, at most limit per call"""
+    def get(url, params=None, headers=None):
+        start = VinterTime.to_timestamp_ms(params["start_time"])
+        page = [row for row in rows if row["timestamp"] >= start][: params["limit"]]
+        return Mock(json=Mock(return_value={"data": page}))
+    return get
+
+def test_iter_data_by_time_walks_pages():
+    api_key = "my_api_key"
+    asset_type = "multi_assets"
+    api = VinterAPI(api_key=api_key, asset_type=asset_type)
+    api.httpx_client = httpx.Client()
+    start = VinterTime.to_timestamp_ms("2021-01-01")
+    rows = [
+        {"symbol": "waves-usd-p-h", "timestamp": start + hour * 3600000, "value": hour}
+        for hour in range(25)
+    ]
+
+    with patch.object(api.httpx_client, "get", new_callable=Mock) as mock_get:
+        mock_get.side_effect = mock_paged_get(rows)
+        result = list(api.iter_data_by_time("waves-usd-p-h", start="2021-01-01", limit=10))
+        assert result == rows
+        assert mock_get.call_count == 3
+        assert mock_get.call_args_list[1].kwargs["params"]["start_time"] == "2021-01-01T09:00:00.000Z"
+
+def test_get_data_by_time_paginate():
+    api_key = "my_api_key"
+    asset_type = "multi_assets"
+    api = VinterAPI(api_key=api_key, asset_type=asset_type)
+    api.httpx_client = httpx.Client()
+    start = VinterTime.to_timestamp_ms("2021-01-01")
+    rows = [
+        {"symbol": "waves-usd-p-d", "timestamp": start + day * 86400000, "value": day}
+        for day in range(20)
+    ]
+
+    with patch.object(api.httpx_client, "get", new_callable=Mock) as mock_get:
+        mock_get.side_effect = mock_paged_get(rows)
+        assert len(api.get_data_by_time("waves-usd-p-d", start="2021-01-01", limit=10)) == 10
+        assert api.get_data_by_time("waves-usd-p-d", start="2021-01-01", limit=10, paginate=True) == rows
+
+def test_get_data_by_time_parallel_splits_windows():
+    api_key = "my_api_key"
+    asset_type = "multi_assets"
+    api = VinterAPI(api_key=api_key, asset_type=asset_type)
+    api.httpx_client = httpx.Client()
+    start = VinterTime.to_timestamp_ms("2021-01-01")
+    rows = [
+        {"symbol": "waves-usd-p-d", "timestamp": start + day * 86400000, "value": day}
+        for day in range(30)
+    ]
+
+    def get(url, params=None, headers=None):
+        window_start = VinterTime.to_timestamp_ms(params["start_time"])
+        window_end = VinterTime.to_timestamp_ms(params["end_time"])
+        page = [row for row in rows if window_start <= row["timestamp"] <= window_end]
+        return Mock(json=Mock(return_value={"data": page[: params["limit"]]}))
+
+    with patch.object(api.httpx_client, "get", new_callable=Mock) as mock_get:
+        mock_get.side_effect = get
+        result = api.get_data_by_time_parallel(
+            "waves-usd-p-d", start="2021-01-01", end="2021-01-31", limit=8, max_workers=3
+        )
+        assert result == rows
+        assert mock_get.call_count == 5
+
+def test_get_latest_values_reports_errors():
+    api_key = "my_api_key"
+    asset_type = "single_assets"
+    api = VinterAPI(api_key=api_key, asset_type=asset_type)
+    api.httpx_client = httpx.Client()
+
+    def get(url, params=None, headers=None):
+        data = [] if params["symbol"] == "eth-usd-p-r" else [{"symbol": params["symbol"], "value": 1000}]
+        return Mock(json=Mock(return_value={"data": data}))
+
+    with patch.object(api.httpx_client, "get", new_callable=Mock) as mock_get:
+        mock_get.side_effect = get
+        result = api.get_latest_values(["btc-usd-p-r", "eth-usd-p-r", "bad-symbol", "ada-usd-p-d", "btc-usd-p-r"])
+        assert result == {"btc-usd-p-r": 1000, "ada-usd-p-d": 1000}
+        assert list(result.keys()) == ["btc-usd-p-r", "ada-usd-p-d"]
+        assert set(result.errors.keys()) == {"eth-usd-p-r", "bad-symbol"}
+        assert isinstance(result.errors["eth-usd-p-r"], ValueError)
+        assert result.ok is False
+        assert mock_get.call_count == 3
+
+def test_context_manager_closes_owned_client():
+    ''' This function tests that leaving the with block closes the client the instance created
+    
+    '''
+    with VinterAPI(api_key="test_key", asset_type="multi_assets") as api:
+        assert not api.httpx_client.is_closed
+    assert api.httpx_client.is_closed
+
+def test_shared_client_is_not_closed():
+    ''' This function tests that a client passed in is shared and left open
+    
+    '''
+    client = build_client()
+    with VinterAPI(api_key="test_key", asset_type="multi_assets", httpx_client=client) as multi:
+        single = VinterAPI(api_key="test_key", asset_type="single_assets", httpx_client=client)
+        assert multi.httpx_client is single.httpx_client
+    assert not client.is_closed
+    client.close()
+
+def test_retry_transient_errors():
+    ''' This function tests that a 503 and a connection error are retried before the request succeeds
+    
+    '''
+    api = VinterAPI(api_key="test_key", asset_type="single_assets", retry=RetryPolicy(backoff=0))
+    request = httpx.Request("GET", "https://example.com")
+    responses = [
+        httpx.Response(503, request=request),
+        httpx.ConnectError("boom"),
+        httpx.Response(200, json={"data": [{"value": 1000}]}, request=request),
+    ]
+    with patch.object(api.httpx_client, "get", side_effect=responses) as mock_get:
+        assert api.get_latest_value("btc-usd-p-r") == 1000
+        assert mock_get.call_count == 3
+    assert api.retry.retries == 2
+
+def test_retry_gives_up_after_max_attempts():
+    ''' This function tests that the last error is raised once the attempts are spent
+    
+    '''
+    api = VinterAPI(api_key="test_key", asset_type="single_assets", retry=RetryPolicy(max_attempts=2, backoff=0))
+    request = httpx.Request("GET", "https://example.com")
+    with patch.object(api.httpx_client, "get", return_value=httpx.Response(500, request=request)) as mock_get:
+        with pytest.raises(httpx.HTTPStatusError):
+            api.get_latest_value("btc-usd-p-r")
+        assert mock_get.call_count == 2
+
+def test_rate_limiter_is_shared_between_instances():
+    ''' This function tests that every request of every instance waits for the shared limiter
+    
+    '''
+    limiter = RateLimiter(rate=1000, burst=10)
+    multi = VinterAPI(api_key="test_key", asset_type="multi_assets", rate_limiter=limiter)
+    single = VinterAPI(api_key="test_key", asset_type="single_assets", rate_limiter=limiter)
+    with patch.object(limiter, "acquire") as mock_acquire:
+        for api in (multi, single):
+            with patch.object(api.httpx_client, "get", return_value=Mock(json=Mock(return_value={"data": [{"value": 1}]}))):
+                api.get_latest_value("btc-usd-p-r")
+        assert mock_acquire.call_count == 2
+
+def test_iter_data_by_time_stream():
+    ''' This function tests that streamed pages are decoded from the body chunks and paginated
+    
+    '''
+    pages = [
+        [{"timestamp": 1672531200000 + 1000 * i, "value": i} for i in range(3)],
+        [{"timestamp": 1672531200000 + 1000 * i, "value": i} for i in range(2, 4)],
+    ]
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        body = json.dumps({"data": pages[len(requests) - 1]}).encode()
+        return httpx.Response(200, content=iter([body[i:i + 7] for i in range(0, len(body), 7)]))
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    with VinterAPI(api_key="test_key", asset_type="single_assets", httpx_client=client) as api:
+        rows = list(api.iter_data_by_time("btc-usd-p-d", start="2023-01-01T00:00:00Z", limit=3, stream=True))
+    assert [row["value"] for row in rows] == [0, 1, 2, 3]
+    assert len(requests) == 2
+    assert requests[1].url.params["start_time"] == "2023-01-01T00:00:02.000Z"
+    client.close()
+
+def test_stream_retries_before_first_row():
+    ''' This function tests that a streamed page is retried when the response status is transient
+    
+    '''
+    statuses = [503, 200]
+
+    def handler(request):
+        status = statuses.pop(0)
+        return httpx.Response(status, json={"data": [{"timestamp": 0, "value": 1}]} if status == 200 else {})
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    api = VinterAPI(api_key="test_key", asset_type="single_assets", httpx_client=client, retry=RetryPolicy(backoff=0))
+    rows = list(api.iter_data_by_time("btc-usd-p-d", start="1970-01-01T00:00:00Z", stream=True))
+    assert rows == [{"timestamp": 0, "value": 1}]
+    assert api.retry.retries == 1
+    client.close()
+
+def test_get_data_by_time_as_series():
+    ''' This function tests that history can be returned as a TimeSeries
+    
+    '''
+    api = VinterAPI(api_key="test_key", asset_type="single_assets")
+    rows = [{"symbol": "btc-usd-p-d", "timestamp": 1672531200000 + day * 86400000, "value": day} for day in range(3)]
+    with patch.object(api.httpx_client, "get", return_value=Mock(json=Mock(return_value={"data": rows}))):
+        series = api.get_data_by_time("btc-usd-p-d", start="2023-01-01T00:00:00Z", as_series=True)
+        assert isinstance(series, TimeSeries)
+        assert list(series.values) == [0.0, 1.0, 2.0]
+        series = api.get_data_by_date("btc-usd-p-d", ["2023-01-01", "2023-01-03"], as_series=True)
+        assert series.symbol == "btc-usd-p-d"
+
+def test_sync_fetches_only_gaps(tmp_path):
+    ''' This function tests that sync only requests the parts of a period missing from the store
+    
+    '''
+    api = VinterAPI(api_key="test_key", asset_type="single_assets", history_store=str(tmp_path / "history.db"))
+    start = VinterTime.to_timestamp_ms("2021-01-01")
+    rows = [{"symbol": "btc-usd-p-d", "timestamp": start + day * 86400000, "value": day} for day in range(10)]
+
+    with patch.object(api.httpx_client, "get", new_callable=Mock) as mock_get:
+        mock_get.side_effect = mock_paged_get(rows)
+        assert api.sync("btc-usd-p-d", start="2021-01-01", end="2021-01-06") == rows[:5]
+        assert mock_get.call_count == 1
+
+        mock_get.reset_mock()
+        assert api.sync("btc-usd-p-d", start="2021-01-04", end="2021-01-09") == rows[3:8]
+        assert mock_get.call_count == 1
+        assert mock_get.call_args.kwargs["params"]["start_time"] == "2021-01-06T00:00:00.000Z"
+
+        mock_get.reset_mock()
+        series = api.sync("btc-usd-p-d", start="2021-01-01", end="2021-01-09", as_series=True)
+        assert list(series.values) == [float(day) for day in range(8)]
+        assert mock_get.call_count == 0
+
+def test_sync_requires_store():
+    ''' This function tests that sync needs a history store
+    
+    '''
+    api = VinterAPI(api_key="test_key", asset_type="single_assets")
+    with pytest.raises(ValueError):
+        api.sync("btc-usd-p-d", start="2021-01-01")
+
+def test_get_data_by_time_window_cache():
+    ''' This function tests that overlapping paginated queries only request the uncovered part
+    
+    '''
+    api = VinterAPI(api_key="test_key", asset_type="single_assets", window_cache=WindowCache())
+    start = VinterTime.to_timestamp_ms("2021-01-01")
+    rows = [{"symbol": "btc-usd-p-d", "timestamp": start + day * 86400000, "value": day} for day in range(10)]
+
+    with patch.object(api.httpx_client, "get", new_callable=Mock) as mock_get:
+        mock_get.side_effect = mock_paged_get(rows)
+        assert api.get_data_by_time("btc-usd-p-d", start="2021-01-01", end="2021-01-05", paginate=True) == rows[:5]
+        assert mock_get.call_count == 1
+
+        mock_get.reset_mock()
+        assert api.get_data_by_time("btc-usd-p-d", start="2021-01-03", end="2021-01-08", paginate=True) == rows[2:8]
+        assert mock_get.call_count == 1
+        assert mock_get.call_args.kwargs["params"]["start_time"] == "2021-01-05T00:00:00.001Z"
+
+        mock_get.reset_mock()
+        assert api.get_data_by_time("btc-usd-p-d", start="2021-01-02", end="2021-01-06", paginate=True) == rows[1:6]
+        assert mock_get.call_count == 0
+
+def test_get_data_by_date_fetches_sparse_ranges():
+    ''' This function tests that dates far apart are fetched as separate small ranges and only the
+    requested dates are returned, sorted and deduplicated
+    
+    '''
+    api = VinterAPI(api_key="test_key", asset_type="single_assets")
+    start = VinterTime.to_timestamp_ms("2017-01-01")
+    rows = [{"symbol": "btc-usd-p-d", "timestamp": start + day * 86400000, "value": day} for day in range(2300)]
+
+    def get(url, params=None, headers=None):
+        first = VinterTime.to_timestamp_ms(params["start_time"])
+        last = VinterTime.to_timestamp_ms(params["end_time"])
+        page = [row for row in rows if first <= row["timestamp"] <= last][: params["limit"]]
+        return Mock(json=Mock(return_value={"data": page}))
+
+    with patch.object(api.httpx_client, "get", side_effect=get) as mock_get:
+        result = api.get_data_by_date("btc-usd-p-d", ["2023-03-02", "2017-01-01", "2023-03-01", "2017-01-01"])
+        assert list(result) == ["2017-01-01", "2023-03-01", "2023-03-02"]
+        assert result["2023-03-02"]["timestamp"] == VinterTime.to_timestamp_ms("2023-03-02")
+        assert mock_get.call_count == 2
+        windows = sorted((call.kwargs["params"]["start_time"], call.kwargs["params"]["end_time"]) for call in mock_get.call_args_list)
+        assert windows == [("2017-01-01", "2017-01-02"), ("2023-03-01", "2023-03-03")]
+
+def test_get_data_by_time_parallel_matches_sequential():
+    ''' This function tests that the parallel fetch returns the same rows as get_data_by_time, the row
+    at the inclusive end included
+    
+    '''
+    start = VinterTime.to_timestamp_ms("2021-01-01")
+    rows = [{"symbol": "waves-usd-p-d", "timestamp": start + day * 86400000, "value": day} for day in range(10)]
+
+    def handler(request):
+        window_start = VinterTime.to_timestamp_ms(request.url.params["start_time"])
+        window_end = VinterTime.to_timestamp_ms(request.url.params["end_time"])
+        page = [row for row in rows if window_start <= row["timestamp"] <= window_end]
+        return httpx.Response(200, json={"data": page[: int(request.url.params["limit"])]})
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    api = VinterAPI(api_key="test_key", asset_type="single_assets", httpx_client=client)
+    sequential = api.get_data_by_time("waves-usd-p-d", start="2021-01-01", end="2021-01-05")
+    parallel = api.get_data_by_time_parallel("waves-usd-p-d", start="2021-01-01", end="2021-01-05", limit=2)
+    assert parallel == sequential == rows[:5]
+    client.close()
+
+def test_get_data_by_date_datetime_date_field():
+    ''' This function tests that rows whose date field is a datetime string are keyed by their day
+    
+    '''
+    start = VinterTime.to_timestamp_ms("2023-03-05")
+    rows = [
+        {"symbol": "btc-usd-p-d", "date": VinterTime.format_timestamp(start + day * 86400000), "timestamp": start + day * 86400000, "value": day}
+        for day in range(3)
+    ]
+
+    def handler(request):
+        first = VinterTime.to_timestamp_ms(request.url.params["start_time"])
+        last = VinterTime.to_timestamp_ms(request.url.params["end_time"])
+        return httpx.Response(200, json={"data": [row for row in rows if first <= row["timestamp"] <= last]})
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    api = VinterAPI(api_key="test_key", asset_type="single_assets", httpx_client=client)
+    result = api.get_data_by_date("btc-usd-p-d", ["2023-03-06"])
+    assert result == {"2023-03-06": rows[1]}
+    assert rows[1]["date"] == "2023-03-06T00:00:00.000Z"
+    client.close()
+
+def test_revalidated_data_is_not_shared_with_the_caller():
+    ''' This function tests that emptying the result of a revalidated request doesn't empty the kept body
+    
+    '''
+    api = VinterAPI(api_key="test_key", asset_type="single_assets", revalidate=True)
+    mock_response = {"data": [{"symbol": "btc-usd-p-r", "timestamp": 1647724800000, "value": 1000}]}
+    first = Mock(status_code=200, headers={"ETag": '"abc"'}, json=Mock(return_value=mock_response))
+    not_modified = Mock(status_code=304, headers={}, json=Mock(side_effect=AssertionError))
+
+    with patch.object(api.httpx_client, "get", new_callable=Mock) as mock_get:
+        mock_get.side_effect = [first, not_modified, not_modified]
+        api.get_latest_data("btc-usd-p-r").clear()
+        data = api.get_latest_data("btc-usd-p-r")
+        assert data == [{"symbol": "btc-usd-p-r", "timestamp": 1647724800000, "value": 1000}]
+        data.clear()
+        assert len(api.get_latest_data("btc-usd-p-r")) == 1
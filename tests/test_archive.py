@@ -0,0 +1,61 @@
+import math
+import pytest
+from vinterunofficial import TimeSeries, write_archive, open_archive
+
+def make_rows(count):
+    return [{"symbol": "btc-usd-p-d", "timestamp": 1672531200000 + day * 86400000, "value": day * 1.5, "date": "2023-01-01"} for day in range(count)]
+
+def test_archive_round_trip(tmp_path):
+    ''' This function tests that an archive opens as a series with the saved symbol, timestamps and values
+    
+    '''
+    series = TimeSeries.from_rows(make_rows(100))
+    filename = tmp_path / "btc.vts"
+
+    assert series.to_archive(filename) == 100
+    archived = open_archive(filename)
+
+    assert isinstance(archived.timestamps, memoryview)
+    assert archived.symbol == "btc-usd-p-d"
+    assert archived == TimeSeries(symbol=series.symbol, timestamps=series.timestamps, values=series.values)
+    assert archived[-1] == {"timestamp": series.timestamps[-1], "value": 148.5, "symbol": "btc-usd-p-d"}
+    assert list(archived[10:12].values) == [15.0, 16.5]
+
+def test_archive_from_rows_keeps_missing_values(tmp_path):
+    ''' This function tests that rows can be archived directly and that missing values stay nan
+    
+    '''
+    rows = make_rows(3)
+    rows[1]["value"] = None
+    write_archive(iter(rows), tmp_path / "btc.vts")
+    archived = open_archive(tmp_path / "btc.vts")
+    assert len(archived) == 3
+    assert math.isnan(archived.values[1])
+
+def test_archive_to_numpy_shares_the_mapping(tmp_path):
+    ''' This function tests that the numpy arrays of an archive are read-only views of the file
+    
+    '''
+    np = pytest.importorskip("numpy")
+    TimeSeries.from_rows(make_rows(10)).to_archive(tmp_path / "btc.vts")
+
+    timestamps, values = open_archive(tmp_path / "btc.vts").to_numpy()
+    assert timestamps[0] == np.datetime64("2023-01-01", "ms")
+    assert not values.flags.writeable
+    memmap = np.memmap(tmp_path / "btc.vts", dtype="<f8", mode="r", offset=64 + 8 * 10)
+    assert (memmap == values).all()
+
+def test_open_archive_invalid(tmp_path):
+    ''' This function tests that files that are not complete archives are rejected
+    
+    '''
+    filename = tmp_path / "data.csv"
+    filename.write_bytes(b"date,value\n" * 10)
+    with pytest.raises(ValueError):
+        open_archive(filename)
+
+    TimeSeries.from_rows(make_rows(10)).to_archive(tmp_path / "btc.vts")
+    data = (tmp_path / "btc.vts").read_bytes()
+    (tmp_path / "btc.vts").write_bytes(data[:-8])
+    with pytest.raises(ValueError):
+        open_archive(tmp_path / "btc.vts")
@@ -1,6 +1,9 @@
+import json
+import time
+import asyncio
 import pytest
 import httpx
-from vinterunofficial import VinterAPIAsync
+from vinterunofficial import VinterAPIAsync, PersistentCatalogCache, VinterUrl, VinterTime, RetryPolicy, build_async_client
 from unittest.mock import AsyncMock, patch, Mock
 
 
@@ -574,10 +577,10 @@ async def test_get_data_by_date():
         "params": {},
     }
 
-    expected_output = [{
+    expected_output = {"2021-01-01": {
         "symbol": "waves-usd-p-d",
         "date": "2021-01-01",
-    }]
+    }}
 
     with patch.object(api.httpx_client, "get", new_callable=AsyncMock) as mock_get:
         mock_get.return_value = AsyncMock(json=Mock(return_value=mock_response))
@@ -629,3 +632,466 @@ async def test_get_data_by_time_invalid():
         mock_get.return_value = AsyncMock(json=Mock(return_value=mock_response))
         with pytest.raises(ValueError):
             await api.get_data_by_time(symbol="waves-usd-p-d", start="2021-01-01")
+
+@pytest.mark.asyncio
+async def test_get_all_active_symbols_uses_cache():
+    api_key = "my_api_key"
+    asset_type = "multi_assets"
+    api = VinterAPIAsync(api_key=api_key, asset_type=asset_type)
+    api.httpx_client = httpx.AsyncClient()
+    mock_response = {
+        "result": "success",
+        "message": "Success",
+        "data": [
+            {"symbol": "waves-usd-p-d", "weights": {"mockweight": 0.5}, "next_rebalance_date": "2023-01-01"},
+        ],
+        "params": {},
+    }
+
+    with patch.object(api.httpx_client, "get", new_callable=AsyncMock) as mock_get:
+        mock_get.return_value = Mock(json=Mock(return_value=mock_response))
+        await api.get_current_rebalance_weight(symbol="waves-usd-p-d")
+        await api.get_next_rebalance_date(symbol="waves-usd-p-d")
+        assert mock_get.call_count == 1
+        assert api.cache_info()["hits"] == 1
+        assert api.cache_info()["misses"] == 1
+
+        await api.invalidate_cache()
+        await api.get_next_rebalance_date(symbol="waves-usd-p-d")
+        assert mock_get.call_count == 2
+    await api.httpx_client.aclose()
+
+@pytest.mark.asyncio
+async def test_get_index_metadata():
+    api_key = "my_api_key"
+    asset_type = "multi_assets"
+    api = VinterAPIAsync(api_key=api_key, asset_type=asset_type)
+    api.httpx_client = httpx.AsyncClient()
+    mock_response = {
+        "result": "success",
+        "message": "Success",
+        "data": [
+            {"symbol": "waves-usd-p-d", "weights": {"mockweight": 0.5}, "next_rebalance_date": "2023-01-01"},
+            {"symbol": "ton-usdt-p-5-d", "weights": {"mockweight": 1.0}},
+        ],
+        "params": {},
+    }
+
+    with patch.object(api.httpx_client, "get", new_callable=AsyncMock) as mock_get:
+        mock_get.return_value = Mock(json=Mock(return_value=mock_response))
+        result = await api.get_index_metadata(["waves-usd-p-d", "ton-usdt-p-5-d"])
+        assert mock_get.call_count == 1
+        assert result["waves-usd-p-d"]["next_rebalance_date"] == "2023-01-01"
+        assert result["ton-usdt-p-5-d"]["weights"] == {"mockweight": 1.0}
+        with pytest.raises(ValueError):
+            await api.get_index_metadata("btc-usd-p-d")
+    await api.httpx_client.aclose()
+
+@pytest.mark.asyncio
+async def test_get_latest_data_revalidates():
+    api_key = "my_api_key"
+    asset_type = "single_assets"
+    api = VinterAPIAsync(api_key=api_key, asset_type=asset_type, revalidate=True)
+    api.httpx_client = httpx.AsyncClient()
+    mock_response = {
+        "result": "success",
+        "message": "Success",
+        "data": [{"symbol": "btc-usd-p-r", "timestamp": 1647724800, "value": 1000}],
+        "params": {"symbol": "btc-usd-p-r", "limit": 1},
+    }
+    first = Mock(status_code=200, headers={"Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"}, json=Mock(return_value=mock_response))
+    not_modified = Mock(status_code=304, headers={}, json=Mock(side_effect=AssertionError))
+
+    with patch.object(api.httpx_client, "get", new_callable=AsyncMock) as mock_get:
+        mock_get.side_effect = [first, not_modified]
+        assert await api.get_latest_data("btc-usd-p-r") == mock_response["data"]
+        assert await api.get_latest_data("btc-usd-p-r") == mock_response["data"]
+        assert mock_get.call_args_list[1].kwargs["headers"]["If-Modified-Since"] == "Wed, 21 Oct 2015 07:28:00 GMT"
+    await api.httpx_client.aclose()
+
+@pytest.mark.asyncio
+async def test_identical_requests_are_coalesced():
+    api_key = "my_api_key"
+    asset_type = "single_assets"
+    api = VinterAPIAsync(api_key=api_key, asset_type=asset_type)
+    api.httpx_client = httpx.AsyncClient()
+    mock_response = {
+        "result": "success",
+        "message": "Success",
+        "data": [{"symbol": "btc-usd-p-r", "timestamp": 1647724800, "value": 1000}],
+        "params": {"symbol": "btc-usd-p-r", "limit": 1},
+    }
+
+    async def slow_get(*args, **kwargs):
+        await asyncio.sleep(0.01)
+        return Mock(json=Mock(return_value=mock_response))
+
+    with patch.object(api.httpx_client, "get", new_callable=AsyncMock) as mock_get:
+        mock_get.side_effect = slow_get
+        results = await asyncio.gather(
+            *[api.get_latest_value("btc-usd-p-r") for _ in range(5)]
+        )
+        assert results == [1000] * 5
+        assert mock_get.call_count == 1
+        assert api.single_flight.coalesced == 4
+
+        # Nothing is in flight anymore so the next request goes out again
+        await api.get_latest_value("btc-usd-p-r")
+        assert mock_get.call_count == 2
+    await api.httpx_client.aclose()
+
+@pytest.mark.asyncio
+async def test_coalesced_requests_get_their_own_rows():
+    api_key = "my_api_key"
+    asset_type = "single_assets"
+    api = VinterAPIAsync(api_key=api_key, asset_type=asset_type)
+    api.httpx_client = httpx.AsyncClient()
+    mock_response = {
+        "result": "success",
+        "message": "Success",
+        "data": [{"symbol": "btc-usd-p-r", "timestamp": 1672531200000, "value": 1000}],
+        "params": {"symbol": "btc-usd-p-r", "limit": 1},
+    }
+
+    async def slow_get(*args, **kwargs):
+        await asyncio.sleep(0.01)
+        return Mock(json=Mock(return_value=mock_response))
+
+    with patch.object(api.httpx_client, "get", new_callable=AsyncMock) as mock_get:
+        mock_get.side_effect = slow_get
+        results = await asyncio.gather(
+            *[api.get_latest_data("btc-usd-p-r") for _ in range(3)]
+        )
+        assert mock_get.call_count == 1
+        assert results[0] is not results[1]
+
+        # Changing the rows of one caller leaves the others intact
+        results[0].clear()
+        assert results[1] == mock_response["data"]
+        assert results[2] == mock_response["data"]
+    await api.httpx_client.aclose()
+
+@pytest.mark.asyncio
+async def test_coalesced_requests_share_errors():
+    api_key = "my_api_key"
+    asset_type = "single_assets"
+    api = VinterAPIAsync(api_key=api_key, asset_type=asset_type)
+    api.httpx_client = httpx.AsyncClient()
+
+    async def failing_get(*args, **kwargs):
+        await asyncio.sleep(0.01)
+        raise httpx.ConnectError("boom")
+
+    with patch.object(api.httpx_client, "get", new_callable=AsyncMock) as mock_get:
+        mock_get.side_effect = failing_get
+        results = await asyncio.gather(
+            *[api.get_latest_value("btc-usd-p-r") for _ in range(3)],
+            return_exceptions=True,
+        )
+        assert all(isinstance(result, httpx.ConnectError) for result in results)
+        assert mock_get.call_count == 1
+    await api.httpx_client.aclose()
+
+@pytest.mark.asyncio
+async def test_get_all_active_symbols_persistent_cache_stale(tmp_path):
+    api_key = "my_api_key"
+    asset_type = "multi_assets"
+    stale_cache = PersistentCatalogCache(str(tmp_path / "catalog.db"), ttl=0, stale_ttl=60)
+    stale_cache.set(VinterUrl.get_active_url(asset_type), [{"symbol": "old-usd-p-d"}])
+    mock_response = {
+        "result": "success",
+        "message": "Success",
+        "data": [{"symbol": "new-usd-p-d"}],
+        "params": {},
+    }
+
+    api = VinterAPIAsync(api_key=api_key, asset_type=asset_type, persistent_cache=stale_cache)
+    api.httpx_client = httpx.AsyncClient()
+    with patch.object(api.httpx_client, "get", new_callable=AsyncMock) as mock_get:
+        mock_get.return_value = Mock(json=Mock(return_value=mock_response))
+        # The stale catalog is served right away and refreshed in the background
+        assert await api.get_all_active_symbols(symbol_only=True) == ["old-usd-p-d"]
+        await asyncio.gather(*api._background_tasks)
+        assert mock_get.call_count == 1
+        assert await api.get_all_active_symbols(symbol_only=True) == ["new-usd-p-d"]
+        assert stale_cache.get(VinterUrl.get_active_url(asset_type))[0] == [{"symbol": "new-usd-p-d"}]
+    await api.httpx_client.aclose()
+
+@pytest.mark.asyncio
+async def test_iter_data_by_time_walks_pages():
+    api_key = "my_api_key"
+    asset_type = "multi_assets"
+    api = VinterAPIAsync(api_key=api_key, asset_type=asset_type)
+    api.httpx_client = httpx.AsyncClient()
+    start = VinterTime.to_timestamp_ms("2021-01-01")
+    rows = [
+        {"symbol": "waves-usd-p-h", "timestamp": start + hour * 3600000, "value": hour}
+        for hour in range(25)
+    ]
+
+    async def get(url, params=None, headers=None):
+        cursor = VinterTime.to_timestamp_ms(params["start_time"])
+        page = [row for row in rows if row["timestamp"] >= cursor][: params["limit"]]
+        return Mock(json=Mock(return_value={"data": page}))
+
+    with patch.object(api.httpx_client, "get", new_callable=AsyncMock) as mock_get:
+        mock_get.side_effect = get
+        result = [row async for row in api.iter_data_by_time("waves-usd-p-h", start="2021-01-01", limit=10)]
+        assert result == rows
+        assert mock_get.call_count == 3
+        assert await api.get_data_by_time("waves-usd-p-h", start="2021-01-01", limit=10, paginate=True) == rows
+    await api.httpx_client.aclose()
+
+@pytest.mark.asyncio
+async def test_get_data_by_time_parallel_splits_windows():
+    api_key = "my_api_key"
+    asset_type = "multi_assets"
+    api = VinterAPIAsync(api_key=api_key, asset_type=asset_type)
+    api.httpx_client = httpx.AsyncClient()
+    start = VinterTime.to_timestamp_ms("2021-01-01")
+    rows = [
+        {"symbol": "waves-usd-p-h", "timestamp": start + hour * 3600000, "value": hour}
+        for hour in range(48)
+    ]
+    in_flight = 0
+    max_in_flight = 0
+
+    async def get(url, params=None, headers=None):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        window_start = VinterTime.to_timestamp_ms(params["start_time"])
+        window_end = VinterTime.to_timestamp_ms(params["end_time"])
+        # The end is inclusive here, the client must drop the boundary rows
+        page = [row for row in rows if window_start <= row["timestamp"] <= window_end]
+        return Mock(json=Mock(return_value={"data": page[: params["limit"]]}))
+
+    with patch.object(api.httpx_client, "get", new_callable=AsyncMock) as mock_get:
+        mock_get.side_effect = get
+        result = await api.get_data_by_time_parallel(
+            "waves-usd-p-h",
+            start="2021-01-01",
+            end="2021-01-03",
+            limit=10,
+            max_concurrency=2,
+        )
+        assert result == rows
+        assert mock_get.call_count == 6
+        assert max_in_flight == 2
+    await api.httpx_client.aclose()
+
+@pytest.mark.asyncio
+async def test_get_latest_values_reports_errors():
+    api_key = "my_api_key"
+    asset_type = "single_assets"
+    api = VinterAPIAsync(api_key=api_key, asset_type=asset_type)
+    api.httpx_client = httpx.AsyncClient()
+    in_flight = 0
+    max_in_flight = 0
+
+    async def get(url, params=None, headers=None):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if params["symbol"] == "eth-usd-p-r":
+            raise httpx.ConnectError("boom")
+        return Mock(json=Mock(return_value={"data": [{"symbol": params["symbol"], "value": 1000}]}))
+
+    symbols = ["btc-usd-p-r", "eth-usd-p-r", "ada-usd-p-r", "sol-usd-p-r", "dot-usd-p-r"]
+    with patch.object(api.httpx_client, "get", new_callable=AsyncMock) as mock_get:
+        mock_get.side_effect = get
+        result = await api.get_latest_values(symbols, max_concurrency=2)
+        assert list(result.keys()) == ["btc-usd-p-r", "ada-usd-p-r", "sol-usd-p-r", "dot-usd-p-r"]
+        assert isinstance(result.errors["eth-usd-p-r"], httpx.ConnectError)
+        assert max_in_flight == 2
+    await api.httpx_client.aclose()
+
+@pytest.mark.asyncio
+async def test_async_context_manager_closes_owned_client():
+    ''' This function tests that leaving the async with block closes the client the instance created
+    
+    '''
+    async with VinterAPIAsync(api_key="test_key", asset_type="multi_assets") as api:
+        assert not api.httpx_client.is_closed
+    assert api.httpx_client.is_closed
+
+@pytest.mark.asyncio
+async def test_async_shared_client_is_not_closed():
+    ''' This function tests that a client passed in is shared and left open
+    
+    '''
+    client = build_async_client()
+    async with VinterAPIAsync(api_key="test_key", asset_type="nav", httpx_client=client) as api:
+        assert api.httpx_client is client
+    assert not client.is_closed
+    await client.aclose()
+
+@pytest.mark.asyncio
+async def test_async_retry_transient_errors():
+    ''' This function tests that a 429 with Retry-After is retried before the request succeeds
+    
+    '''
+    api = VinterAPIAsync(api_key="test_key", asset_type="single_assets", retry=RetryPolicy())
+    request = httpx.Request("GET", "https://example.com")
+    responses = [
+        httpx.Response(429, headers={"Retry-After": "0"}, request=request),
+        httpx.Response(200, json={"data": [{"value": 1000}]}, request=request),
+    ]
+    with patch.object(api.httpx_client, "get", new_callable=AsyncMock) as mock_get:
+        mock_get.side_effect = responses
+        assert await api.get_latest_value("btc-usd-p-r") == 1000
+        assert mock_get.call_count == 2
+    await api.aclose()
+
+@pytest.mark.asyncio
+async def test_async_iter_data_by_time_stream():
+    ''' This function tests that streamed pages are decoded from the body chunks
+    
+    '''
+    class Body(httpx.AsyncByteStream):
+        def __init__(self, body):
+            self.body = body
+
+        async def __aiter__(self):
+            for i in range(0, len(self.body), 5):
+                yield self.body[i:i + 5]
+
+    def handler(request):
+        body = json.dumps({"data": [{"timestamp": 1000 * i, "value": i} for i in range(3)]}).encode()
+        return httpx.Response(200, stream=Body(body))
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    async with VinterAPIAsync(api_key="test_key", asset_type="single_assets", httpx_client=client) as api:
+        rows = [row async for row in api.iter_data_by_time("btc-usd-p-d", start="1970-01-01T00:00:00Z", stream=True)]
+    assert [row["value"] for row in rows] == [0, 1, 2]
+    await client.aclose()
+
+@pytest.mark.asyncio
+async def test_async_sync_open_period(tmp_path):
+    ''' This function tests that a period reaching now is only marked as synced up to its last row
+    
+    '''
+    api = VinterAPIAsync(api_key="test_key", asset_type="single_assets", history_store=str(tmp_path / "history.db"))
+    now = int(time.time() * 1000)
+    rows = [{"symbol": "btc-usd-p-d", "timestamp": now - (3 - day) * 86400000 - 1000, "value": day} for day in range(3)]
+
+    async def get(url, params=None, headers=None):
+        start = VinterTime.to_timestamp_ms(params["start_time"])
+        return Mock(json=Mock(return_value={"data": [row for row in rows if row["timestamp"] >= start]}))
+
+    with patch.object(api.httpx_client, "get", new_callable=AsyncMock) as mock_get:
+        mock_get.side_effect = get
+        start = VinterTime.format_timestamp(rows[0]["timestamp"])
+        assert await api.sync("btc-usd-p-d", start=start) == rows
+        assert api.history_store.coverage("btc-usd-p-d") == [(rows[0]["timestamp"], rows[-1]["timestamp"] + 1)]
+    await api.aclose()
+
+@pytest.mark.asyncio
+async def test_get_data_by_date_fetches_sparse_ranges():
+    ''' This function tests that dates far apart are fetched concurrently as separate small ranges
+    
+    '''
+    start = VinterTime.to_timestamp_ms("2017-01-01")
+    rows = [{"symbol": "btc-usd-p-d", "timestamp": start + day * 86400000, "value": day} for day in range(2300)]
+    windows = []
+
+    def handler(request):
+        first = VinterTime.to_timestamp_ms(request.url.params["start_time"])
+        last = VinterTime.to_timestamp_ms(request.url.params["end_time"])
+        windows.append((request.url.params["start_time"], request.url.params["end_time"]))
+        return httpx.Response(200, json={"data": [row for row in rows if first <= row["timestamp"] <= last]})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    api = VinterAPIAsync(api_key="test_key", asset_type="single_assets", httpx_client=client)
+    result = await api.get_data_by_date("btc-usd-p-d", ["2023-03-01", "2017-01-01"], max_concurrency=2)
+    assert list(result) == ["2017-01-01", "2023-03-01"]
+    assert sorted(windows) == [("2017-01-01", "2017-01-02"), ("2023-03-01", "2023-03-02")]
+    await client.aclose()
+
+@pytest.mark.asyncio
+async def test_async_sync_store_off_event_loop(tmp_path):
+    ''' This function tests that the sqlite calls of sync and of the persistent catalog cache run outside
+    of the event loop thread
+    
+    '''
+    import threading
+    loop_thread = threading.current_thread()
+    threads = []
+
+    def record(func):
+        def wrapper(*args):
+            threads.append(threading.current_thread())
+            return func(*args)
+        return wrapper
+
+    api = VinterAPIAsync(api_key="test_key", asset_type="single_assets", history_store=str(tmp_path / "history.db"), persistent_cache=str(tmp_path / "catalog.db"))
+    for name in ("missing", "add", "read"):
+        setattr(api.history_store, name, record(getattr(api.history_store, name)))
+    for name in ("get", "set", "invalidate"):
+        setattr(api.persistent_cache, name, record(getattr(api.persistent_cache, name)))
+    rows = [{"symbol": "btc-usd-p-d", "timestamp": 1672531200000 + day * 86400000, "value": day} for day in range(3)]
+
+    async def get(url, params=None, headers=None):
+        if params is None:
+            return Mock(json=Mock(return_value={"data": [{"symbol": "btc-usd-p-d"}]}))
+        start = VinterTime.to_timestamp_ms(params["start_time"])
+        return Mock(json=Mock(return_value={"data": [row for row in rows if row["timestamp"] >= start]}))
+
+    with patch.object(api.httpx_client, "get", new_callable=AsyncMock) as mock_get:
+        mock_get.side_effect = get
+        assert await api.sync("btc-usd-p-d", start="2023-01-01", end="2023-01-04") == rows
+        await api.get_all_active_symbols()
+        await api.invalidate_cache()
+
+    assert len(threads) == 6
+    assert loop_thread not in threads
+    await api.aclose()
+
+@pytest.mark.asyncio
+async def test_get_data_by_time_parallel_matches_sequential():
+    ''' This function tests that the parallel fetch returns the same rows as get_data_by_time, the row
+    at the inclusive end included
+    
+    '''
+    start = VinterTime.to_timestamp_ms("2021-01-01")
+    rows = [{"symbol": "waves-usd-p-h", "timestamp": start + hour * 3600000, "value": hour} for hour in range(200)]
+
+    def handler(request):
+        window_start = VinterTime.to_timestamp_ms(request.url.params["start_time"])
+        window_end = VinterTime.to_timestamp_ms(request.url.params["end_time"])
+        page = [row for row in rows if window_start <= row["timestamp"] <= window_end]
+        return httpx.Response(200, json={"data": page[: int(request.url.params["limit"])]})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    api = VinterAPIAsync(api_key="test_key", asset_type="single_assets", httpx_client=client)
+    end = VinterTime.format_timestamp(start + 150 * 3600000)
+    sequential = await api.get_data_by_time("waves-usd-p-h", start="2021-01-01", end=end, limit=20, paginate=True)
+    parallel = await api.get_data_by_time_parallel("waves-usd-p-h", start="2021-01-01", end=end, limit=20)
+    assert parallel == sequential == rows[:151]
+    await client.aclose()
+
+@pytest.mark.asyncio
+async def test_get_data_by_date_datetime_date_field():
+    ''' This function tests that rows whose date field is a datetime string are keyed by their day
+    
+    '''
+    start = VinterTime.to_timestamp_ms("2023-03-05")
+    rows = [
+        {"symbol": "btc-usd-p-d", "date": VinterTime.format_timestamp(start + day * 86400000), "timestamp": start + day * 86400000, "value": day}
+        for day in range(3)
+    ]
+
+    def handler(request):
+        first = VinterTime.to_timestamp_ms(request.url.params["start_time"])
+        last = VinterTime.to_timestamp_ms(request.url.params["end_time"])
+        return httpx.Response(200, json={"data": [row for row in rows if first <= row["timestamp"] <= last]})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    api = VinterAPIAsync(api_key="test_key", asset_type="single_assets", httpx_client=client)
+    result = await api.get_data_by_date("btc-usd-p-d", ["2023-03-06", "2023-03-07"])
+    assert result == {"2023-03-06": rows[1], "2023-03-07": rows[2]}
+    await client.aclose()
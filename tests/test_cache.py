@@ -0,0 +1,162 @@
+import time
+from vinterunofficial import TTLCache, PersistentCatalogCache, WindowCache
+
+
+def test_ttl_cache_hit_and_miss():
+    ''' This function tests that the cache counts hits and misses
+    
+    '''
+    cache = TTLCache(ttl=60)
+    assert cache.get("key") is None
+    cache.set("key", [1, 2, 3])
+    assert cache.get("key") == [1, 2, 3]
+    assert cache.info() == {"hits": 1, "misses": 1, "size": 1, "ttl": 60}
+
+def test_ttl_cache_expiry():
+    ''' This function tests that expired entries are not returned
+    
+    '''
+    cache = TTLCache(ttl=0.01)
+    cache.set("key", "value")
+    time.sleep(0.02)
+    assert cache.get("key") is None
+    assert cache.info()["size"] == 0
+
+def test_ttl_cache_invalidate():
+    ''' This function tests that a single key or the whole cache can be invalidated
+    
+    '''
+    cache = TTLCache(ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    cache.invalidate()
+    assert cache.get("b") is None
+
+def test_ttl_cache_disabled():
+    ''' This function tests that a ttl of 0 disables the cache
+    
+    '''
+    cache = TTLCache(ttl=0)
+    cache.set("key", "value")
+    assert cache.get("key") is None
+
+def test_persistent_cache_fresh_stale_missing(tmp_path):
+    ''' This function tests the states of an entry of the persistent cache
+    
+    '''
+    cache = PersistentCatalogCache(str(tmp_path / "catalog.db"), ttl=60, stale_ttl=60)
+    assert cache.get("key") == (None, "missing")
+    cache.set("key", [{"symbol": "btc-usd-p-d"}])
+    assert cache.get("key") == ([{"symbol": "btc-usd-p-d"}], "fresh")
+
+    stale = PersistentCatalogCache(cache.path, ttl=0, stale_ttl=60)
+    assert stale.get("key") == ([{"symbol": "btc-usd-p-d"}], "stale")
+
+    expired = PersistentCatalogCache(cache.path, ttl=0, stale_ttl=0)
+    assert expired.get("key") == (None, "missing")
+
+def test_persistent_cache_refresh_lease(tmp_path):
+    ''' This function tests that only one caller gets the refresh lease of an entry
+    
+    '''
+    cache = PersistentCatalogCache(str(tmp_path / "catalog.db"))
+    cache.set("key", [])
+    other_process = PersistentCatalogCache(cache.path)
+    assert cache.try_acquire_refresh("key") is True
+    assert other_process.try_acquire_refresh("key") is False
+    cache.release_refresh("key")
+    assert other_process.try_acquire_refresh("key") is True
+    cache.set("key", [])
+    assert cache.try_acquire_refresh("key") is True
+
+def test_persistent_cache_invalidate(tmp_path):
+    ''' This function tests that entries can be dropped from the persistent cache
+    
+    '''
+    cache = PersistentCatalogCache(str(tmp_path / "catalog.db"))
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.invalidate("a")
+    assert cache.get("a") == (None, "missing")
+    cache.invalidate()
+    assert cache.get("b") == (None, "missing")
+
+START = 1609459200000
+DAY = 86400000
+
+
+def day_rows(start, stop):
+    return [{"symbol": "btc-usd-p-d", "timestamp": START + day * DAY, "value": day} for day in range(start, stop)]
+
+def test_window_cache_lookup_and_gaps():
+    ''' This function tests that a query returns the cached rows and the uncovered sub-ranges
+    
+    '''
+    cache = WindowCache()
+    chunks, gaps = cache.lookup("btc-usd-p-d", START, START + 10 * DAY)
+    assert chunks == [] and gaps == [(START, START + 10 * DAY)]
+    cache.put("btc-usd-p-d", START + 2 * DAY, START + 5 * DAY, day_rows(2, 5))
+    cache.put("btc-usd-p-d", START + 7 * DAY, START + 9 * DAY, day_rows(7, 9))
+    chunks, gaps = cache.lookup("btc-usd-p-d", START + 3 * DAY, START + 10 * DAY)
+    assert chunks == [day_rows(3, 5), day_rows(7, 9)]
+    assert gaps == [(START + 5 * DAY, START + 7 * DAY), (START + 9 * DAY, START + 10 * DAY)]
+    assert cache.lookup("btc-usd-p-d", START + 2 * DAY, START + 4 * DAY)[1] == []
+    assert cache.info()["hits"] == 1
+    assert cache.info()["misses"] == 2
+
+def test_window_cache_merges_adjacent_segments():
+    ''' This function tests that touching windows become one segment
+    
+    '''
+    cache = WindowCache()
+    cache.put("btc-usd-p-d", START, START + 2 * DAY, day_rows(0, 2))
+    cache.put("btc-usd-p-d", START + 2 * DAY, START + 4 * DAY, day_rows(2, 4))
+    cache.put("btc-usd-p-d", START + DAY, START + 3 * DAY, day_rows(1, 3))
+    assert cache.info()["segments"] == 1
+    assert cache.lookup("btc-usd-p-d", START, START + 4 * DAY) == ([day_rows(0, 4)], [])
+
+def test_window_cache_evicts_least_recently_used_by_size():
+    ''' This function tests that segments are evicted once the cache is over its byte budget
+    
+    '''
+    size = WindowCache._estimate_size(day_rows(0, 2))
+    cache = WindowCache(max_bytes=size * 2)
+    cache.put("btc-usd-p-d", START, START + 2 * DAY, day_rows(0, 2))
+    cache.put("eth-usd-p-d", START, START + 2 * DAY, day_rows(0, 2))
+    cache.lookup("btc-usd-p-d", START, START + DAY)
+    cache.put("ada-usd-p-d", START, START + 2 * DAY, day_rows(0, 2))
+    assert cache.lookup("eth-usd-p-d", START, START + DAY)[1] != []
+    assert cache.lookup("btc-usd-p-d", START, START + DAY)[1] == []
+    assert cache.info()["bytes"] <= size * 2
+    cache.invalidate("btc-usd-p-d")
+    assert cache.info()["segments"] == 1
+    cache.invalidate()
+    assert cache.info()["bytes"] == 0
+
+def test_window_cache_adjacent_put_over_budget():
+    ''' This function tests that a window that can't be merged into a large neighbour is kept next to it
+    instead of dropping both
+    
+    '''
+    size = WindowCache._estimate_size(day_rows(0, 1000))
+    cache = WindowCache(max_bytes=size + WindowCache._estimate_size(day_rows(0, 50)))
+    cache.put("btc-usd-p-d", START, START + 1000 * DAY, day_rows(0, 1000))
+    cache.put("btc-usd-p-d", START + 1000 * DAY, START + 1100 * DAY, day_rows(1000, 1100))
+
+    # The new window is the most recently used, the older segment was evicted for it
+    assert cache.info()["segments"] == 1
+    assert cache.info()["bytes"] <= cache.max_bytes
+    assert cache.lookup("btc-usd-p-d", START + 1000 * DAY, START + 1100 * DAY) == ([day_rows(1000, 1100)], [])
+
+    # Only the part of an overlapping window that the neighbour doesn't cover becomes a segment
+    cache.invalidate()
+    cache.put("btc-usd-p-d", START, START + 1000 * DAY, day_rows(0, 1000))
+    cache.put("btc-usd-p-d", START + 900 * DAY, START + 1100 * DAY, day_rows(900, 1100))
+    assert cache.lookup("btc-usd-p-d", START + 900 * DAY, START + 1100 * DAY) == ([day_rows(1000, 1100)], [(START + 900 * DAY, START + 1000 * DAY)])
+
+    # A window over the budget on its own leaves the cache untouched
+    cache.put("eth-usd-p-d", START, START + 2100 * DAY, day_rows(0, 2100))
+    assert cache.info()["segments"] == 1
@@ -0,0 +1,38 @@
+from vinterunofficial import ActiveCatalog
+
+
+MOCK_ASSETS = [
+    {"symbol": "waves-usd-p-d", "contrib": ["waves-usd-p-r"]},
+    {"symbol": "ton-usdt-p-5-d", "contrib": ["ton-usdt-p-r"]},
+    {"symbol": "btc-usd-p-r", "contrib": ["btc-usd-p-r"]},
+]
+
+def test_catalog_lookup_by_symbol():
+    ''' This function tests that assets are looked up through the symbol index
+    
+    '''
+    catalog = ActiveCatalog(MOCK_ASSETS)
+    assert len(catalog) == 3
+    assert "btc-usd-p-r" in catalog
+    assert catalog.get("ton-usdt-p-5-d") == MOCK_ASSETS[1]
+    assert catalog.get("eth-usd-p-d") is None
+
+def test_catalog_filter_by_frequency():
+    ''' This function tests the per-frequency buckets of the catalog
+    
+    '''
+    catalog = ActiveCatalog(MOCK_ASSETS)
+    assert catalog.filter() == MOCK_ASSETS
+    assert catalog.filter(frequency="d") == MOCK_ASSETS[:2]
+    assert catalog.filter(frequency="d", symbol_only=True) == ["waves-usd-p-d", "ton-usdt-p-5-d"]
+    assert catalog.filter(frequency="h") == []
+    assert catalog.filter(symbol_only=True) == ["waves-usd-p-d", "ton-usdt-p-5-d", "btc-usd-p-r"]
+
+def test_catalog_filter_returns_copy():
+    ''' This function tests that modifying a filtered list does not modify the index
+    
+    '''
+    catalog = ActiveCatalog(MOCK_ASSETS)
+    data = catalog.filter(frequency="d")
+    data.clear()
+    assert len(catalog.filter(frequency="d")) == 2
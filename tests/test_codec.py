@@ -0,0 +1,64 @@
+import json
+import pytest
+import httpx
+from unittest.mock import Mock
+from vinterunofficial import codec
+
+BACKENDS = ["json"] + (["orjson"] if codec.orjson is not None else [])
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    previous = codec.get_json_backend()
+    yield codec.set_json_backend(request.param)
+    codec.set_json_backend(previous)
+
+def test_loads_and_dumps(backend):
+    ''' This function tests that both backends round trip the same data
+    
+    '''
+    data = {"data": [{"symbol": "btc-usd-p-d", "value": 1000.5, "weights": {"btc": 0.5}}]}
+    assert codec.loads(codec.dumps(data)) == data
+    assert codec.loads(codec.dumps(data).encode()) == data
+    assert codec.loads(codec.dumps(data, indent=True)) == data
+    assert "\n" in codec.dumps(data, indent=True)
+
+def test_decode_response(backend):
+    ''' This function tests that httpx responses and objects with a json method are decoded
+    
+    '''
+    response = httpx.Response(200, json={"data": [1, 2]})
+    assert codec.decode_response(response) == {"data": [1, 2]}
+    assert codec.decode_response(Mock(json=Mock(return_value={"data": []}))) == {"data": []}
+
+def test_set_json_backend_invalid():
+    ''' This function tests that only known backends can be selected
+    
+    '''
+    with pytest.raises(ValueError):
+        codec.set_json_backend("ujson")
+
+def test_set_json_backend_default():
+    ''' This function tests that orjson is preferred when it is installed
+    
+    '''
+    previous = codec.get_json_backend()
+    expected = "orjson" if codec.orjson is not None else "json"
+    assert codec.set_json_backend() == expected
+    codec.set_json_backend(previous)
+
+def test_json_backend_indent_matches_stdlib():
+    ''' This function tests that the json backend keeps the 4 spaces indent of the exported files
+    
+    '''
+    previous = codec.get_json_backend()
+    codec.set_json_backend("json")
+    assert codec.dumps({"a": [1]}, indent=True) == json.dumps({"a": [1]}, indent=4)
+    codec.set_json_backend(previous)
+
+def test_dumps_is_compact(backend):
+    ''' This function tests that both backends write compact JSON when it is not indented
+    
+    '''
+    data = {"symbol": "btc-usd-p-d", "weights": {"btc": 0.5, "eth": 0.5}}
+    assert codec.dumps(data) == '{"symbol":"btc-usd-p-d","weights":{"btc":0.5,"eth":0.5}}'
@@ -0,0 +1,80 @@
+import csv
+import json
+import pytest
+from vinterunofficial import VinterAPI, TimeSeries, write_csv, write_json, write_ndjson, iter_ndjson
+
+def test_write_csv_streams_generator_without_mutating(tmp_path):
+    ''' This function tests that rows of a generator are written with nested fields as JSON and the
+    rows are left unchanged
+    
+    '''
+    rows = [{"symbol": "vnby-bold1-d", "value": i, "weights": {"btc": 0.5, "eth": 0.5}} for i in range(3)]
+    filename = tmp_path / "data.csv"
+
+    assert write_csv((row for row in rows), filename) == 3
+    assert rows[0]["weights"] == {"btc": 0.5, "eth": 0.5}
+
+    with open(filename, newline="") as f:
+        written = list(csv.DictReader(f))
+    assert [row["value"] for row in written] == ["0", "1", "2"]
+    assert json.loads(written[0]["weights"]) == {"btc": 0.5, "eth": 0.5}
+
+def test_write_csv_header_only_once_when_appending(tmp_path):
+    ''' This function tests that appending to a file does not repeat the header and that missing
+    fields are written as empty cells
+    
+    '''
+    filename = tmp_path / "data.csv"
+    write_csv([{"date": "2023-01-01", "value": 1}], filename, seprator=";")
+    write_csv({"2023-01-02": {"date": "2023-01-02"}}, filename, seprator=";")
+    assert write_csv([], filename) == 0
+
+    with open(filename) as f:
+        assert f.read() == "date;value\n2023-01-01;1\n2023-01-02;\n"
+
+def test_save_data_to_file_accepts_iterables(tmp_path):
+    ''' This function tests that save_data_to_file writes a TimeSeries to csv and a generator to json
+    
+    '''
+    api = VinterAPI(api_key="test_key", asset_type="single_assets")
+    rows = [{"symbol": "btc-usd-p-d", "timestamp": 1672531200000 + day * 86400000, "value": day} for day in range(3)]
+
+    api.save_data_to_file(TimeSeries.from_rows(rows), tmp_path / "data.csv")
+    with open(tmp_path / "data.csv", newline="") as f:
+        assert [row["timestamp"] for row in csv.DictReader(f)] == [str(row["timestamp"]) for row in rows]
+
+    api.save_data_to_file((row for row in rows), tmp_path / "data.json", file_type="json")
+    with open(tmp_path / "data.json") as f:
+        assert json.load(f) == rows
+    api.close()
+
+@pytest.mark.parametrize("name", ["data.ndjson", "data.ndjson.gz", "data.ndjson.zst"])
+def test_ndjson_round_trip_and_append(tmp_path, name):
+    ''' This function tests that ndjson files, plain or compressed, are read back row by row after
+    being written from a generator and appended to
+    
+    '''
+    if name.endswith(".zst"):
+        pytest.importorskip("zstandard")
+    rows = [{"symbol": "vnby-bold1-d", "value": i, "weights": {"btc": 0.5}} for i in range(2500)]
+    filename = tmp_path / name
+
+    assert write_ndjson((row for row in rows), filename) == 2500
+    assert write_ndjson({"2023-01-01": {"value": -1}}, filename, append=True) == 1
+
+    reader = iter_ndjson(filename)
+    assert next(reader) == rows[0]
+    assert list(reader) == rows[1:] + [{"value": -1}]
+
+def test_ndjson_compression_is_smaller(tmp_path):
+    ''' This function tests that the compressed export is smaller than the plain one and that an
+    unknown compression is rejected
+    
+    '''
+    rows = [{"symbol": "btc-usd-p-r", "timestamp": 1672531200000 + i * 1000, "value": 16547.12 + i} for i in range(1000)]
+    write_ndjson(rows, tmp_path / "data.ndjson")
+    write_ndjson(rows, tmp_path / "data.ndjson.gz")
+    assert (tmp_path / "data.ndjson.gz").stat().st_size * 4 < (tmp_path / "data.ndjson").stat().st_size
+
+    with pytest.raises(ValueError):
+        write_ndjson(rows, tmp_path / "data.ndjson", compression="lzma")
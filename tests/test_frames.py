@@ -0,0 +1,53 @@
+import math
+import pytest
+from vinterunofficial import TimeSeries, to_numpy, to_pandas
+
+np = pytest.importorskip("numpy")
+
+ROWS = [
+    {"symbol": "btc-usd-p-d", "date": "2023-01-0%d" % (day + 1), "timestamp": 1672531200000 + day * 86400000, "value": 1000 + day}
+    for day in range(3)
+]
+
+
+def test_to_numpy_from_series_shares_memory():
+    ''' This function tests that the arrays of a TimeSeries are exported without a copy
+    
+    '''
+    series = TimeSeries.from_rows(ROWS)
+    timestamps, values = series.to_numpy()
+    assert timestamps.dtype == np.dtype("datetime64[ms]")
+    assert values.dtype == np.float64
+    assert str(timestamps[0]) == "2023-01-01T00:00:00.000"
+    series.values[0] = 5.0
+    assert values[0] == 5.0
+
+def test_to_numpy_from_rows():
+    ''' This function tests rows with timestamps in ms, in seconds and with dates only
+    
+    '''
+    timestamps, values = to_numpy(ROWS)
+    assert list(values) == [1000.0, 1001.0, 1002.0]
+    assert str(timestamps[2]) == "2023-01-03T00:00:00.000"
+
+    timestamps, _ = to_numpy([{"timestamp": 1672531200, "value": 1}])
+    assert str(timestamps[0]) == "2023-01-01T00:00:00.000"
+
+    timestamps, values = to_numpy([{"date": "2023-01-02", "value": None}, {"timestamp": "2023-01-03T12:00:00.000Z", "value": 2}])
+    assert [str(timestamp) for timestamp in timestamps] == ["2023-01-02T00:00:00.000", "2023-01-03T12:00:00.000"]
+    assert math.isnan(values[0])
+
+def test_to_pandas():
+    ''' This function tests that a DataFrame is indexed by timestamp with the side columns
+    
+    '''
+    pytest.importorskip("pandas")
+    frame = to_pandas(ROWS)
+    assert frame.index.name == "timestamp"
+    assert str(frame.index.tz) == "UTC"
+    assert list(frame["value"]) == [1000.0, 1001.0, 1002.0]
+    assert list(frame.columns) == ["value", "symbol", "date"]
+
+    frame = TimeSeries.from_rows(ROWS).to_pandas(fields=("date",))
+    assert list(frame.columns) == ["value", "date"]
+    assert frame["date"].iloc[1] == "2023-01-02"
@@ -0,0 +1,87 @@
+import math
+import tracemalloc
+from array import array
+import pytest
+from vinterunofficial import merge_rows, TimeSeries
+
+
+def test_merge_rows_orders_and_dedupes():
+    ''' This function tests that chunks are merged in timestamp order without duplicates
+    
+    '''
+    chunks = [
+        [{"timestamp": 3000, "value": 3}, {"timestamp": 4000, "value": 4}],
+        [{"timestamp": 1000, "value": 1}, {"timestamp": 3000, "value": 30}],
+    ]
+    assert merge_rows(chunks) == [
+        {"timestamp": 1000, "value": 1},
+        {"timestamp": 3000, "value": 3},
+        {"timestamp": 4000, "value": 4},
+    ]
+
+def test_merge_rows_ordered_chunks():
+    ''' This function tests that ordered chunks are concatenated
+    
+    '''
+    chunks = [[{"timestamp": 1000}], [], [{"timestamp": 2000}, {"timestamp": 3000}]]
+    assert [row["timestamp"] for row in merge_rows(chunks)] == [1000, 2000, 3000]
+
+ROWS = [
+    {"id": 10 + i, "date": "2023-01-01", "symbol": "btc-usd-p-r", "timestamp": 1672531200000 + i * 1000, "value": 1000 + i}
+    for i in range(5)
+]
+
+def test_time_series_from_rows():
+    ''' This function tests that rows are stored in typed columns and rebuilt unchanged
+    
+    '''
+    series = TimeSeries.from_rows(ROWS)
+    assert len(series) == 5
+    assert series.symbol == "btc-usd-p-r"
+    assert series.timestamps.typecode == "q"
+    assert series.values.typecode == "d"
+    assert isinstance(series.columns["id"], array)
+    assert series.columns["date"][0] is series.columns["date"][4]
+    assert series.to_rows() == ROWS
+    assert series[-1] == ROWS[-1]
+    with pytest.raises(IndexError):
+        series[5]
+
+def test_time_series_slicing_and_fields():
+    ''' This function tests slicing and dropping the side columns
+    
+    '''
+    series = TimeSeries.from_rows(ROWS, fields=())
+    assert series.columns == {}
+    assert series.symbol is None
+    part = series[1:3]
+    assert isinstance(part, TimeSeries)
+    assert list(part.timestamps) == [1672531201000, 1672531202000]
+    assert [row["value"] for row in part] == [1001.0, 1002.0]
+    assert part == TimeSeries.from_rows(ROWS[1:3], fields=())
+
+def test_time_series_missing_values():
+    ''' This function tests that missing values are nan and missing fields None
+    
+    '''
+    series = TimeSeries.from_rows([
+        {"timestamp": 1672531200000, "value": None, "symbol": "a-usd-p-d"},
+        {"timestamp": 1672531201000, "value": 1, "symbol": "b-usd-p-d"},
+    ])
+    assert math.isnan(series.values[0])
+    assert series.symbol is None
+    assert series.columns["symbol"] == ["a-usd-p-d", "b-usd-p-d"]
+
+def test_time_series_memory():
+    ''' This function tests that the series takes an order of magnitude less memory than the rows
+    
+    '''
+    tracemalloc.start()
+    rows = [{"symbol": "btc-usd-p-r", "timestamp": 1672531200000 + i * 1000, "value": 1000.5 + i} for i in range(50000)]
+    rows_size = tracemalloc.get_traced_memory()[0]
+    series = TimeSeries.from_rows(rows)
+    del rows
+    series_size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(series) == 50000
+    assert series_size * 10 < rows_size
@@ -0,0 +1,45 @@
+from vinterunofficial import HistoryStore
+
+
+START = 1609459200000
+DAY = 86400000
+
+
+def rows(start, stop):
+    return [{"symbol": "btc-usd-p-d", "timestamp": START + day * DAY, "value": day} for day in range(start, stop)]
+
+def test_history_store_add_and_read(tmp_path):
+    ''' This function tests that stored rows are read back in order for a period
+    
+    '''
+    store = HistoryStore(str(tmp_path / "history.db"))
+    assert store.add("btc-usd-p-d", rows(3, 6) + rows(0, 3), START, START + 6 * DAY) == 6
+    assert store.read("btc-usd-p-d", START + DAY, START + 4 * DAY) == rows(1, 4)
+    assert store.read("eth-usd-p-d", START, START + 6 * DAY) == []
+
+def test_history_store_coverage(tmp_path):
+    ''' This function tests that synced intervals are merged and the gaps are reported
+    
+    '''
+    store = HistoryStore(str(tmp_path / "history.db"))
+    store.add("btc-usd-p-d", [], 0, 10)
+    store.add("btc-usd-p-d", [], 20, 30)
+    store.add("btc-usd-p-d", [], 10, 15)
+    assert store.coverage("btc-usd-p-d") == [(0, 15), (20, 30)]
+    assert store.missing("btc-usd-p-d", 5, 40) == [(15, 20), (30, 40)]
+    store.add("btc-usd-p-d", rows(0, 1), 5, 5)
+    assert store.coverage("btc-usd-p-d") == [(0, 15), (20, 30)]
+
+def test_history_store_invalidate(tmp_path):
+    ''' This function tests that a symbol can be dropped from the store
+    
+    '''
+    store = HistoryStore(str(tmp_path / "history.db"))
+    store.add("btc-usd-p-d", rows(0, 2), START, START + 2 * DAY)
+    store.add("eth-usd-p-d", [], 0, 10)
+    store.invalidate("btc-usd-p-d")
+    assert store.coverage("btc-usd-p-d") == []
+    assert store.read("btc-usd-p-d", START, START + 2 * DAY) == []
+    assert store.coverage("eth-usd-p-d") == [(0, 10)]
+    store.invalidate()
+    assert store.coverage("eth-usd-p-d") == []
@@ -0,0 +1,80 @@
+import json
+import pytest
+from vinterunofficial.streaming import JsonArrayStream, iter_json_array, aiter_json_array
+
+
+BODY = json.dumps({
+    "message": "ok",
+    "meta": {"rows": [1, 2]},
+    "data": [{"symbol": "btc-usd-p-d", "value": 1000.5 + i, "name": "é\""} for i in range(20)] + [12, -4.5e3, True, None],
+    "params": {},
+}).encode()
+
+
+def chunked(body, size):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 100000])
+def test_iter_json_array_any_chunk_size(size):
+    ''' This function tests that the array is decoded whatever the chunk boundaries
+    
+    '''
+    assert list(iter_json_array(chunked(BODY, size))) == json.loads(BODY)["data"]
+
+def test_feed_returns_items_as_they_complete():
+    ''' This function tests that items are returned before the body is complete
+    
+    '''
+    parser = JsonArrayStream()
+    assert parser.feed(b'{"data": [{"value": 1}, {"val') == [{"value": 1}]
+    assert parser.feed(b'ue": 2}, 3') == [{"value": 2}]
+    assert parser.feed(b"4]") == [34]
+    assert parser.done
+    assert parser.feed(b', "other": 1}') == []
+    assert parser.close() == []
+
+def test_empty_array():
+    ''' This function tests an empty data array
+    
+    '''
+    assert list(iter_json_array([b'{"data": [ ]}'])) == []
+
+@pytest.mark.parametrize("chunks", [
+    [b'{"data":[', b']}'],
+    [b'{"data":[ ', b']}'],
+    [b'{"data":[', b' ', b' ]}'],
+])
+def test_empty_array_split_between_chunks(chunks):
+    ''' This function tests an empty data array whose brackets arrive in different chunks, like the empty
+    page returned after a full last page
+    
+    '''
+    assert list(iter_json_array(chunks)) == []
+    parser = JsonArrayStream()
+    for chunk in chunks:
+        assert parser.feed(chunk) == []
+    assert parser.done
+
+@pytest.mark.parametrize("body, message", [
+    (b'{"message": "error"}', "no 'data' array"),
+    (b'{"data": [1, 2', "ended before"),
+    (b'[1, 2]', "Expected '{'"),
+    (b'{"data": [1 2]}', "Expected ','"),
+])
+def test_invalid_bodies(body, message):
+    ''' This function tests that a body without a complete data array raises a ValueError
+    
+    '''
+    with pytest.raises(ValueError, match=message):
+        list(iter_json_array([body]))
+
+@pytest.mark.asyncio
+async def test_aiter_json_array():
+    ''' This function tests the async version
+    
+    '''
+    async def chunks():
+        for chunk in chunked(BODY, 5):
+            yield chunk
+
+    assert [item async for item in aiter_json_array(chunks())] == json.loads(BODY)["data"]
@@ -0,0 +1,154 @@
+import time
+import asyncio
+import threading
+import pytest
+from unittest.mock import Mock
+import httpx
+from vinterunofficial import RevalidationCache, RetryPolicy, RateLimiter, build_client, build_async_client
+
+
+def test_revalidation_cache_key_ignores_param_order():
+    ''' This function tests that the key does not depend on the order of the params
+    
+    '''
+    key_a = RevalidationCache.make_key("https://example.com", {"symbol": "btc-usd-p-d", "limit": 1})
+    key_b = RevalidationCache.make_key("https://example.com", {"limit": 1, "symbol": "btc-usd-p-d"})
+    assert key_a == key_b
+    assert RevalidationCache.make_key("https://example.com") == ("https://example.com", ())
+
+def test_revalidation_cache_store_and_headers():
+    ''' This function tests that validators are turned into conditional headers
+    
+    '''
+    cache = RevalidationCache()
+    key = cache.make_key("https://example.com")
+    assert cache.conditional_headers(key) == {}
+    response = Mock(headers={"ETag": '"abc"', "Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"})
+    cache.store(key, response, {"data": []})
+    assert cache.conditional_headers(key) == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT",
+    }
+    assert cache.payload(key) == {"data": []}
+
+def test_revalidation_cache_skips_responses_without_validators():
+    ''' This function tests that responses without validators are not kept
+    
+    '''
+    cache = RevalidationCache()
+    key = cache.make_key("https://example.com")
+    cache.store(key, Mock(headers={}), {"data": []})
+    assert cache.payload(key) is None
+
+def test_revalidation_cache_evicts_least_recently_used():
+    ''' This function tests that the cache is bounded
+    
+    '''
+    cache = RevalidationCache(max_entries=2)
+    for url in ["a", "b", "c"]:
+        cache.store(cache.make_key(url), Mock(headers={"ETag": url}), url)
+    assert cache.payload(cache.make_key("a")) is None
+    assert cache.payload(cache.make_key("c")) == "c"
+
+def test_build_client_pool_limits():
+    ''' This function tests that the pool settings are passed to the client
+    
+    '''
+    client = build_client(max_connections=8, max_keepalive_connections=4, timeout=3)
+    pool = client._transport._pool
+    assert isinstance(client, httpx.Client)
+    assert pool._max_connections == 8
+    assert pool._max_keepalive_connections == 4
+    assert client.timeout.connect == 3
+    assert client.follow_redirects
+    client.close()
+
+def test_build_async_client():
+    ''' This function tests that the async builder returns an AsyncClient
+    
+    '''
+    client = build_async_client(max_connections=8)
+    assert isinstance(client, httpx.AsyncClient)
+    assert client._transport._pool._max_connections == 8
+
+def test_retry_policy_retry_after():
+    ''' This function tests that Retry-After is read as seconds or as an HTTP date
+    
+    '''
+    assert RetryPolicy.retry_after(Mock(headers={"Retry-After": "3"})) == 3
+    assert RetryPolicy.retry_after(Mock(headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0
+    assert RetryPolicy.retry_after(Mock(headers={"Retry-After": "soon"})) is None
+    assert RetryPolicy.retry_after(Mock(headers={})) is None
+
+def test_retry_policy_next_delay():
+    ''' This function tests which attempts are retried
+    
+    '''
+    policy = RetryPolicy(max_attempts=3, backoff=1, max_backoff=1.5)
+    started = policy.start()
+    assert policy.next_delay(0, started, response=Mock(status_code=404)) is None
+    assert 0 <= policy.next_delay(0, started, response=Mock(status_code=503, headers={})) <= 1
+    assert 0 <= policy.next_delay(1, started, error=httpx.ConnectError("boom")) <= 1.5
+    assert policy.next_delay(2, started, error=httpx.ConnectError("boom")) is None
+    assert policy.next_delay(0, started, error=ValueError("boom")) is None
+    assert policy.next_delay(0, started, response=Mock(status_code=429, headers={"Retry-After": "2"})) == 2
+    assert policy.next_delay(0, started, response=Mock(status_code=429, headers={"Retry-After": "120"})) is None
+    assert policy.retries == 3
+
+def test_retry_policy_budget():
+    ''' This function tests that retries stop once the budget is spent
+    
+    '''
+    policy = RetryPolicy(backoff=0, budget_ratio=0.5, budget_reserve=2)
+    started = policy.start()
+    response = Mock(status_code=503, headers={})
+    assert policy.next_delay(0, started, response=response) == 0
+    assert policy.next_delay(0, started, response=response) == 0
+    assert policy.next_delay(0, started, response=response) is None
+    policy.start()
+    policy.start()
+    assert policy.next_delay(0, started, response=response) == 0
+
+def test_rate_limiter_burst_then_rate():
+    ''' This function tests that the burst is free and the next requests wait for new tokens
+    
+    '''
+    limiter = RateLimiter(rate=100, burst=5)
+    started = time.monotonic()
+    for _ in range(5):
+        limiter.acquire()
+    assert limiter.waited == 0
+    for _ in range(5):
+        limiter.acquire()
+    assert time.monotonic() - started >= 0.04
+    assert limiter.waited > 0
+
+def test_rate_limiter_shared_between_threads():
+    ''' This function tests that threads sharing a limiter do not exceed the rate together
+    
+    '''
+    limiter = RateLimiter(rate=200, burst=1)
+    started = time.monotonic()
+    threads = [threading.Thread(target=lambda: [limiter.acquire() for _ in range(5)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.monotonic() - started >= 19 / 200
+
+@pytest.mark.asyncio
+async def test_rate_limiter_async():
+    ''' This function tests that tasks wait for the limiter without blocking the loop
+    
+    '''
+    limiter = RateLimiter(rate=200, burst=2)
+    started = time.monotonic()
+    await asyncio.gather(*(limiter.acquire_async() for _ in range(10)))
+    assert time.monotonic() - started >= 8 / 200
+
+def test_rate_limiter_invalid_rate():
+    ''' This function tests that the rate must be positive
+    
+    '''
+    with pytest.raises(ValueError):
+        RateLimiter(rate=0)
@@ -1,5 +1,6 @@
 import pytest
-from vinterunofficial import VinterValidation, VinterUrl
+from vinterunofficial import VinterValidation, VinterUrl, VinterTime
+from vinterunofficial.config import AssetUrl
 
 def test_classess():
     ''' This function tests the classes in the vinter_validation.py and vinter_url.py files
@@ -149,4 +150,84 @@ def test_get_websocket_url_no_symbol():
     asset_type = "single_assets"
     symbol = None
     with pytest.raises(ValueError):
-        VinterUrl.websocket_url(asset_type, symbol)
\ No newline at end of file
+        VinterUrl.websocket_url(asset_type, symbol)
+def test_get_url_unsupported_frequency():
+    '''It tests that the function `get_url` raises a `ValueError` for an asset type that is not
+    published at the frequency
+    
+    '''
+    with pytest.raises(ValueError):
+        VinterUrl.get_url("staking_yields", "r")
+    with pytest.raises(ValueError):
+        VinterUrl.get_url("multi_assets", None)
+
+def test_get_url_routes_every_asset_url():
+    '''> Every url of the AssetUrl enum is reachable through the routing tables
+    
+    '''
+    for asset_url in AssetUrl:
+        asset_type = asset_url.value["asset_type"].value
+        if asset_url.value["frequency"] is None:
+            assert VinterUrl.get_active_url(asset_type) == asset_url.value["url"]
+        else:
+            frequency = asset_url.value["frequency"].value
+            assert VinterUrl.get_url(asset_type, frequency) == asset_url.value["url"]
+
+def test_vinter_time_conversions():
+    '''> Dates, datetimes and timestamps in seconds or milliseconds are converted to milliseconds
+    
+    '''
+    assert VinterTime.to_timestamp_ms("2023-03-06") == 1678060800000
+    assert VinterTime.to_timestamp_ms("2023-03-06T00:00:00Z") == 1678060800000
+    assert VinterTime.to_timestamp_ms("2023-03-06T00:00:00.123Z") == 1678060800123
+    assert VinterTime.to_timestamp_ms(1678060800) == 1678060800000
+    assert VinterTime.to_timestamp_ms(1678060800123) == 1678060800123
+    assert VinterTime.format_timestamp(1678060800123) == "2023-03-06T00:00:00.123Z"
+    assert VinterTime.row_timestamp({"date": "2023-03-06T00:00:00.000Z"}) == 1678060800000
+
+def test_vinter_time_invalid():
+    '''It raises a ValueError if the datetime is not in a supported format
+    
+    '''
+    with pytest.raises(ValueError) as e:
+        VinterTime.to_timestamp_ms("06/03/2023")
+    assert "The datetime must be in the format" in str(e.value)
+
+def test_vinter_time_split_range():
+    '''> The range is split into consecutive half-open windows
+    
+    '''
+    assert VinterTime.split_range(0, 25, 10) == [(0, 10), (10, 20), (20, 25)]
+    assert VinterTime.split_range(0, 0, 10) == []
+    with pytest.raises(ValueError):
+        VinterTime.split_range(0, 10, 0)
+
+def test_vinter_time_plan_windows():
+    '''> The default window holds limit rows of the frequency
+    
+    '''
+    windows = VinterTime.plan_windows("d", start="2021-01-01", end="2021-01-21", limit=7)
+    assert len(windows) == 4
+    assert windows[0] == (1609459200000, 1609459200000 + 6 * 86400000)
+
+def test_vinter_time_intervals():
+    '''> Intervals are merged and the gaps of a range are found
+    
+    '''
+    assert VinterTime.merge_intervals([(5, 7), (1, 3), (3, 4), (6, 9), (10, 10)]) == [(1, 4), (5, 9)]
+    assert VinterTime.missing_intervals(0, 20, [(5, 7), (1, 3), (12, 30)]) == [(0, 1), (3, 5), (7, 12)]
+    assert VinterTime.missing_intervals(0, 5, []) == [(0, 5)]
+    assert VinterTime.missing_intervals(2, 4, [(0, 10)]) == []
+
+def test_parse_dates_and_date_ranges():
+    ''' This function tests that dates are sorted, deduplicated and merged into ranges of consecutive days
+    
+    '''
+    days = VinterValidation.parse_dates(["2022-03-20", "2017-01-01", "2022-03-18", "2022-03-19", "2017-01-01"])
+    assert [day.isoformat() for day in days] == ["2017-01-01", "2022-03-18", "2022-03-19", "2022-03-20"]
+    ranges = VinterTime.date_ranges(days)
+    assert [(first.isoformat(), last.isoformat()) for first, last in ranges] == [("2017-01-01", "2017-01-01"), ("2022-03-18", "2022-03-20")]
+    assert VinterTime.date_ranges([]) == []
+    for invalid in (["2022-02-30"], ["2022-3-01"], ["20220301"]):
+        with pytest.raises(ValueError):
+            VinterValidation.parse_dates(invalid)
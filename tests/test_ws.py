@@ -32,3 +32,20 @@ def test_validate_class():
     vinter_api_ws.open()
     vinter_api_ws.close()
 
+def test_decode_messages():
+    ''' This function tests that messages are decoded before they are passed to on_message
+    
+    '''
+    received = []
+    vinter_api_ws = VinterAPIWS(
+        symbol="btc-usd-p-d",
+        token="",
+        asset_type="multi_assets",
+        on_message=lambda ws, message: received.append(message),
+        on_error=None,
+        on_close=None,
+        on_open=None,
+        decode_messages=True,
+    )
+    vinter_api_ws._handle_message(None, '{"symbol": "btc-usd-p-d", "value": 1000}')
+    assert received == [{"symbol": "btc-usd-p-d", "value": 1000}]
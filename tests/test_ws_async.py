@@ -0,0 +1,112 @@
+import json
+import asyncio
+import pytest
+from vinterunofficial import VinterAPIWSAsync
+
+websockets = pytest.importorskip("websockets")
+
+async def serve(messages, close_code=1000):
+    ''' This function starts a local server sending messages to every client and returns the server and
+    its url
+    
+    '''
+    async def handler(connection, *args):
+        for message in messages:
+            await connection.send(json.dumps(message))
+        if close_code is None:
+            await connection.wait_closed()
+        await connection.close(close_code)
+
+    server = await websockets.serve(handler, "127.0.0.1", 0)
+    port = next(iter(server.sockets)).getsockname()[1]
+    return server, f"ws://127.0.0.1:{port}"
+
+def make_client(url, **kwargs):
+    ws = VinterAPIWSAsync(symbol="btc-usd-p-r", token="", asset_type="single_assets", **kwargs)
+    ws.url = url
+    return ws
+
+@pytest.mark.asyncio
+async def test_async_iteration_until_closed():
+    ''' This function tests that messages are decoded and iterated until the server closes the connection
+    
+    '''
+    messages = [{"symbol": "btc-usd-p-r", "value": value} for value in range(5)]
+    server, url = await serve(messages)
+
+    async with make_client(url, decode_messages=True) as ws:
+        received = [message async for message in ws]
+
+    assert received == messages
+    server.close()
+    await server.wait_closed()
+
+@pytest.mark.asyncio
+async def test_drop_oldest_keeps_latest_messages():
+    ''' This function tests that a full buffer drops the oldest messages when drop_oldest is True
+    
+    '''
+    server, url = await serve([{"value": value} for value in range(5)])
+
+    async with make_client(url, decode_messages=True, buffer_size=2, drop_oldest=True) as ws:
+        while ws.dropped < 3:
+            await asyncio.sleep(0.01)
+        received = [message["value"] async for message in ws]
+
+    assert received == [3, 4]
+    server.close()
+    await server.wait_closed()
+
+@pytest.mark.asyncio
+async def test_close_ends_pending_iteration():
+    ''' This function tests that closing the client ends an iteration waiting for a message and that
+    the waiting task can be cancelled without leaving the client open
+    
+    '''
+    server, url = await serve([], close_code=None)
+    ws = make_client(url)
+    await ws.open()
+
+    async def consume():
+        return [message async for message in ws]
+
+    consumer = asyncio.ensure_future(consume())
+    await asyncio.sleep(0.05)
+    await ws.close()
+    assert await asyncio.wait_for(consumer, 1) == []
+
+    await ws.open()
+    waiting = asyncio.ensure_future(ws.__anext__())
+    await asyncio.sleep(0.05)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    await ws.close()
+    assert ws.ws is None
+    server.close()
+    await server.wait_closed()
+
+@pytest.mark.asyncio
+async def test_error_is_raised_after_buffered_messages():
+    ''' This function tests that an abnormal close is raised once the messages received before it were read
+    
+    '''
+    server, url = await serve(["first"], close_code=1011)
+
+    async with make_client(url) as ws:
+        assert await ws.__anext__() == '"first"'
+        with pytest.raises(websockets.ConnectionClosed):
+            await ws.__anext__()
+
+    server.close()
+    await server.wait_closed()
+
+def test_not_open():
+    ''' This function tests that iterating a client that was not opened raises an error
+    
+    '''
+    ws = make_client("ws://127.0.0.1:1")
+    with pytest.raises(RuntimeError):
+        asyncio.run(ws.__anext__())
+    with pytest.raises(ValueError):
+        make_client("ws://127.0.0.1:1", buffer_size=0)
@@ -1,6 +1,23 @@
 from .vinter_sdk import VinterAPI
 from .vinter_sdk_async import VinterAPIAsync
-from .utils import VinterUrl, VinterValidation
+from .utils import VinterUrl, VinterValidation, VinterTime, BatchResult
 from .vinter_sdk_ws import VinterAPIWS
+from .vinter_sdk_ws_async import VinterAPIWSAsync
+from .cache import TTLCache, PersistentCatalogCache, WindowCache
+from .catalog import ActiveCatalog
+from .store import HistoryStore
+from .transport import (
+    RevalidationCache,
+    AsyncSingleFlight,
+    RetryPolicy,
+    RateLimiter,
+    build_client,
+    build_async_client,
+)
+from .series import merge_rows, TimeSeries
+from .frames import to_numpy, to_pandas
+from .streaming import JsonArrayStream, iter_json_array, aiter_json_array
+from .export import write_csv, write_json, write_ndjson, iter_ndjson
+from .archive import write_archive, open_archive
 
 __version__ = "0.1.9"
\ No newline at end of file
@@ -0,0 +1,112 @@
+import mmap
+import struct
+import sys
+from array import array
+from typing import Iterable, Union
+from .series import TimeSeries
+
+# magic, version, header size, reserved, number of points, symbol (utf-8, null padded)
+HEADER = struct.Struct("<8sHHIQ40s")
+MAGIC = b"VINTERTS"
+VERSION = 1
+
+
+def _little_endian(column: Union[array, memoryview], typecode: str):
+    """This function returns the column in little endian byte order, copying it on big endian hosts"""
+    if sys.byteorder == "little":
+        return column
+
+    swapped = array(typecode, column)
+    swapped.byteswap()
+    return swapped
+
+
+def write_archive(data: Union[TimeSeries, Iterable[dict]], filename: str) -> int:
+    """This function saves the timestamps and values of a history result to a binary series archive
+
+    The archive is a 64 byte header followed by the int64 timestamps in ms and the float64 values,
+    both little endian, so it can be opened with open_archive or numpy.memmap without parsing. Only
+    the symbol, the timestamps and the values are kept, the side columns are not.
+
+    Parameters
+    ----------
+    data : TimeSeries | Iterable[dict]
+        A TimeSeries or the rows returned by get_data_by_time.
+    filename : str
+        The name of the file to write to. It is replaced if it exists.
+
+    Returns
+    -------
+        The number of points written
+
+    """
+    if not isinstance(data, TimeSeries):
+        data = TimeSeries.from_rows(data if isinstance(data, list) else list(data))
+
+    symbol = (data.symbol or "").encode()
+    if len(symbol) > 40:
+        raise ValueError(f"The symbol {data.symbol} is longer than 40 bytes")
+
+    header = HEADER.pack(MAGIC, VERSION, HEADER.size, 0, len(data), symbol)
+
+    with open(filename, "wb") as f:
+        f.write(header)
+        f.write(_little_endian(data.timestamps, "q"))
+        f.write(_little_endian(data.values, "d"))
+
+    return len(data)
+
+
+def open_archive(filename: str) -> TimeSeries:
+    """This function opens a binary series archive written by write_archive without reading it
+
+    The file is memory mapped and the timestamps and values of the series are memoryviews over the
+    mapping, so opening is instant whatever the size of the series and pages are only read from disk
+    when they are used. to_numpy, to_pandas and slicing share the mapping without copying. The file
+    stays mapped until the series and every view of it are released.
+
+    Parameters
+    ----------
+    filename : str
+        The name of the archive.
+
+    Returns
+    -------
+        A TimeSeries whose timestamps and values are read-only memoryviews of int64 and float64
+
+    """
+    with open(filename, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(buffer) < HEADER.size:
+        buffer.close()
+        raise ValueError(f"The file {filename} is not a series archive")
+
+    magic, version, header_size, _, count, symbol = HEADER.unpack_from(buffer)
+
+    if magic != MAGIC:
+        buffer.close()
+        raise ValueError(f"The file {filename} is not a series archive")
+
+    if version != VERSION:
+        buffer.close()
+        raise ValueError(f"The series archive version {version} is not supported")
+
+    values_offset = header_size + 8 * count
+    if len(buffer) != values_offset + 8 * count:
+        buffer.close()
+        raise ValueError(f"The series archive {filename} is truncated")
+
+    view = memoryview(buffer)
+    timestamps = view[header_size:values_offset].cast("q")
+    values = view[values_offset:].cast("d")
+
+    if sys.byteorder != "little":
+        timestamps = _little_endian(timestamps, "q")
+        values = _little_endian(values, "d")
+
+    return TimeSeries(
+        symbol=symbol.rstrip(b"\0").decode() or None,
+        timestamps=timestamps,
+        values=values,
+    )
@@ -0,0 +1,499 @@
+import sys
+import time
+import bisect
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Hashable, Iterable, Union
+from . import codec
+from .utils import VinterTime
+
+
+class TTLCache:
+    def __init__(self, ttl: Union[int, float, None] = 60):
+        """This function creates an in-memory cache whose entries expire after ttl seconds
+
+        Parameters
+        ----------
+        ttl : int | float | None
+            The number of seconds an entry stays valid. A ttl of 0 or None disables the cache.
+        """
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._store = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """True if the cache stores entries at all"""
+        return bool(self.ttl)
+
+    def get(self, key: Hashable) -> Any:
+        """This function returns the cached value for the key, or None if it is missing or expired
+
+        Parameters
+        ----------
+        key : Hashable
+            The key the value was stored under.
+
+        Returns
+        -------
+            The cached value or None
+
+        """
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+
+            if entry is not None:
+                del self._store[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """This function stores the value under the key for ttl seconds
+
+        Parameters
+        ----------
+        key : Hashable
+            The key to store the value under.
+        value : Any
+            The value to cache.
+
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._store[key] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self, key: Hashable = None) -> None:
+        """This function drops the entry for the key, or every entry if no key is given
+
+        Parameters
+        ----------
+        key : Hashable
+            The key to drop. If None the whole cache is cleared.
+
+        """
+        with self._lock:
+            if key is None:
+                self._store.clear()
+            else:
+                self._store.pop(key, None)
+
+    def info(self) -> dict:
+        """This function returns the hit/miss counters and the current size of the cache
+
+        Returns
+        -------
+            A dictionary with the keys hits, misses, size and ttl
+
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._store),
+                "ttl": self.ttl,
+            }
+
+
+class PersistentCatalogCache:
+    FRESH = "fresh"
+    STALE = "stale"
+    MISSING = "missing"
+
+    def __init__(
+        self,
+        path: str,
+        ttl: Union[int, float] = 300,
+        stale_ttl: Union[int, float] = 3600,
+        refresh_lease: Union[int, float] = 30,
+    ):
+        """This function creates an on-disk catalog cache in a sqlite database that every process on
+        the host can share
+
+        Parameters
+        ----------
+        path : str
+            The path of the sqlite database file. It is created if it does not exist.
+        ttl : int | float
+            The number of seconds an entry is fresh.
+        stale_ttl : int | float
+            The number of seconds after ttl during which an entry is still served while it is refreshed
+            in the background.
+        refresh_lease : int | float
+            The number of seconds one process owns the background refresh of an entry, so the other
+            processes keep serving the stale entry instead of refreshing it too.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.refresh_lease = refresh_lease
+
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS catalog ("
+                "key TEXT PRIMARY KEY, "
+                "payload TEXT NOT NULL, "
+                "fetched_at REAL NOT NULL, "
+                "refreshing_until REAL NOT NULL DEFAULT 0)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        """This function opens a connection to the database and closes it afterwards. A connection is
+        opened per operation so the cache can be used from any thread or process"""
+        connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    def get(self, key: str) -> tuple:
+        """This function returns the stored payload for the key and whether it is fresh or stale
+
+        Parameters
+        ----------
+        key : str
+            The key the payload was stored under.
+
+        Returns
+        -------
+            A tuple of the payload and one of "fresh", "stale" or "missing". The payload is None if
+            the entry is missing or older than ttl + stale_ttl.
+
+        """
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT payload, fetched_at FROM catalog WHERE key = ?", (key,)
+            ).fetchone()
+
+        if row is None:
+            return None, self.MISSING
+
+        age = time.time() - row[1]
+
+        if age < self.ttl:
+            return codec.loads(row[0]), self.FRESH
+
+        if age < self.ttl + self.stale_ttl:
+            return codec.loads(row[0]), self.STALE
+
+        return None, self.MISSING
+
+    def set(self, key: str, payload: Any) -> None:
+        """This function stores the payload under the key and releases its refresh lease
+
+        Parameters
+        ----------
+        key : str
+            The key to store the payload under.
+        payload : Any
+            A JSON serializable payload.
+
+        """
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO catalog (key, payload, fetched_at, refreshing_until) "
+                "VALUES (?, ?, ?, 0)",
+                (key, codec.dumps(payload), time.time()),
+            )
+
+    def try_acquire_refresh(self, key: str) -> bool:
+        """This function takes the refresh lease of the key if no other process holds it
+
+        Parameters
+        ----------
+        key : str
+            The key to refresh.
+
+        Returns
+        -------
+            True if the caller should refresh the entry
+
+        """
+        now = time.time()
+
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "UPDATE catalog SET refreshing_until = ? "
+                "WHERE key = ? AND refreshing_until < ?",
+                (now + self.refresh_lease, key, now),
+            )
+
+        return cursor.rowcount == 1
+
+    def release_refresh(self, key: str) -> None:
+        """This function gives up the refresh lease of the key, e.g. after a failed refresh
+
+        Parameters
+        ----------
+        key : str
+            The key that was being refreshed.
+
+        """
+        with self._connect() as connection:
+            connection.execute(
+                "UPDATE catalog SET refreshing_until = 0 WHERE key = ?", (key,)
+            )
+
+    def invalidate(self, key: str = None) -> None:
+        """This function drops the entry for the key, or every entry if no key is given
+
+        Parameters
+        ----------
+        key : str
+            The key to drop. If None the whole cache is cleared.
+
+        """
+        with self._connect() as connection:
+            if key is None:
+                connection.execute("DELETE FROM catalog")
+            else:
+                connection.execute("DELETE FROM catalog WHERE key = ?", (key,))
+
+
+class WindowCache:
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        """This function creates an in-memory cache of closed history windows indexed by time interval
+
+        Each symbol has a sorted index of the intervals (segments) it holds, so a query is answered
+        from the segments it overlaps and only the uncovered sub-ranges have to be fetched. Segments
+        are evicted least recently used first once their estimated size exceeds max_bytes.
+
+        Parameters
+        ----------
+        max_bytes : int
+            The maximum estimated size of the cached rows in bytes.
+        """
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+        # (symbol, start_ms) -> (end_ms, timestamps, rows, size), least recently used first
+        self._segments = OrderedDict()
+        # symbol -> sorted list of the start_ms of its segments
+        self._starts = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _estimate_size(rows: list) -> int:
+        """This function estimates the memory used by the rows in bytes"""
+        return sum(
+            sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row.values())
+            for row in rows
+        )
+
+    def _remove(self, symbol: str, start_ms: int) -> tuple:
+        """This function drops a segment from the index and returns it"""
+        segment = self._segments.pop((symbol, start_ms))
+        starts = self._starts[symbol]
+        starts.pop(bisect.bisect_left(starts, start_ms))
+        if not starts:
+            del self._starts[symbol]
+        self.size -= segment[3]
+        return segment
+
+    @staticmethod
+    def _dedupe(keyed: Iterable[tuple]) -> tuple:
+        """This function sorts (timestamp, row) pairs and returns the timestamps and the rows, keeping
+        one row per timestamp"""
+        timestamps = []
+        rows = []
+        for timestamp, row in sorted(keyed, key=lambda item: item[0]):
+            if not timestamps or timestamps[-1] != timestamp:
+                timestamps.append(timestamp)
+                rows.append(row)
+        return timestamps, rows
+
+    def _insert(
+        self,
+        symbol: str,
+        start_ms: int,
+        end_ms: int,
+        timestamps: list,
+        rows: list,
+        size: int,
+    ) -> None:
+        """This function adds a segment to the index as the most recently used one"""
+        self._segments[(symbol, start_ms)] = (end_ms, timestamps, rows, size)
+        bisect.insort(self._starts.setdefault(symbol, []), start_ms)
+        self.size += size
+
+    def _overlapping(self, symbol: str, start_ms: int, end_ms: int) -> list:
+        """This function returns the start_ms of the segments of the symbol overlapping [start_ms, end_ms)"""
+        starts = self._starts.get(symbol, [])
+        # The segment starting before start_ms may reach into the range
+        index = max(bisect.bisect_right(starts, start_ms) - 1, 0)
+        overlapping = []
+        for segment_start in starts[index:]:
+            if segment_start >= end_ms:
+                break
+            if self._segments[(symbol, segment_start)][0] > start_ms:
+                overlapping.append(segment_start)
+        return overlapping
+
+    def lookup(self, symbol: str, start_ms: int, end_ms: int) -> tuple:
+        """This function returns the cached rows of the symbol in [start_ms, end_ms) and the sub-ranges
+        that are not cached
+
+        Parameters
+        ----------
+        symbol : str
+            The symbol of the asset.
+        start_ms : int
+            The start of the period in milliseconds.
+        end_ms : int
+            The end of the period in milliseconds, excluded.
+
+        Returns
+        -------
+            A tuple of a list of row lists, one per cached segment in time order, and a list of the
+            (start_ms, end_ms) gaps
+
+        """
+        with self._lock:
+            chunks = []
+            covered = []
+            for segment_start in self._overlapping(symbol, start_ms, end_ms):
+                key = (symbol, segment_start)
+                segment_end, timestamps, rows, _ = self._segments[key]
+                self._segments.move_to_end(key)
+                low = bisect.bisect_left(timestamps, start_ms)
+                high = bisect.bisect_left(timestamps, end_ms)
+                chunks.append(rows[low:high])
+                covered.append((segment_start, segment_end))
+
+            gaps = VinterTime.missing_intervals(start_ms, end_ms, covered)
+            if gaps:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+            return chunks, gaps
+
+    def put(self, symbol: str, start_ms: int, end_ms: int, rows: list) -> None:
+        """This function caches the rows of the symbol for the closed window [start_ms, end_ms)
+
+        Segments overlapping or touching the window are merged with it, unless the merged segment would
+        be larger than max_bytes. The window is not cached if it is larger than max_bytes on its own.
+
+        Parameters
+        ----------
+        symbol : str
+            The symbol of the asset.
+        start_ms : int
+            The start of the window in milliseconds.
+        end_ms : int
+            The end of the window in milliseconds, excluded.
+        rows : list
+            Every row of the symbol in the window, oldest first.
+
+        """
+        if start_ms >= end_ms:
+            return
+
+        timestamps, window = self._dedupe(
+            (VinterTime.row_timestamp(row), row)
+            for row in rows
+            if start_ms <= VinterTime.row_timestamp(row) < end_ms
+        )
+        size = self._estimate_size(window)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            # Adjacent segments are merged too, so -1 and +1 widen the search
+            neighbours = self._overlapping(symbol, start_ms - 1, end_ms + 1)
+            keyed = list(zip(timestamps, window))
+            merged_start, merged_end = start_ms, end_ms
+            for segment_start in neighbours:
+                segment_end, segment_timestamps, segment_rows, _ = self._segments[
+                    (symbol, segment_start)
+                ]
+                keyed.extend(zip(segment_timestamps, segment_rows))
+                merged_start = min(merged_start, segment_start)
+                merged_end = max(merged_end, segment_end)
+
+            merged_timestamps, merged = self._dedupe(keyed)
+            merged_size = self._estimate_size(merged)
+
+            if merged_size <= self.max_bytes:
+                for segment_start in neighbours:
+                    self._remove(symbol, segment_start)
+                self._insert(
+                    symbol,
+                    merged_start,
+                    merged_end,
+                    merged_timestamps,
+                    merged,
+                    merged_size,
+                )
+            else:
+                # The merged segment would not fit, so the neighbours stay as they are and the parts
+                # of the window they don't cover are kept as segments of their own
+                covered = [
+                    (segment_start, self._segments[(symbol, segment_start)][0])
+                    for segment_start in neighbours
+                ]
+                for gap_start, gap_end in VinterTime.missing_intervals(
+                    start_ms, end_ms, covered
+                ):
+                    low = bisect.bisect_left(timestamps, gap_start)
+                    high = bisect.bisect_left(timestamps, gap_end)
+                    self._insert(
+                        symbol,
+                        gap_start,
+                        gap_end,
+                        timestamps[low:high],
+                        window[low:high],
+                        self._estimate_size(window[low:high]),
+                    )
+
+            # The new segments are the most recently used, so other segments are evicted first
+            while self.size > self.max_bytes:
+                evicted_symbol, evicted_start = next(iter(self._segments))
+                self._remove(evicted_symbol, evicted_start)
+
+    def invalidate(self, symbol: str = None) -> None:
+        """This function drops the segments of the symbol, or every segment if no symbol is given
+
+        Parameters
+        ----------
+        symbol : str
+            The symbol to drop. If None the whole cache is cleared.
+
+        """
+        with self._lock:
+            if symbol is None:
+                self._segments.clear()
+                self._starts.clear()
+                self.size = 0
+                return
+
+            for segment_start in list(self._starts.get(symbol, [])):
+                self._remove(symbol, segment_start)
+
+    def info(self) -> dict:
+        """This function returns the hit/miss counters and the current size of the cache
+
+        Returns
+        -------
+            A dictionary with the keys hits, misses, segments, bytes and max_bytes
+
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "segments": len(self._segments),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+            }
@@ -0,0 +1,99 @@
+from typing import Union
+from .config import INDEX_METADATA_FIELDS
+
+
+class ActiveCatalog:
+    def __init__(self, assets: list):
+        """This function takes in the list of active assets and indexes it by symbol and by frequency
+
+        The index is built once per download so symbol and frequency lookups don't scan the catalog.
+
+        Parameters
+        ----------
+        assets : list
+            The list of active assets as returned by the active_* endpoints.
+        """
+        self.assets = assets
+        self.by_symbol = {}
+        self.by_frequency = {}
+        self.symbols_by_frequency = {}
+
+        for asset in assets:
+            symbol = asset["symbol"]
+            frequency = symbol.rsplit("-", 1)[-1]
+
+            # Keep the first entry like the linear scan did
+            self.by_symbol.setdefault(symbol, asset)
+            self.by_frequency.setdefault(frequency, []).append(asset)
+            self.symbols_by_frequency.setdefault(frequency, []).append(symbol)
+
+        self.symbols = [asset["symbol"] for asset in assets]
+
+    def __len__(self) -> int:
+        return len(self.assets)
+
+    def __iter__(self):
+        return iter(self.assets)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.by_symbol
+
+    def get(self, symbol: str) -> Union[dict, None]:
+        """This function returns the active asset for the symbol, or None if it is not in the catalog
+
+        Parameters
+        ----------
+        symbol : str
+            The symbol of the asset you want to get data for.
+
+        Returns
+        -------
+            The dictionary of the active asset or None
+
+        """
+        return self.by_symbol.get(symbol)
+
+    def filter(
+        self, frequency: str = None, symbol_only: bool = False
+    ) -> Union[list, dict]:
+        """This function returns the active assets, optionally only the ones for a frequency
+
+        Parameters
+        ----------
+        frequency : str
+            The frequency to filter by. If None every asset is returned.
+        symbol_only : bool
+            If True only the symbols are returned.
+
+        Returns
+        -------
+            A new list of the active assets or symbols
+
+        """
+        if frequency is None:
+            data = self.symbols if symbol_only else self.assets
+        elif symbol_only:
+            data = self.symbols_by_frequency.get(frequency, [])
+        else:
+            data = self.by_frequency.get(frequency, [])
+
+        # Copy so callers can't modify the index
+        return list(data)
+
+    def metadata(self, symbol: str, fields: tuple = INDEX_METADATA_FIELDS) -> dict:
+        """This function returns the schedule and weight fields of the symbol in one dictionary
+
+        Parameters
+        ----------
+        symbol : str
+            The symbol of the asset you want to get data for.
+        fields : tuple
+            The fields to return. Fields missing from the payload are None.
+
+        Returns
+        -------
+            A dictionary of the fields of the symbol
+
+        """
+        asset = self.by_symbol[symbol]
+        return {field: asset.get(field, None) for field in fields}
@@ -0,0 +1,119 @@
+import json
+import httpx
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+JSON_BACKENDS = ("orjson", "json")
+
+# orjson is used when it is installed, the standard library otherwise
+_backend = "orjson" if orjson is not None else "json"
+
+
+def get_json_backend() -> str:
+    """This function returns the name of the JSON backend in use
+
+    Returns
+    -------
+        "orjson" or "json"
+
+    """
+    return _backend
+
+
+def set_json_backend(name: str = None) -> str:
+    """This function selects the JSON backend used to decode responses and websocket messages and to
+    export data
+
+    Parameters
+    ----------
+    name : str
+        "orjson" or "json". If None orjson is used when it is installed and json otherwise.
+
+    Returns
+    -------
+        The name of the backend in use
+
+    """
+    global _backend
+
+    if name is None:
+        name = "orjson" if orjson is not None else "json"
+
+    if name not in JSON_BACKENDS:
+        raise ValueError(f"The JSON backend must be one of {list(JSON_BACKENDS)}")
+
+    if name == "orjson" and orjson is None:
+        raise ImportError(
+            "The orjson backend needs the orjson package. Install it with pip install orjson"
+        )
+
+    _backend = name
+    return _backend
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """This function decodes a JSON document with the selected backend
+
+    Parameters
+    ----------
+    data : bytes | str
+        The JSON document.
+
+    Returns
+    -------
+        The decoded document
+
+    """
+    if _backend == "orjson":
+        return orjson.loads(data)
+
+    return json.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """This function encodes an object to a JSON string with the selected backend
+
+    Parameters
+    ----------
+    obj : Any
+        The object to encode.
+    indent : bool
+        If True the document is indented, by 4 spaces with json and by 2 spaces with orjson which
+        supports no other indent. Otherwise it is compact, without spaces after the separators.
+
+    Returns
+    -------
+        The JSON string
+
+    """
+    if _backend == "orjson":
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+
+    if indent:
+        return json.dumps(obj, indent=4)
+
+    return json.dumps(obj, separators=(",", ":"))
+
+
+def decode_response(response) -> Any:
+    """This function decodes the JSON body of an httpx response with the selected backend
+
+    Parameters
+    ----------
+    response
+        The httpx response. Objects that are not httpx responses are decoded with their json method.
+
+    Returns
+    -------
+        The decoded body
+
+    """
+    # Response.json() always goes through the standard library, so decode the raw bytes instead
+    if _backend == "orjson" and isinstance(response, httpx.Response):
+        return orjson.loads(response.content)
+
+    return response.json()
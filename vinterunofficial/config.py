@@ -3,6 +3,17 @@ from enum import Enum
 APIBASE = "https://www.vinterapi.com/api/v3"
 WSBASE = "wss://www.vinterapi.com/ws"
 
+# Schedule and weight fields of an active asset returned by get_index_metadata
+INDEX_METADATA_FIELDS = (
+    "weights",
+    "next_rebalance_weights",
+    "previous_rebalance_date",
+    "next_rebalance_date",
+    "previous_review_date",
+    "next_review_date",
+    "contrib",
+)
+
 
 class WsAssetType(Enum):
     MULTI_ASSET = "multi_assets"
@@ -31,6 +42,14 @@ class Frequency(Enum):
     DAILY = "d"
 
 
+# Approximate spacing of the rows of each frequency, used to size the windows of range fetches
+FREQUENCY_INTERVAL_MS = {
+    Frequency.REAL_TIME.value: 1000,
+    Frequency.HOURLY.value: 3600 * 1000,
+    Frequency.DAILY.value: 86400 * 1000,
+}
+
+
 class FrequencyApiType(Enum):
     REAL_TIME = "real_time"
     HOURLY = "hourly"
@@ -122,3 +141,29 @@ class AssetUrl(Enum):
         "asset_type": AssetType.NAV,
         "url": f"{APIBASE}/{ActiveAssetType.NAV.value}",
     }
+
+
+# Routing tables built once at import time so resolving a url is a single dict lookup
+VALID_ASSET_TYPES = frozenset(asset_type.value for asset_type in AssetType)
+VALID_FREQUENCIES = frozenset(frequency.value for frequency in Frequency)
+VALID_WS_ASSET_TYPES = frozenset(asset_type.value for asset_type in WsAssetType)
+
+URL_ROUTES = {
+    (
+        asset_url.value["asset_type"].value,
+        asset_url.value["frequency"].value,
+    ): asset_url.value["url"]
+    for asset_url in AssetUrl
+    if asset_url.value["frequency"] is not None
+}
+
+ACTIVE_URL_ROUTES = {
+    asset_url.value["asset_type"].value: asset_url.value["url"]
+    for asset_url in AssetUrl
+    if asset_url.value["frequency"] is None
+}
+
+WS_URL_ROUTES = {
+    asset_url.value["asset_type"].value: asset_url.value["url"]
+    for asset_url in WsAssetUrl
+}
@@ -0,0 +1,221 @@
+import io
+import csv
+import gzip
+import itertools
+from typing import Iterable, Iterator, Union
+from . import codec
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+COMPRESSIONS = ("gzip", "zstd")
+
+# The number of lines encoded before they are handed to the file or the compressor
+_BATCH_LINES = 1024
+
+
+def write_csv(
+    rows: Union[dict, Iterable[dict]], filename: str, seprator: str = ","
+) -> int:
+    """This function streams rows to a csv file, appending to it if it exists
+
+    The rows are written one at a time with a single writer, so an iterable or generator of any
+    length is exported in constant memory. The header is the keys of the first row and is only
+    written when the file is empty, rows appended to a file follow the header it already has. Dict
+    and list values, like weights and contrib, are written as JSON strings without changing the rows.
+
+    Parameters
+    ----------
+    rows : dict | Iterable[dict]
+        The rows to write, e.g. a list, the generator of iter_data_by_time or a TimeSeries. The
+        values of a dictionary, like the result of get_data_by_date, are written as rows.
+    filename : str
+        The name of the file to write to.
+    seprator : str
+        The seprator of the columns.
+
+    Returns
+    -------
+        The number of rows written
+
+    """
+    if isinstance(rows, dict):
+        rows = rows.values()
+
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return 0
+
+    nested = (dict, list)
+    dumps = codec.dumps
+    count = 0
+
+    def encode(fields: list):
+        nonlocal count
+        for row in itertools.chain((first,), rows):
+            count += 1
+            # A missing field is written as an empty cell, like csv.DictWriter does
+            yield [
+                dumps(value) if isinstance(value, nested) else value
+                for value in map(row.get, fields)
+            ]
+
+    with open(filename, "a+", newline="") as f:
+        writer = csv.writer(f, delimiter=seprator, lineterminator="\n")
+
+        if f.tell() == 0:
+            fields = list(first)
+            writer.writerow(fields)
+        else:
+            f.seek(0)
+            fields = next(csv.reader(f, delimiter=seprator))
+            f.seek(0, 2)
+
+        writer.writerows(encode(fields))
+
+    return count
+
+
+def write_json(data: Union[dict, Iterable[dict]], filename: str) -> None:
+    """This function writes data to an indented JSON file, replacing it if it exists
+
+    Parameters
+    ----------
+    data : dict | Iterable[dict]
+        A dictionary, or rows which are written as a JSON array.
+    filename : str
+        The name of the file to write to.
+
+    """
+    if not isinstance(data, (dict, list)):
+        data = list(data)
+
+    with open(filename, "w") as f:
+        f.write(codec.dumps(data, indent=True))
+
+
+def _compression(filename: str, compression: Union[str, None]) -> Union[str, None]:
+    """This function resolves the compression of a file, inferring it from the extension if asked"""
+    if compression == "infer":
+        name = str(filename)
+        if name.endswith(".gz"):
+            compression = "gzip"
+        elif name.endswith(".zst"):
+            compression = "zstd"
+        else:
+            compression = None
+
+    if compression is not None and compression not in COMPRESSIONS:
+        raise ValueError(f"The compression must be one of {list(COMPRESSIONS)} or None")
+
+    if compression == "zstd" and zstandard is None:
+        raise ImportError(
+            "The zstd compression needs the zstandard package. Install it with pip install vinterunofficial[zstd]"
+        )
+
+    return compression
+
+
+def write_ndjson(
+    rows: Union[dict, Iterable[dict]],
+    filename: str,
+    compression: str = "infer",
+    append: bool = False,
+) -> int:
+    """This function streams rows to a newline delimited JSON file, one compact JSON object per line
+
+    The rows are encoded and compressed in small batches, so an iterable or generator of any length is
+    exported in constant memory. Gzip members and zstd frames can be concatenated, so appending to a
+    compressed file gives a file that reads back as one.
+
+    Parameters
+    ----------
+    rows : dict | Iterable[dict]
+        The rows to write, e.g. a list, the generator of iter_data_by_time or a TimeSeries. The
+        values of a dictionary, like the result of get_data_by_date, are written as rows.
+    filename : str
+        The name of the file to write to.
+    compression : str
+        "gzip", "zstd" or None. "infer" uses gzip for a .gz file, zstd for a .zst file and no
+        compression otherwise. zstd needs the zstandard package (pip install vinterunofficial[zstd]).
+    append : bool
+        If True the rows are added at the end of the file instead of replacing it.
+
+    Returns
+    -------
+        The number of rows written
+
+    """
+    compression = _compression(filename, compression)
+
+    if isinstance(rows, dict):
+        rows = rows.values()
+
+    rows = iter(rows)
+    dumps = codec.dumps
+    count = 0
+
+    with open(filename, "ab" if append else "wb") as raw:
+        if compression == "gzip":
+            f = gzip.GzipFile(fileobj=raw, mode="wb")
+        elif compression == "zstd":
+            f = zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+        else:
+            f = raw
+
+        try:
+            while True:
+                batch = [dumps(row) for row in itertools.islice(rows, _BATCH_LINES)]
+                if not batch:
+                    break
+
+                count += len(batch)
+                batch.append("")
+                f.write("\n".join(batch).encode())
+        finally:
+            if f is not raw:
+                f.close()
+
+    return count
+
+
+def iter_ndjson(filename: str, compression: str = "infer") -> Iterator[dict]:
+    """This function reads a newline delimited JSON file written by write_ndjson one row at a time
+
+    Only the line being decoded is held in memory, whatever the size of the file.
+
+    Parameters
+    ----------
+    filename : str
+        The name of the file to read.
+    compression : str
+        "gzip", "zstd" or None. "infer" uses gzip for a .gz file, zstd for a .zst file and no
+        compression otherwise.
+
+    Yields
+    ------
+        The rows of the file, in the order they were written
+
+    """
+    compression = _compression(filename, compression)
+
+    with open(filename, "rb") as raw:
+        if compression == "gzip":
+            f = gzip.GzipFile(fileobj=raw, mode="rb")
+        elif compression == "zstd":
+            f = io.BufferedReader(
+                zstandard.ZstdDecompressor().stream_reader(
+                    raw, read_across_frames=True, closefd=False
+                )
+            )
+        else:
+            f = raw
+
+        with f:
+            loads = codec.loads
+            for line in f:
+                if line.strip():
+                    yield loads(line)
@@ -0,0 +1,115 @@
+import importlib
+from typing import Iterable, Union
+from .series import TimeSeries
+
+
+def _require(module: str):
+    """This function imports an optional dependency or raises an ImportError telling how to install it"""
+    try:
+        return importlib.import_module(module)
+    except ImportError as error:
+        raise ImportError(
+            f"This function needs {module}. Install it with pip install vinterunofficial[{module}]"
+        ) from error
+
+
+def _timestamps(np, rows: list):
+    """This function returns the timestamps of the rows as a datetime64[ms] array
+
+    Numeric timestamps are read in one pass into a typed array and the ones in seconds are scaled in
+    vectorized form, date and datetime strings are parsed by numpy.
+    """
+    if rows and all(isinstance(row.get("timestamp"), (int, float)) for row in rows):
+        timestamps = np.fromiter(
+            (row["timestamp"] for row in rows), dtype=np.float64, count=len(rows)
+        )
+        # Timestamps in seconds stay below 1e11 until the year 5138
+        timestamps = np.where(timestamps < 1e11, timestamps * 1000, timestamps)
+        return timestamps.astype(np.int64).view("datetime64[ms]")
+
+    texts = np.array(
+        [
+            row["timestamp"] if row.get("timestamp") is not None else row["date"]
+            for row in rows
+        ],
+        dtype=str,
+    )
+    # numpy parses naive ISO strings only, every time of the API is in UTC
+    return np.char.rstrip(texts, "Z").astype("datetime64[ms]")
+
+
+def to_numpy(data: Union[TimeSeries, Iterable[dict]]) -> tuple:
+    """This function returns the timestamps and values of a history result as numpy arrays
+
+    The arrays of a TimeSeries are shared without copying. The rows of a list are read straight into
+    typed arrays without building intermediate Python lists.
+
+    Parameters
+    ----------
+    data : TimeSeries | Iterable[dict]
+        A TimeSeries or the rows returned by get_data_by_time.
+
+    Returns
+    -------
+        A tuple of a datetime64[ms] array of the timestamps and a float64 array of the values
+
+    """
+    np = _require("numpy")
+
+    if isinstance(data, TimeSeries):
+        timestamps = np.frombuffer(data.timestamps, dtype=np.int64)
+        values = np.frombuffer(data.values, dtype=np.float64)
+        return timestamps.view("datetime64[ms]"), values
+
+    rows = data if isinstance(data, list) else list(data)
+    values = np.fromiter(
+        (np.nan if row.get("value") is None else row["value"] for row in rows),
+        dtype=np.float64,
+        count=len(rows),
+    )
+
+    return _timestamps(np, rows), values
+
+
+def to_pandas(data: Union[TimeSeries, Iterable[dict]], fields: Iterable[str] = None):
+    """This function returns a history result as a pandas DataFrame indexed by timestamp
+
+    Parameters
+    ----------
+    data : TimeSeries | Iterable[dict]
+        A TimeSeries or the rows returned by get_data_by_time.
+    fields : Iterable[str]
+        The other fields to add as columns. If None every field is added, pass an empty tuple to
+        only keep the values.
+
+    Returns
+    -------
+        A DataFrame with a UTC DatetimeIndex named timestamp and a float64 value column
+
+    """
+    pd = _require("pandas")
+
+    if not isinstance(data, (TimeSeries, list)):
+        data = list(data)
+
+    timestamps, values = to_numpy(data)
+    columns = {"value": values}
+
+    if isinstance(data, TimeSeries):
+        side = dict(data.columns)
+        if data.symbol is not None:
+            side["symbol"] = [data.symbol] * len(data)
+        if fields is not None:
+            side = {field: side[field] for field in fields if field in side}
+        columns.update(side)
+    else:
+        if fields is None:
+            names = {}
+            for row in data:
+                names.update(dict.fromkeys(row))
+            fields = [name for name in names if name not in ("timestamp", "value")]
+        for field in fields:
+            columns[field] = [row.get(field) for row in data]
+
+    index = pd.DatetimeIndex(timestamps, name="timestamp").tz_localize("UTC")
+    return pd.DataFrame(columns, index=index, copy=False)
@@ -0,0 +1,188 @@
+import sqlite3
+from contextlib import contextmanager
+from typing import Iterable
+from . import codec
+from .utils import VinterTime
+
+
+class HistoryStore:
+    def __init__(self, path: str):
+        """This function creates a local store of history rows in a sqlite database
+
+        Next to the rows the store keeps, per symbol, the intervals that were synced, so a sync only
+        requests the parts of a period that were never fetched.
+
+        Parameters
+        ----------
+        path : str
+            The path of the sqlite database file. It is created if it does not exist.
+        """
+        self.path = path
+
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS rows ("
+                "symbol TEXT NOT NULL, "
+                "timestamp INTEGER NOT NULL, "
+                "payload TEXT NOT NULL, "
+                "PRIMARY KEY (symbol, timestamp)) WITHOUT ROWID"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS coverage ("
+                "symbol TEXT NOT NULL, "
+                "start_ms INTEGER NOT NULL, "
+                "end_ms INTEGER NOT NULL, "
+                "PRIMARY KEY (symbol, start_ms))"
+            )
+
+    @contextmanager
+    def _connect(self):
+        """This function opens a connection to the database and closes it afterwards. A connection is
+        opened per operation so the store can be used from any thread or process"""
+        connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    def coverage(self, symbol: str) -> list:
+        """This function returns the intervals of the symbol that were synced
+
+        Parameters
+        ----------
+        symbol : str
+            The symbol of the asset.
+
+        Returns
+        -------
+            A sorted list of disjoint (start_ms, end_ms) tuples
+
+        """
+        with self._connect() as connection:
+            return [
+                tuple(row)
+                for row in connection.execute(
+                    "SELECT start_ms, end_ms FROM coverage WHERE symbol = ? ORDER BY start_ms",
+                    (symbol,),
+                )
+            ]
+
+    def missing(self, symbol: str, start_ms: int, end_ms: int) -> list:
+        """This function returns the parts of [start_ms, end_ms) that were not synced for the symbol
+
+        Parameters
+        ----------
+        symbol : str
+            The symbol of the asset.
+        start_ms : int
+            The start of the period in milliseconds.
+        end_ms : int
+            The end of the period in milliseconds, excluded.
+
+        Returns
+        -------
+            A sorted list of the (start_ms, end_ms) gaps
+
+        """
+        return VinterTime.missing_intervals(start_ms, end_ms, self.coverage(symbol))
+
+    def add(self, symbol: str, rows: Iterable[dict], start_ms: int, end_ms: int) -> int:
+        """This function stores the rows fetched for [start_ms, end_ms) and marks the interval as synced
+
+        The rows and the coverage are written in one transaction, so an interrupted sync leaves the
+        interval missing rather than covered without its rows.
+
+        Parameters
+        ----------
+        symbol : str
+            The symbol of the asset.
+        rows : Iterable[dict]
+            The rows returned by the API for the interval.
+        start_ms : int
+            The start of the interval in milliseconds.
+        end_ms : int
+            The end of the interval in milliseconds, excluded. If it is not after start_ms only the
+            rows are stored.
+
+        Returns
+        -------
+            The number of rows stored
+
+        """
+        records = [
+            (symbol, VinterTime.row_timestamp(row), codec.dumps(row)) for row in rows
+        ]
+
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO rows (symbol, timestamp, payload) VALUES (?, ?, ?)",
+                    records,
+                )
+
+                if start_ms < end_ms:
+                    covered = connection.execute(
+                        "SELECT start_ms, end_ms FROM coverage WHERE symbol = ?",
+                        (symbol,),
+                    ).fetchall()
+                    merged = VinterTime.merge_intervals(covered + [(start_ms, end_ms)])
+                    connection.execute(
+                        "DELETE FROM coverage WHERE symbol = ?", (symbol,)
+                    )
+                    connection.executemany(
+                        "INSERT INTO coverage (symbol, start_ms, end_ms) VALUES (?, ?, ?)",
+                        [(symbol, start, end) for start, end in merged],
+                    )
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+        return len(records)
+
+    def read(self, symbol: str, start_ms: int, end_ms: int) -> list:
+        """This function returns the stored rows of the symbol in [start_ms, end_ms)
+
+        Parameters
+        ----------
+        symbol : str
+            The symbol of the asset.
+        start_ms : int
+            The start of the period in milliseconds.
+        end_ms : int
+            The end of the period in milliseconds, excluded.
+
+        Returns
+        -------
+            A list of the rows, oldest first
+
+        """
+        with self._connect() as connection:
+            return [
+                codec.loads(payload)
+                for (payload,) in connection.execute(
+                    "SELECT payload FROM rows "
+                    "WHERE symbol = ? AND timestamp >= ? AND timestamp < ? "
+                    "ORDER BY timestamp",
+                    (symbol, start_ms, end_ms),
+                )
+            ]
+
+    def invalidate(self, symbol: str = None) -> None:
+        """This function drops the rows and coverage of the symbol, or of every symbol if no symbol is given
+
+        Parameters
+        ----------
+        symbol : str
+            The symbol to drop. If None the whole store is cleared.
+
+        """
+        with self._connect() as connection:
+            if symbol is None:
+                connection.execute("DELETE FROM rows")
+                connection.execute("DELETE FROM coverage")
+            else:
+                connection.execute("DELETE FROM rows WHERE symbol = ?", (symbol,))
+                connection.execute("DELETE FROM coverage WHERE symbol = ?", (symbol,))
@@ -0,0 +1,247 @@
+import json
+import codecs
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_CHARS = "0123456789.eE+-"
+
+
+class JsonArrayStream:
+    # Parser states
+    OBJECT_START = 0
+    KEY = 1
+    COLON = 2
+    VALUE = 3
+    NEXT_KEY = 4
+    ARRAY_START = 5
+    FIRST_ITEM = 6
+    ITEM = 7
+    NEXT_ITEM = 8
+    DONE = 9
+
+    def __init__(self, key: str = "data"):
+        """This function creates an incremental parser returning the items of one array of a JSON object
+        as the bytes of the object arrive
+
+        Only the item being received is buffered, so the memory used does not depend on the length of
+        the array. The other members of the object are decoded and dropped.
+
+        Parameters
+        ----------
+        key : str
+            The key of the array in the top level object.
+        """
+        self.key = key
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._state = self.OBJECT_START
+        self._current_key = None
+
+    @property
+    def done(self) -> bool:
+        """True once the end of the array was parsed"""
+        return self._state == self.DONE
+
+    def _skip_whitespace(self) -> bool:
+        """This function moves past whitespace and returns False if the buffer is exhausted"""
+        buffer = self._buffer
+        pos = self._pos
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        self._pos = pos
+        return pos < len(buffer)
+
+    def _expect(self, char: str) -> None:
+        """This function consumes char or raises a ValueError"""
+        if self._buffer[self._pos] != char:
+            raise ValueError(
+                f"Expected '{char}' at position {self._pos} of the buffered response, got '{self._buffer[self._pos]}'"
+            )
+        self._pos += 1
+
+    def _decode_value(self, final: bool) -> tuple:
+        """This function decodes the value at the current position
+
+        A value is only complete once the character after it was received.
+
+        Returns
+        -------
+            A tuple of True and the value, or False and None if more bytes are needed
+
+        """
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return False, None
+
+        # A number cut by the end of a chunk decodes fine, so wait for the character after it
+        if not final and (
+            end >= len(self._buffer) or self._buffer[end] in _NUMBER_CHARS
+        ):
+            return False, None
+
+        self._pos = end
+        return True, value
+
+    def _parse(self, final: bool = False) -> list:
+        """This function parses as much of the buffer as possible and returns the complete items"""
+        items = []
+
+        while self._state != self.DONE and self._skip_whitespace():
+            state = self._state
+
+            if state == self.OBJECT_START:
+                self._expect("{")
+                self._state = self.KEY
+            elif state == self.KEY:
+                if self._buffer[self._pos] == "}":
+                    raise ValueError(f"The response has no '{self.key}' array")
+                complete, self._current_key = self._decode_value(final)
+                if not complete:
+                    break
+                self._state = self.COLON
+            elif state == self.COLON:
+                self._expect(":")
+                if self._current_key == self.key:
+                    self._state = self.ARRAY_START
+                else:
+                    self._state = self.VALUE
+            elif state == self.VALUE:
+                complete, _ = self._decode_value(final)
+                if not complete:
+                    break
+                self._state = self.NEXT_KEY
+            elif state == self.NEXT_KEY:
+                if self._buffer[self._pos] == "}":
+                    raise ValueError(f"The response has no '{self.key}' array")
+                self._expect(",")
+                self._state = self.KEY
+            elif state == self.ARRAY_START:
+                self._expect("[")
+                self._state = self.FIRST_ITEM
+            elif state == self.FIRST_ITEM:
+                # The end of an empty array may arrive in a later chunk than its start
+                if self._buffer[self._pos] == "]":
+                    self._pos += 1
+                    self._state = self.DONE
+                else:
+                    self._state = self.ITEM
+            elif state == self.ITEM:
+                complete, item = self._decode_value(final)
+                if not complete:
+                    break
+                items.append(item)
+                self._state = self.NEXT_ITEM
+            elif state == self.NEXT_ITEM:
+                if self._buffer[self._pos] == "]":
+                    self._pos += 1
+                    self._state = self.DONE
+                else:
+                    self._expect(",")
+                    self._state = self.ITEM
+
+        # Drop the parsed text so the buffer only holds the item being received
+        self._buffer = self._buffer[self._pos :]
+        self._pos = 0
+
+        return items
+
+    def feed(self, chunk: bytes) -> list:
+        """This function adds a chunk of the response body and returns the items it completed
+
+        Parameters
+        ----------
+        chunk : bytes
+            The next bytes of the response body.
+
+        Returns
+        -------
+            A list of the items completed by the chunk, possibly empty
+
+        """
+        if self._state == self.DONE:
+            return []
+
+        self._buffer += self._text.decode(chunk)
+        return self._parse()
+
+    def close(self) -> list:
+        """This function parses the end of the body and checks the array was complete
+
+        Returns
+        -------
+            A list of the remaining items
+
+        """
+        if self._state == self.DONE:
+            return []
+
+        self._buffer += self._text.decode(b"", final=True)
+        items = self._parse(final=True)
+
+        if self._state != self.DONE:
+            raise ValueError(
+                f"The response ended before the end of the '{self.key}' array"
+            )
+
+        return items
+
+
+def iter_json_array(chunks: Iterable[bytes], key: str = "data") -> Iterator[Any]:
+    """This function yields the items of the array under key of a JSON object received in chunks
+
+    Parameters
+    ----------
+    chunks : Iterable[bytes]
+        The chunks of the body, e.g. response.iter_bytes().
+    key : str
+        The key of the array in the top level object.
+
+    Yields
+    ------
+        The items of the array as soon as they are complete
+
+    """
+    parser = JsonArrayStream(key)
+
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+
+        if parser.done:
+            return
+
+    yield from parser.close()
+
+
+async def aiter_json_array(
+    chunks: AsyncIterable[bytes], key: str = "data"
+) -> AsyncIterator[Any]:
+    """This function yields the items of the array under key of a JSON object received in chunks
+
+    Parameters
+    ----------
+    chunks : AsyncIterable[bytes]
+        The chunks of the body, e.g. response.aiter_bytes().
+    key : str
+        The key of the array in the top level object.
+
+    Yields
+    ------
+        The items of the array as soon as they are complete
+
+    """
+    parser = JsonArrayStream(key)
+
+    async for chunk in chunks:
+        for item in parser.feed(chunk):
+            yield item
+
+        if parser.done:
+            return
+
+    for item in parser.close():
+        yield item
@@ -0,0 +1,489 @@
+import time
+import math
+import random
+import asyncio
+import threading
+import httpx
+from email.utils import parsedate_to_datetime
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Union
+
+
+def _client_options(
+    max_connections: int,
+    max_keepalive_connections: int,
+    keepalive_expiry: float,
+    http2: bool,
+    timeout: float,
+) -> dict:
+    """This function returns the keyword arguments shared by build_client and build_async_client"""
+    return {
+        "follow_redirects": True,
+        "timeout": timeout,
+        "http2": http2,
+        "limits": httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        ),
+    }
+
+
+def build_client(
+    max_connections: int = 100,
+    max_keepalive_connections: int = 20,
+    keepalive_expiry: float = 5.0,
+    http2: bool = False,
+    timeout: float = 10,
+) -> httpx.Client:
+    """This function builds an httpx.Client that several VinterAPI instances can share
+
+    Parameters
+    ----------
+    max_connections : int
+        The maximum number of open connections of the pool.
+    max_keepalive_connections : int
+        The maximum number of idle connections kept alive.
+    keepalive_expiry : float
+        The number of seconds an idle connection is kept alive.
+    http2 : bool
+        If True HTTP/2 is negotiated. It needs the h2 package (pip install httpx[http2]).
+    timeout : float
+        The timeout of a request in seconds.
+
+    Returns
+    -------
+        An httpx.Client to pass as httpx_client to VinterAPI
+
+    """
+    return httpx.Client(
+        **_client_options(
+            max_connections, max_keepalive_connections, keepalive_expiry, http2, timeout
+        )
+    )
+
+
+def build_async_client(
+    max_connections: int = 100,
+    max_keepalive_connections: int = 20,
+    keepalive_expiry: float = 5.0,
+    http2: bool = False,
+    timeout: float = 10,
+) -> httpx.AsyncClient:
+    """This function builds an httpx.AsyncClient that several VinterAPIAsync instances can share
+
+    Parameters
+    ----------
+    max_connections : int
+        The maximum number of open connections of the pool.
+    max_keepalive_connections : int
+        The maximum number of idle connections kept alive.
+    keepalive_expiry : float
+        The number of seconds an idle connection is kept alive.
+    http2 : bool
+        If True HTTP/2 is negotiated. It needs the h2 package (pip install httpx[http2]).
+    timeout : float
+        The timeout of a request in seconds.
+
+    Returns
+    -------
+        An httpx.AsyncClient to pass as httpx_client to VinterAPIAsync
+
+    """
+    return httpx.AsyncClient(
+        **_client_options(
+            max_connections, max_keepalive_connections, keepalive_expiry, http2, timeout
+        )
+    )
+
+
+def copy_payload(payload: Any) -> Any:
+    """This function copies the top level of a decoded body and the lists in it, so a body shared
+    between callers, or between a caller and a cache, doesn't share its containers. The rows
+    themselves are shared.
+
+    Parameters
+    ----------
+    payload : Any
+        The decoded JSON body.
+
+    Returns
+    -------
+        The copy
+
+    """
+    if isinstance(payload, dict):
+        return {
+            key: list(value) if isinstance(value, list) else value
+            for key, value in payload.items()
+        }
+
+    if isinstance(payload, list):
+        return list(payload)
+
+    return payload
+
+
+class RetryPolicy:
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        backoff: float = 0.5,
+        max_backoff: float = 20,
+        max_elapsed: float = 60,
+        budget_ratio: float = 0.1,
+        budget_reserve: float = 10,
+        statuses: Iterable[int] = RETRY_STATUSES,
+    ):
+        """This function creates the retry policy of the GET requests sent by VinterAPI and
+        VinterAPIAsync. Every request of the SDK is an idempotent GET, so it is safe to send again.
+
+        The delay before a retry is drawn uniformly between 0 and backoff * 2 ** attempt, capped at
+        max_backoff (full jitter), unless the response has a Retry-After header. A policy can be shared
+        by several clients so they draw from the same retry budget.
+
+        Parameters
+        ----------
+        max_attempts : int
+            The maximum number of attempts of one operation, the first one included.
+        backoff : float
+            The base delay in seconds.
+        max_backoff : float
+            The maximum delay in seconds between two attempts.
+        max_elapsed : float
+            The number of seconds one operation may spend retrying. A retry that would end after it,
+            e.g. because Retry-After asks for a longer wait, is not made.
+        budget_ratio : float
+            The number of retries earned by each operation. During an outage retries are limited to
+            this share of the requests so they don't add load to the server.
+        budget_reserve : float
+            The number of retries available before any operation was made, and the cap of the budget.
+        statuses : Iterable[int]
+            The response status codes that are retried. Connection errors and timeouts are always retried.
+        """
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_elapsed = max_elapsed
+        self.budget_ratio = budget_ratio
+        self.budget_reserve = budget_reserve
+        self.statuses = frozenset(statuses)
+        self.retries = 0
+        self._tokens = budget_reserve
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def retry_after(response) -> Union[float, None]:
+        """This function returns the number of seconds the Retry-After header of the response asks to wait
+
+        Parameters
+        ----------
+        response
+            The httpx response.
+
+        Returns
+        -------
+            The number of seconds, or None if the header is missing or invalid
+
+        """
+        value = response.headers.get("Retry-After")
+        if value is None:
+            return None
+
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+
+        return max(0.0, retry_at.timestamp() - time.time())
+
+    def start(self) -> float:
+        """This function records the start of an operation and adds its share to the retry budget
+
+        Returns
+        -------
+            The start time of the operation, to pass to next_delay
+
+        """
+        with self._lock:
+            self._tokens = min(self.budget_reserve, self._tokens + self.budget_ratio)
+
+        return time.monotonic()
+
+    def next_delay(
+        self, attempt: int, started: float, response=None, error: Exception = None
+    ) -> Union[float, None]:
+        """This function decides whether a failed attempt is retried and how long to wait before it
+
+        Parameters
+        ----------
+        attempt : int
+            The number of the attempt that failed, starting at 0.
+        started : float
+            The start time of the operation as returned by start.
+        response
+            The httpx response of the attempt, if one was received.
+        error : Exception
+            The transport error of the attempt, if no response was received.
+
+        Returns
+        -------
+            The number of seconds to wait, or None if the attempt must not be retried
+
+        """
+        if response is not None and response.status_code not in self.statuses:
+            return None
+
+        if error is not None and not isinstance(error, httpx.TransportError):
+            return None
+
+        if attempt + 1 >= self.max_attempts:
+            return None
+
+        delay = None if response is None else self.retry_after(response)
+        if delay is None:
+            delay = random.uniform(
+                0, min(self.max_backoff, self.backoff * 2**attempt)
+            )
+
+        if time.monotonic() - started + delay > self.max_elapsed:
+            return None
+
+        with self._lock:
+            if self._tokens < 1:
+                return None
+
+            self._tokens -= 1
+            self.retries += 1
+
+        return delay
+
+
+class RateLimiter:
+    def __init__(self, rate: float, burst: int = None):
+        """This function creates a token bucket limiting the number of requests sent per second
+
+        One limiter can be shared by several VinterAPI and VinterAPIAsync instances, from any thread or
+        event loop. Tokens are reserved under a lock and the caller waits outside of it, so waiters are
+        served in the order they arrived.
+
+        Parameters
+        ----------
+        rate : float
+            The number of requests allowed per second on average.
+        burst : int
+            The number of requests that can be sent at once after an idle period. Defaults to the
+            rate rounded up, with a minimum of 1.
+        """
+        if rate <= 0:
+            raise ValueError("The rate must be greater than 0")
+
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, math.ceil(rate))
+        self.waited = 0.0
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """This function takes a token and returns the number of seconds to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+
+            if self._tokens >= 0:
+                return 0.0
+
+            delay = -self._tokens / self.rate
+            self.waited += delay
+            return delay
+
+    def acquire(self) -> None:
+        """This function blocks the thread until a request may be sent"""
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        """This function waits without blocking the event loop until a request may be sent"""
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class RevalidationCache:
+    def __init__(self, max_entries: int = 256):
+        """This function creates a store of response validators and decoded bodies used to send
+        conditional requests (If-None-Match / If-Modified-Since)
+
+        Parameters
+        ----------
+        max_entries : int
+            The maximum number of responses to keep. The least recently used entry is dropped first.
+        """
+        self.max_entries = max_entries
+        self.revalidated = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(url: str, params: dict = None) -> tuple:
+        """This function returns the cache key for a url and its query parameters
+
+        Parameters
+        ----------
+        url : str
+            The url of the request.
+        params : dict
+            The query parameters of the request.
+
+        Returns
+        -------
+            A hashable key
+
+        """
+        if not params:
+            return (url, ())
+
+        return (url, tuple(sorted((key, str(value)) for key, value in params.items())))
+
+    def conditional_headers(self, key: tuple) -> dict:
+        """This function returns the conditional headers for the key, or an empty dictionary if no
+        response with validators is stored
+
+        Parameters
+        ----------
+        key : tuple
+            The key returned by make_key.
+
+        Returns
+        -------
+            A dictionary of headers
+
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is None:
+            return {}
+
+        etag, last_modified, _ = entry
+        headers = {}
+        if etag is not None:
+            headers["If-None-Match"] = etag
+        if last_modified is not None:
+            headers["If-Modified-Since"] = last_modified
+
+        return headers
+
+    def payload(self, key: tuple) -> Union[Any, None]:
+        """This function returns a copy of the decoded body stored for the key after a 304 response
+
+        Parameters
+        ----------
+        key : tuple
+            The key returned by make_key.
+
+        Returns
+        -------
+            The decoded body or None if it is not stored
+
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            self._entries.move_to_end(key)
+            self.revalidated += 1
+            return copy_payload(entry[2])
+
+    def store(self, key: tuple, response, payload: Any) -> None:
+        """This function stores the validators of the response together with its decoded body
+
+        Responses without an ETag or Last-Modified header are not stored.
+
+        Parameters
+        ----------
+        key : tuple
+            The key returned by make_key.
+        response
+            The httpx response.
+        payload : Any
+            The decoded body of the response.
+
+        """
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+
+        with self._lock:
+            if etag is None and last_modified is None:
+                self._entries.pop(key, None)
+                return
+
+            # Kept as a copy so emptying or reordering the returned body doesn't change it
+            self._entries[key] = (etag, last_modified, copy_payload(payload))
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """This function drops every stored response"""
+        with self._lock:
+            self._entries.clear()
+
+
+class AsyncSingleFlight:
+    def __init__(self):
+        """This function creates a registry of in-flight requests so identical concurrent requests
+        share one result instead of each going to the server
+        """
+        self.coalesced = 0
+        self._inflight = {}
+
+    @staticmethod
+    def _consume_exception(task: asyncio.Task) -> None:
+        """This function marks the exception of a finished task as retrieved, in case every waiter
+        was cancelled before it finished"""
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable]) -> Any:
+        """This function runs func for the key, or waits for the run that is already in flight
+
+        Parameters
+        ----------
+        key : Hashable
+            The key identifying identical requests.
+        func : Callable
+            A function returning the coroutine to run if nothing is in flight for the key.
+
+        Returns
+        -------
+            The result of func, shared between every waiter
+
+        """
+        task = self._inflight.get(key)
+
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            task.add_done_callback(self._consume_exception)
+        else:
+            self.coalesced += 1
+
+        # A cancelled waiter must not cancel the request the other waiters share
+        return await asyncio.shield(task)
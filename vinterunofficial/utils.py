@@ -1,5 +1,19 @@
-from datetime import datetime
-from .config import Frequency, AssetType, AssetUrl, WsAssetType, WsAssetUrl
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import Union
+from .config import (
+    Frequency,
+    AssetType,
+    WsAssetType,
+    VALID_ASSET_TYPES,
+    VALID_FREQUENCIES,
+    FREQUENCY_INTERVAL_MS,
+    URL_ROUTES,
+    ACTIVE_URL_ROUTES,
+    WS_URL_ROUTES,
+)
+
+DATE_PATTERN = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}")
 
 
 class VinterValidation:
@@ -17,8 +31,8 @@ class VinterValidation:
             The type of asset you want to get data for.
 
         """
-        valid_asset_types = [asset_type.value for asset_type in AssetType]
-        if asset_type not in valid_asset_types:
+        if asset_type not in VALID_ASSET_TYPES:
+            valid_asset_types = [asset_type.value for asset_type in AssetType]
             raise ValueError(
                 f"The asset type must be one of the following : {valid_asset_types}"
             )
@@ -34,8 +48,8 @@ class VinterValidation:
             The frequency of the asset you want to get data for.
 
         """
-        frequencies = [frequency.value for frequency in Frequency]
-        if frequency not in frequencies:
+        if frequency not in VALID_FREQUENCIES:
+            frequencies = [frequency.value for frequency in Frequency]
             raise ValueError(
                 "The frequency must be one of the following valid frequencies: {}".format(
                     frequencies
@@ -57,7 +71,7 @@ class VinterValidation:
 
         """
 
-        sym_frequency = symbol.split("-")[-1]
+        sym_frequency = symbol.rsplit("-", 1)[-1]
         VinterValidation.validate_frequency(sym_frequency)
         return symbol, sym_frequency
 
@@ -71,17 +85,39 @@ class VinterValidation:
             A list of dates in the format YYYY-MM-DD
 
         """
-        for date in dates:
-            # Validate that the date is a valid date
+        VinterValidation.parse_dates(dates)
+
+    @staticmethod
+    def parse_dates(dates: list) -> list:
+        """It parses dates in the format YYYY-MM-DD and returns them sorted without duplicates
+
+        The format is checked with a precompiled pattern and the calendar with date.fromisoformat,
+        both much faster than datetime.strptime.
+
+        Parameters
+        ----------
+        dates
+            A list of dates in the format YYYY-MM-DD
+
+        Returns
+        -------
+            A sorted list of distinct date objects
+
+        """
+        parsed = set()
+        for value in dates:
             try:
-                datetime.strptime(date, "%Y-%m-%d")
-            except ValueError as e:
-                e.args = (
+                if not isinstance(value, str) or not DATE_PATTERN.fullmatch(value):
+                    raise ValueError
+                parsed.add(date.fromisoformat(value))
+            except ValueError:
+                raise ValueError(
                     "The date must be in the format YYYY-MM-DD. The date: {} is not in the correct format.".format(
-                        date
-                    ),
-                )
-                raise
+                        value
+                    )
+                ) from None
+
+        return sorted(parsed)
 
 
 class VinterUrl:
@@ -91,14 +127,7 @@ class VinterUrl:
     @staticmethod
     def get_active_url(asset_type: str) -> str:
         """This function returns the url to use to get the data"""
-        url = None
-        for asset_url in AssetUrl:
-            if (
-                asset_url.value["asset_type"].value == asset_type
-                and asset_url.value["frequency"] is None
-            ):
-                url = asset_url.value["url"]
-                break
+        url = ACTIVE_URL_ROUTES.get(asset_type)
 
         if url is None:
             raise ValueError(f"The asset type must be in {asset_type}")
@@ -122,18 +151,10 @@ class VinterUrl:
 
         """
 
-        asset_types = [asset_type.value for asset_type in AssetType]
-
-        url = None
-        for asset_url in AssetUrl:
-            if (
-                asset_url.value["asset_type"].value == asset_type
-                and asset_url.value["frequency"].value == frequency
-            ):
-                url = asset_url.value["url"]
-                break
+        url = URL_ROUTES.get((asset_type, frequency))
 
         if url is None:
+            asset_types = [asset_type.value for asset_type in AssetType]
             raise ValueError(f"The asset type must be in {asset_types}")
 
         return url
@@ -177,21 +198,306 @@ class VinterUrl:
 
         """
 
-        ws_asset_types = [asset_type.value for asset_type in WsAssetType]
-
         if symbol is None:
             raise ValueError("The symbol must be provided.")
 
         symbol, frequency = VinterValidation.validate_symbol_frequency(symbol)
 
-        url = None
-        for asset_url in WsAssetUrl:
-            if asset_url.value["asset_type"].value == asset_type:
-                url = asset_url.value["url"]
-                url = url + "/" + symbol
-                break
+        url = WS_URL_ROUTES.get(asset_type)
 
         if url is None:
+            ws_asset_types = [asset_type.value for asset_type in WsAssetType]
             raise ValueError(f"The asset type must be in {ws_asset_types}")
 
-        return url
+        return url + "/" + symbol
+
+
+class VinterTime:
+    EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+    def __init__(self):
+        pass
+
+    @staticmethod
+    def to_datetime(value: Union[str, int, float, datetime]) -> datetime:
+        """It takes in a date, a datetime string or a timestamp and returns a timezone aware UTC datetime
+
+        Parameters
+        ----------
+        value : str | int | float | datetime
+            A date (YYYY-MM-DD), a datetime (YYYY-MM-DDTHH:MM:SSZ or YYYY-MM-DDTHH:MM:SS.sssZ),
+            a timestamp in milliseconds or seconds, or a datetime.
+
+        Returns
+        -------
+            A timezone aware datetime in UTC
+
+        """
+        if isinstance(value, datetime):
+            dt = value
+        elif isinstance(value, (int, float)):
+            return VinterTime.EPOCH + timedelta(
+                milliseconds=VinterTime.to_timestamp_ms(value)
+            )
+        else:
+            try:
+                dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            except ValueError as e:
+                e.args = (
+                    "The datetime must be in the format YYYY-MM-DD, YYYY-MM-DDTHH:MM:SSZ or "
+                    "YYYY-MM-DDTHH:MM:SS.sssZ. The datetime: {} is not in the correct format.".format(
+                        value
+                    ),
+                )
+                raise
+
+        if dt.tzinfo is None:
+            return dt.replace(tzinfo=timezone.utc)
+
+        return dt.astimezone(timezone.utc)
+
+    @staticmethod
+    def to_timestamp_ms(value: Union[str, int, float, datetime]) -> int:
+        """It takes in a date, a datetime string or a timestamp and returns a timestamp in milliseconds
+
+        Parameters
+        ----------
+        value : str | int | float | datetime
+            Any value accepted by VinterTime.to_datetime. Numbers below 1e11 are taken as seconds.
+
+        Returns
+        -------
+            The number of milliseconds since the epoch
+
+        """
+        if isinstance(value, (int, float)):
+            # Timestamps in seconds stay below 1e11 until the year 5138
+            return int(value * 1000) if value < 1e11 else int(value)
+
+        delta = VinterTime.to_datetime(value) - VinterTime.EPOCH
+        return (delta.days * 86400 + delta.seconds) * 1000 + delta.microseconds // 1000
+
+    @staticmethod
+    def format_timestamp(timestamp_ms: int) -> str:
+        """It takes in a timestamp in milliseconds and returns it in the format YYYY-MM-DDTHH:MM:SS.sssZ
+
+        Parameters
+        ----------
+        timestamp_ms : int
+            The number of milliseconds since the epoch.
+
+        Returns
+        -------
+            The datetime string accepted by the start and end parameters of the API
+
+        """
+        dt = VinterTime.EPOCH + timedelta(milliseconds=timestamp_ms)
+        return dt.strftime("%Y-%m-%dT%H:%M:%S.") + "{:03d}Z".format(timestamp_ms % 1000)
+
+    @staticmethod
+    def row_timestamp(row: dict) -> int:
+        """It returns the timestamp in milliseconds of a row returned by the API
+
+        Parameters
+        ----------
+        row : dict
+            A row with a timestamp or a date field.
+
+        Returns
+        -------
+            The number of milliseconds since the epoch
+
+        """
+        timestamp = row.get("timestamp")
+
+        if timestamp is None:
+            return VinterTime.to_timestamp_ms(row["date"])
+
+        return VinterTime.to_timestamp_ms(timestamp)
+
+    @staticmethod
+    def split_range(start_ms: int, end_ms: int, window_ms: int) -> list:
+        """It splits the half-open range [start_ms, end_ms) into consecutive windows of window_ms
+
+        Parameters
+        ----------
+        start_ms : int
+            The start of the range in milliseconds.
+        end_ms : int
+            The end of the range in milliseconds.
+        window_ms : int
+            The length of a window in milliseconds.
+
+        Returns
+        -------
+            A list of (start_ms, end_ms) tuples covering the range, the last one possibly shorter
+
+        """
+        if window_ms <= 0:
+            raise ValueError("The window must be longer than 0 milliseconds.")
+
+        return [
+            (window_start, min(window_start + window_ms, end_ms))
+            for window_start in range(start_ms, end_ms, window_ms)
+        ]
+
+    @staticmethod
+    def plan_windows(
+        frequency: str,
+        start: Union[str, int, datetime],
+        end: Union[str, int, datetime, None] = None,
+        limit: int = 1000,
+        window_ms: int = None,
+    ) -> list:
+        """It splits the period into windows that each hold about limit rows of the frequency
+
+        Parameters
+        ----------
+        frequency : str
+            The frequency of the symbol.
+        start : str | int | datetime
+            The start of the period.
+        end : str | int | datetime
+            The end of the period, included like the API includes end_time. If None the current time
+            is used.
+        limit : int
+            The number of rows a single request returns.
+        window_ms : int
+            The length of a window in milliseconds. If None it is derived from the frequency and limit.
+
+        Returns
+        -------
+            A list of (start_ms, end_ms) tuples covering the period
+
+        """
+        start_ms = VinterTime.to_timestamp_ms(start)
+        # The windows are half-open, so the last one reaches 1 ms past an explicit end to include it
+        if end is not None:
+            end_ms = VinterTime.to_timestamp_ms(end) + 1
+        else:
+            end_ms = VinterTime.to_timestamp_ms(datetime.now(timezone.utc))
+
+        if window_ms is None:
+            # limit - 1 intervals hold limit rows even if the API includes the end of the window
+            window_ms = FREQUENCY_INTERVAL_MS[frequency] * max(limit - 1, 1)
+
+        return VinterTime.split_range(start_ms, end_ms, window_ms)
+
+    @staticmethod
+    def merge_intervals(intervals: list) -> list:
+        """It merges overlapping and adjacent half-open intervals
+
+        Parameters
+        ----------
+        intervals : list
+            A list of (start_ms, end_ms) tuples in any order.
+
+        Returns
+        -------
+            A sorted list of disjoint (start_ms, end_ms) tuples
+
+        """
+        merged = []
+        for start_ms, end_ms in sorted(intervals):
+            if start_ms >= end_ms:
+                continue
+            if merged and start_ms <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end_ms))
+            else:
+                merged.append((start_ms, end_ms))
+
+        return merged
+
+    @staticmethod
+    def missing_intervals(start_ms: int, end_ms: int, covered: list) -> list:
+        """It returns the parts of the half-open range [start_ms, end_ms) outside of the covered intervals
+
+        Parameters
+        ----------
+        start_ms : int
+            The start of the range in milliseconds.
+        end_ms : int
+            The end of the range in milliseconds.
+        covered : list
+            A list of (start_ms, end_ms) tuples already available.
+
+        Returns
+        -------
+            A sorted list of the (start_ms, end_ms) gaps
+
+        """
+        gaps = []
+        cursor = start_ms
+        for covered_start, covered_end in VinterTime.merge_intervals(covered):
+            if covered_end <= cursor:
+                continue
+            if covered_start >= end_ms:
+                break
+            if covered_start > cursor:
+                gaps.append((cursor, covered_start))
+            cursor = max(cursor, covered_end)
+
+        if cursor < end_ms:
+            gaps.append((cursor, end_ms))
+
+        return gaps
+
+    @staticmethod
+    def date_ranges(dates: list) -> list:
+        """It merges sorted distinct dates into ranges of consecutive days
+
+        Parameters
+        ----------
+        dates : list
+            A sorted list of distinct date objects, as returned by VinterValidation.parse_dates.
+
+        Returns
+        -------
+            A list of (first, last) date tuples, both included
+
+        """
+        ranges = []
+        for day in dates:
+            if ranges and day - ranges[-1][1] == timedelta(days=1):
+                ranges[-1] = (ranges[-1][0], day)
+            else:
+                ranges.append((day, day))
+
+        return ranges
+
+
+class BatchResult(dict):
+    def __init__(self, *args, **kwargs):
+        """A dictionary of the successful results of a batch call keyed by symbol. The exceptions of
+        the symbols that failed are kept in the errors attribute, keyed by symbol as well.
+        """
+        super().__init__(*args, **kwargs)
+        self.errors = {}
+
+    @property
+    def ok(self) -> bool:
+        """True if no symbol failed"""
+        return len(self.errors) == 0
+
+    @classmethod
+    def from_outcomes(cls, outcomes: list) -> "BatchResult":
+        """It builds a BatchResult from (symbol, value, error) tuples, in their order
+
+        Parameters
+        ----------
+        outcomes : list
+            A list of (symbol, value, error) tuples where error is None for the symbols that succeeded.
+
+        Returns
+        -------
+            A BatchResult of the values and errors
+
+        """
+        result = cls()
+        for symbol, value, error in outcomes:
+            if error is None:
+                result[symbol] = value
+            else:
+                result.errors[symbol] = error
+
+        return result
@@ -1,10 +1,23 @@
 from abc import ABC, abstractmethod
 from typing import Union
+from .series import TimeSeries
 
 
 class VinterAPIABC(ABC):
     @abstractmethod
-    def __init__(self, api_key: str, asset_type: str):  # pragma: no cover
+    def __init__(
+        self,
+        api_key: str,
+        asset_type: str,
+        cache_ttl: float = 60,
+        revalidate: bool = False,
+        persistent_cache=None,
+        httpx_client=None,
+        retry=None,
+        rate_limiter=None,
+        history_store=None,
+        window_cache=None,
+    ):  # pragma: no cover
         """This function takes in an api_key and asset_type and sets them as attributes of the class
 
         Parameters
@@ -13,6 +26,66 @@ class VinterAPIABC(ABC):
             Your API key.
         asset_type : str
             The type of asset you want to get data for. The acceptable asset types listed in the AssetType enum.
+        cache_ttl : float
+            The number of seconds the active symbol catalog is kept in memory. 0 or None disables the cache.
+        revalidate : bool
+            If True responses with an ETag or Last-Modified header are kept and requested again
+            conditionally. A 304 Not Modified response reuses the kept decoded body.
+        persistent_cache : str | PersistentCatalogCache
+            A path to a sqlite file, or a PersistentCatalogCache, shared by every process on the host.
+            Fresh catalogs are read from it instead of the API, stale ones are served immediately and
+            refreshed in the background by a single process.
+        httpx_client : httpx.Client | httpx.AsyncClient
+            A client to send the requests with, e.g. one built by build_client and shared by the
+            instances of every asset type. A shared client is not closed by this instance.
+        retry : RetryPolicy
+            The policy used to retry requests failing with a connection error, a timeout, a 429 or a
+            5xx status. If None failed requests are not retried.
+        rate_limiter : RateLimiter
+            A token bucket every request, retries included, waits for. Share one limiter between the
+            instances that count against the same API key.
+        history_store : str | HistoryStore
+            A path to a sqlite file, or a HistoryStore, keeping the rows fetched by sync so periods
+            already synced are read locally.
+        window_cache : WindowCache
+            An in-memory cache of closed history windows. get_data_by_time with paginate=True then
+            only requests the parts of the period that are not cached.
+        """
+        pass
+
+    @abstractmethod
+    def _get_json(
+        self, url: str, params: dict = None, headers: dict = None
+    ) -> dict:  # pragma: no cover
+        """This function sends a GET request and returns the decoded JSON body
+
+        If revalidation is enabled the request is sent with the validators of the last response for
+        the same url and params, and a 304 Not Modified response returns the kept body.
+
+        Parameters
+        ----------
+        url : str
+            The url to request.
+        params : dict
+            The query parameters of the request.
+        headers : dict
+            The headers of the request.
+
+        Returns
+        -------
+            The decoded JSON body of the response
+
+        """
+        pass
+
+    @abstractmethod
+    def _get_active_catalog(self):  # pragma: no cover
+        """This function returns the indexed catalog of active symbols, from the cache if it is still valid
+
+        Returns
+        -------
+            An ActiveCatalog of all the active symbols
+
         """
         pass
 
@@ -29,6 +102,22 @@ class VinterAPIABC(ABC):
         """
         pass
 
+    @abstractmethod
+    def invalidate_cache(self) -> None:  # pragma: no cover
+        """This function clears the cached active symbol catalog so the next lookup fetches it again"""
+        pass
+
+    @abstractmethod
+    def cache_info(self) -> dict:  # pragma: no cover
+        """This function returns the hit/miss counters of the active symbol catalog cache
+
+        Returns
+        -------
+            A dictionary with the keys hits, misses, size and ttl
+
+        """
+        pass
+
     @abstractmethod
     def get_latest_data(self, symbol: str, limit: int = 1) -> dict:  # pragma: no cover
         """It takes a symbol and a limit as parameters, and returns a dictionary of the latest data for
@@ -64,14 +153,34 @@ class VinterAPIABC(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_latest_values(self, symbols: list):  # pragma: no cover
+        """This function takes in a list of symbols and returns the latest value of every symbol
+
+        A symbol that fails doesn't stop the others, its exception is reported in the errors
+        attribute of the result instead.
+
+        Parameters
+        ----------
+        symbols : list
+            The symbols of the assets you want to get data for.
+
+        Returns
+        -------
+            A BatchResult mapping each symbol to its latest value, with the exceptions of the failed
+            symbols in its errors attribute
+
+        """
+        pass
+
     @abstractmethod
     def _filter_by_symbol(self, data: list, symbol: str) -> list:  # pragma: no cover
         """This function takes in a list of data and a symbol and returns a list of data for that symbol
 
         Parameters
         ----------
-        data : list
-            A list of data
+        data : list | ActiveCatalog
+            A list of data, or an ActiveCatalog which is looked up by its symbol index
         symbol : str
             The symbol of the asset you want to get data for.
 
@@ -231,32 +340,69 @@ class VinterAPIABC(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_index_metadata(self, symbols: Union[str, list]) -> dict:  # pragma: no cover
+        """This function returns the weights, rebalance dates, review dates and contributions of many
+        symbols while downloading the active symbol catalog only once
+
+        Parameters
+        ----------
+        symbols : str | list
+            The symbols of the assets you want to get data for.
+
+        Returns
+        -------
+            A dictionary keyed by symbol of dictionaries with the keys weights, next_rebalance_weights,
+            previous_rebalance_date, next_rebalance_date, previous_review_date, next_review_date and contrib
+
+            OR
+
+            ValueError if any of the symbols is not present in the list of active symbols
+
+        """
+        pass
+
     @abstractmethod
     def get_data_by_date(
-        self, symbol: str, dates: Union[str, list]
-    ) -> dict:  # pragma: no cover
-        """This function takes in a symbol and a date and returns a dictionary of the data for that date
+        self,
+        symbol: str,
+        dates: Union[str, list],
+        as_series: bool = False,
+    ) -> Union[dict, TimeSeries]:  # pragma: no cover
+        """This function returns the rows of the requested dates, keyed by date
 
-        This function is only for daily data.
+        This function is only for daily data. The dates are sorted and deduplicated, consecutive days
+        are merged into ranges and the ranges are requested concurrently, so two dates years apart
+        cost two small requests instead of the whole span between them.
 
         Parameters
         ----------
         symbol : str
             The symbol of the asset you want to get data for.
-        date : str | list
-            The date of the data you want to get. format: YYYY-MM-DD
+        dates : str | list
+            The date or dates of the data you want to get, in any order. format: YYYY-MM-DD
+        as_series : bool
+            If True the rows are returned as a columnar TimeSeries, oldest first, instead of a
+            dictionary.
 
         Returns
         -------
-            A dictionary of the data
+            A dictionary of the row of each requested date, keyed by date (YYYY-MM-DD), or a
+            TimeSeries if as_series is True. Dates without data are left out.
 
         """
         pass
 
     @abstractmethod
     def get_data_by_time(
-        self, symbol: str, start: str, end: str = None, limit: int = 1000
-    ) -> dict:  # pragma: no cover
+        self,
+        symbol: str,
+        start: str,
+        end: str = None,
+        limit: int = 1000,
+        paginate: bool = False,
+        as_series: bool = False,
+    ) -> Union[list, TimeSeries]:  # pragma: no cover
         """This function takes in a symbol and a start and end date and returns a dictionary of the data
         for that period
 
@@ -268,10 +414,111 @@ class VinterAPIABC(ABC):
             The start datatime . format: YYYY-MM-DDTHH:MM:SSZ or YYYY-MM-DDTHH:MM:SS.sssZ
         end : str
             The end datatime. format: YYYY-MM-DDTHH:MM:SSZ or YYYY-MM-DDTHH:MM:SS.sssZ
+        limit : int
+            The maximum number of rows per request.
+        paginate : bool
+            If True every page of the period is requested instead of only the first limit rows.
+        as_series : bool
+            If True the rows are returned as a columnar TimeSeries instead of a list of dictionaries.
+
+        Returns
+        -------
+            A list of the rows, or a TimeSeries if as_series is True
+
+        """
+        pass
+
+    @abstractmethod
+    def get_data_by_time_parallel(
+        self,
+        symbol: str,
+        start: str,
+        end: str = None,
+        limit: int = 1000,
+        window: int = None,
+    ) -> list:  # pragma: no cover
+        """This function splits the period into windows that fit in one request, fetches the windows
+        concurrently and returns their rows merged in timestamp order
+
+        Parameters
+        ----------
+        symbol : str
+            The symbol of the asset you want to get data for.
+        start : str
+            The start datatime . format: YYYY-MM-DDTHH:MM:SSZ or YYYY-MM-DDTHH:MM:SS.sssZ
+        end : str
+            The end datatime. format: YYYY-MM-DDTHH:MM:SSZ or YYYY-MM-DDTHH:MM:SS.sssZ.
+            If None the current time is used.
+        limit : int
+            The number of rows per request.
+        window : int
+            The length of a window in milliseconds. By default a window is limit rows of the frequency
+            of the symbol. A window holding more rows is walked page by page.
+
+        Returns
+        -------
+            A list of the rows of the period, oldest first, without duplicates
+
+        """
+        pass
+
+    @abstractmethod
+    def iter_data_by_time(
+        self,
+        symbol: str,
+        start: str,
+        end: str = None,
+        limit: int = 1000,
+        stream: bool = False,
+    ):  # pragma: no cover
+        """This function yields the data of the symbol for the period page by page, oldest first
+
+        The timestamp of the last row of a page is the start of the next page, so a period of any
+        length is walked with at most limit rows in memory.
+
+        Parameters
+        ----------
+        symbol : str
+            The symbol of the asset you want to get data for.
+        start : str
+            The start datatime . format: YYYY-MM-DDTHH:MM:SSZ or YYYY-MM-DDTHH:MM:SS.sssZ
+        end : str
+            The end datatime. format: YYYY-MM-DDTHH:MM:SSZ or YYYY-MM-DDTHH:MM:SS.sssZ
+        limit : int
+            The number of rows per request.
+        stream : bool
+            If True the rows of each page are decoded while the page is downloaded, so only one row
+            is held in memory at a time instead of a whole page.
+
+        Yields
+        ------
+            The rows of the period as they arrive
+
+        """
+        pass
+
+    @abstractmethod
+    def sync(
+        self, symbol: str, start: str, end: str = None, as_series: bool = False
+    ) -> Union[list, TimeSeries]:  # pragma: no cover
+        """This function fetches the parts of the period missing from the history store and returns
+        the rows of the period from the store
+
+        Parameters
+        ----------
+        symbol : str
+            The symbol of the asset you want to get data for.
+        start : str
+            The start datatime . format: YYYY-MM-DDTHH:MM:SSZ or YYYY-MM-DDTHH:MM:SS.sssZ
+        end : str
+            The end datatime, excluded. format: YYYY-MM-DDTHH:MM:SSZ or YYYY-MM-DDTHH:MM:SS.sssZ
+            If None the period ends now.
+        as_series : bool
+            If True the rows are returned as a columnar TimeSeries instead of a list of dictionaries.
 
         Returns
         -------
-            A dictionary of the data
+            A list of the rows of the period, oldest first, or a TimeSeries if as_series is True
 
         """
         pass
@@ -1,18 +1,39 @@
 import os
-import csv
-import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import httpx
-from typing import Union
-from datetime import datetime, timedelta
-from .config import Frequency, AssetType, AssetUrl
-from .utils import VinterValidation, VinterUrl
+from typing import Iterable, Iterator, Union
+from datetime import timedelta
+from .config import Frequency, AssetType, AssetUrl, FREQUENCY_INTERVAL_MS
+from .utils import VinterValidation, VinterUrl, VinterTime, BatchResult
+from .cache import TTLCache, PersistentCatalogCache, WindowCache
+from .catalog import ActiveCatalog
+from .store import HistoryStore
+from .series import merge_rows, TimeSeries
+from . import codec
+from .export import write_csv, write_json, write_ndjson
+from .streaming import iter_json_array
+from .transport import build_client, RevalidationCache, RetryPolicy, RateLimiter
 from .vinter_abc import VinterAPIABC
 
 APIKEY = os.environ.get("VINTER_API_KEY", None)
 
 
 class VinterAPI(VinterAPIABC):
-    def __init__(self, api_key: str, asset_type: str):
+    def __init__(
+        self,
+        api_key: str,
+        asset_type: str,
+        cache_ttl: float = 60,
+        revalidate: bool = False,
+        persistent_cache: Union[str, PersistentCatalogCache] = None,
+        httpx_client: httpx.Client = None,
+        retry: RetryPolicy = None,
+        rate_limiter: RateLimiter = None,
+        history_store: Union[str, HistoryStore] = None,
+        window_cache: WindowCache = None,
+    ):
         """This function takes in an api_key and asset_type and sets them as attributes of the class
 
         Parameters
@@ -21,13 +42,233 @@ class VinterAPI(VinterAPIABC):
             Your API key.
         asset_type : str
             The type of asset you want to get data for. The acceptable asset types listed in the AssetType enum.
+        cache_ttl : float
+            The number of seconds the active symbol catalog is kept in memory. 0 or None disables the cache.
+        revalidate : bool
+            If True responses with an ETag or Last-Modified header are kept and requested again
+            conditionally. A 304 Not Modified response reuses the kept decoded body. Each call gets
+            its own list of rows, but the row dictionaries are shared with the kept body, so they
+            should not be modified.
+        persistent_cache : str | PersistentCatalogCache
+            A path to a sqlite file, or a PersistentCatalogCache, shared by every process on the host.
+            Fresh catalogs are read from it instead of the API, stale ones are served immediately and
+            refreshed in the background by a single process.
+        httpx_client : httpx.Client
+            A client to send the requests with, e.g. one built by build_client and shared by the
+            instances of every asset type. A shared client is not closed by this instance.
+        retry : RetryPolicy
+            The policy used to retry requests failing with a connection error, a timeout, a 429 or a
+            5xx status. If None failed requests are not retried.
+        rate_limiter : RateLimiter
+            A token bucket every request, retries included, waits for. Share one limiter between the
+            instances that count against the same API key.
+        history_store : str | HistoryStore
+            A path to a sqlite file, or a HistoryStore, keeping the rows fetched by sync so periods
+            already synced are read locally.
+        window_cache : WindowCache
+            An in-memory cache of closed history windows. get_data_by_time with paginate=True then
+            only requests the parts of the period that are not cached.
         """
         self.api_key = api_key
         self.asset_type = asset_type
         self.frequencies = [frequency.value for frequency in Frequency]
         self.valid_asset_types = [asset_type.value for asset_type in AssetType]
         VinterValidation.validate_asset_type(self.asset_type)
-        self.httpx_client = httpx.Client(follow_redirects=True, timeout=10)
+        self.catalog_cache = TTLCache(ttl=cache_ttl)
+        if isinstance(persistent_cache, str):
+            persistent_cache = PersistentCatalogCache(persistent_cache)
+        self.persistent_cache = persistent_cache
+        if isinstance(history_store, str):
+            history_store = HistoryStore(history_store)
+        self.history_store = history_store
+        self.window_cache = window_cache
+        self.revalidation_cache = RevalidationCache() if revalidate else None
+        self.retry = retry
+        self.rate_limiter = rate_limiter
+        self._owns_client = httpx_client is None
+        self.httpx_client = httpx_client if httpx_client is not None else build_client()
+
+    def close(self) -> None:
+        """This function closes the connection pool, unless the client was passed in and is shared"""
+        if self._owns_client:
+            self.httpx_client.close()
+
+    def __enter__(self) -> "VinterAPI":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _send(self, url: str, params: dict, headers: dict) -> httpx.Response:
+        """This function sends a GET request, retrying it according to the retry policy and waiting
+        for the rate limiter before each attempt
+
+        Parameters
+        ----------
+        url : str
+            The url to request.
+        params : dict
+            The query parameters of the request.
+        headers : dict
+            The headers of the request.
+
+        Returns
+        -------
+            The last response received
+
+        """
+        if self.retry is None:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            return self.httpx_client.get(url, params=params, headers=headers)
+
+        started = self.retry.start()
+        attempt = 0
+
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            try:
+                response = self.httpx_client.get(url, params=params, headers=headers)
+            except httpx.TransportError as error:
+                delay = self.retry.next_delay(attempt, started, error=error)
+                if delay is None:
+                    raise
+            else:
+                delay = self.retry.next_delay(attempt, started, response=response)
+                if delay is None:
+                    return response
+
+            attempt += 1
+            time.sleep(delay)
+
+    def _get_json(self, url: str, params: dict = None, headers: dict = None) -> dict:
+        """This function sends a GET request and returns the decoded JSON body
+
+        If revalidation is enabled the request is sent with the validators of the last response for
+        the same url and params, and a 304 Not Modified response returns the kept body.
+
+        Parameters
+        ----------
+        url : str
+            The url to request.
+        params : dict
+            The query parameters of the request.
+        headers : dict
+            The headers of the request.
+
+        Returns
+        -------
+            The decoded JSON body of the response
+
+        """
+        headers = dict(headers or {})
+        key = None
+
+        if self.revalidation_cache is not None:
+            key = self.revalidation_cache.make_key(url, params)
+            headers.update(self.revalidation_cache.conditional_headers(key))
+
+        response = self._send(url, params, headers)
+
+        if key is not None and response.status_code == 304:
+            payload = self.revalidation_cache.payload(key)
+            if payload is not None:
+                return payload
+
+            # The kept body was dropped in the meantime, request it unconditionally
+            headers.pop("If-None-Match", None)
+            headers.pop("If-Modified-Since", None)
+            response = self._send(url, params, headers)
+
+        response.raise_for_status()  # Raise an exception if the request failed
+
+        payload = codec.decode_response(response)
+
+        if key is not None:
+            self.revalidation_cache.store(key, response, payload)
+
+        return payload
+
+    def _get_active_catalog(self) -> ActiveCatalog:
+        """This function returns the indexed catalog of active symbols, from the cache if it is still valid
+
+        Returns
+        -------
+            An ActiveCatalog of all the active symbols
+
+        """
+        url = VinterUrl.get_active_url(self.asset_type)
+
+        catalog = self.catalog_cache.get(url)
+
+        if catalog is None:
+            catalog = self._load_active_catalog(url)
+
+        return catalog
+
+    def _load_active_catalog(self, url: str) -> ActiveCatalog:
+        """This function loads the catalog from the persistent cache if there is a usable entry,
+        otherwise it downloads it, and keeps it in the in-memory cache
+
+        A stale entry is returned as is, and one process refreshes it in the background.
+
+        Parameters
+        ----------
+        url : str
+            The url of the active symbol catalog.
+
+        Returns
+        -------
+            An ActiveCatalog of all the active symbols
+
+        """
+        if self.persistent_cache is not None:
+            data, state = self.persistent_cache.get(url)
+
+            if data is not None:
+                # Cached before the refresh starts so the refreshed catalog is not overwritten
+                catalog = ActiveCatalog(data)
+                self.catalog_cache.set(url, catalog)
+
+                stale = state == PersistentCatalogCache.STALE
+
+                if stale and self.persistent_cache.try_acquire_refresh(url):
+                    threading.Thread(
+                        target=self._refresh_active_catalog, args=(url,), daemon=True
+                    ).start()
+
+                return catalog
+
+        data = self._get_json(url, headers={})["data"]
+
+        if self.persistent_cache is not None:
+            self.persistent_cache.set(url, data)
+
+        catalog = ActiveCatalog(data)
+        self.catalog_cache.set(url, catalog)
+
+        return catalog
+
+    def _refresh_active_catalog(self, url: str) -> None:
+        """This function downloads the catalog and stores it in the persistent and in-memory caches
+
+        Parameters
+        ----------
+        url : str
+            The url of the active symbol catalog.
+
+        """
+        try:
+            data = self._get_json(url, headers={})["data"]
+        except Exception:
+            # Keep serving the stale entry, the next reader takes the lease and retries
+            self.persistent_cache.release_refresh(url)
+            return
+
+        self.persistent_cache.set(url, data)
+        self.catalog_cache.set(url, ActiveCatalog(data))
 
     def get_all_active_symbols(
         self, frequency: str = None, symbol_only: bool = False
@@ -39,25 +280,29 @@ class VinterAPI(VinterAPIABC):
             A dictionary of all the active symbols
 
         """
-        url = VinterUrl.get_active_url(self.asset_type)
-        headers = {}
-        response = self.httpx_client.get(url, headers=headers)
+        if frequency is not None:
+            VinterValidation.validate_frequency(frequency)
 
-        response.raise_for_status()  # Raise an exception if the request failed
+        catalog = self._get_active_catalog()
 
-        data = response.json()["data"]
+        return catalog.filter(frequency=frequency, symbol_only=symbol_only)
 
-        if frequency is not None:
-            VinterValidation.validate_frequency(frequency)
+    def invalidate_cache(self) -> None:
+        """This function clears the cached active symbol catalog so the next lookup fetches it again"""
+        self.catalog_cache.invalidate()
 
-            data = [
-                asset for asset in data if asset["symbol"].split("-")[-1] == frequency
-            ]
+        if self.persistent_cache is not None:
+            self.persistent_cache.invalidate(VinterUrl.get_active_url(self.asset_type))
 
-        if symbol_only:
-            data = [asset["symbol"] for asset in data]
+    def cache_info(self) -> dict:
+        """This function returns the hit/miss counters of the active symbol catalog cache
 
-        return data
+        Returns
+        -------
+            A dictionary with the keys hits, misses, size and ttl
+
+        """
+        return self.catalog_cache.info()
 
     def get_latest_data(self, symbol: str, limit: int = 1) -> dict:
         """It takes a symbol and a limit as parameters, and returns a dictionary of the latest data for
@@ -79,11 +324,7 @@ class VinterAPI(VinterAPIABC):
 
         params = {"symbol": symbol, "limit": limit}
         headers = {"Authorization": self.api_key}
-        response = self.httpx_client.get(url, params=params, headers=headers)
-
-        response.raise_for_status()
-
-        data = response.json()["data"]
+        data = self._get_json(url, params=params, headers=headers)["data"]
 
         if len(data) == 0:
             raise ValueError("No data was found for the symbol: {}".format(symbol))
@@ -106,13 +347,45 @@ class VinterAPI(VinterAPIABC):
         data = self.get_latest_data(symbol=symbol)
         return data[0]["value"]
 
-    def _filter_by_symbol(self, data: list, symbol: str) -> list:
+    def get_latest_values(self, symbols: list, max_workers: int = 8) -> BatchResult:
+        """This function takes in a list of symbols and returns the latest value of every symbol
+
+        A symbol that fails doesn't stop the others, its exception is reported in the errors
+        attribute of the result instead.
+
+        Parameters
+        ----------
+        symbols : list
+            The symbols of the assets you want to get data for.
+        max_workers : int
+            The number of threads requesting values.
+
+        Returns
+        -------
+            A BatchResult mapping each symbol to its latest value, with the exceptions of the failed
+            symbols in its errors attribute
+
+        """
+
+        def fetch_value(symbol: str) -> tuple:
+            try:
+                return symbol, self.get_latest_value(symbol=symbol), None
+            except Exception as e:
+                return symbol, None, e
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # dict.fromkeys drops repeated symbols but keeps their order
+            outcomes = list(executor.map(fetch_value, dict.fromkeys(symbols)))
+
+        return BatchResult.from_outcomes(outcomes)
+
+    def _filter_by_symbol(self, data: Union[list, ActiveCatalog], symbol: str) -> list:
         """This function takes in a list of data and a symbol and returns a list of data for that symbol
 
         Parameters
         ----------
-        data : list
-            A list of data
+        data : list | ActiveCatalog
+            A list of data, or an ActiveCatalog which is looked up by its symbol index
         symbol : str
             The symbol of the asset you want to get data for.
 
@@ -121,6 +394,10 @@ class VinterAPI(VinterAPIABC):
             A list of data for the symbol
 
         """
+        if isinstance(data, ActiveCatalog):
+            asset = data.get(symbol)
+            return [] if asset is None else [asset]
+
         return [asset for asset in data if asset["symbol"] == symbol]
 
     def _get_active_asset_data(self, symbol: str) -> dict:
@@ -139,7 +416,7 @@ class VinterAPI(VinterAPIABC):
 
         symbol, frequency = VinterValidation.validate_symbol_frequency(symbol)
 
-        data = self.get_all_active_symbols()
+        data = self._get_active_catalog()
 
         output = self._filter_by_symbol(data=data, symbol=symbol)
 
@@ -358,21 +635,69 @@ class VinterAPI(VinterAPIABC):
 
         return output
 
-    def get_data_by_date(self, symbol: str, dates: Union[str, list]) -> dict:
-        """This function takes in a symbol and a date and returns a dictionary of the data for that date
+    def get_index_metadata(self, symbols: Union[str, list]) -> dict:
+        """This function returns the weights, rebalance dates, review dates and contributions of many
+        symbols while downloading the active symbol catalog only once
+
+        Parameters
+        ----------
+        symbols : str | list
+            The symbols of the assets you want to get data for.
 
-        This function is only for daily data.
+        Returns
+        -------
+            A dictionary keyed by symbol of dictionaries with the keys weights, next_rebalance_weights,
+            previous_rebalance_date, next_rebalance_date, previous_review_date, next_review_date and contrib
+
+            OR
+
+            ValueError if any of the symbols is not present in the list of active symbols
+
+        """
+        if isinstance(symbols, str):
+            symbols = [symbols]
+
+        for symbol in symbols:
+            VinterValidation.validate_symbol_frequency(symbol)
+
+        catalog = self._get_active_catalog()
+
+        missing = [symbol for symbol in symbols if symbol not in catalog]
+
+        if len(missing) > 0:
+            raise ValueError("No data was found for the symbols: {}".format(missing))
+
+        return {symbol: catalog.metadata(symbol) for symbol in symbols}
+
+    def get_data_by_date(
+        self,
+        symbol: str,
+        dates: Union[str, list],
+        as_series: bool = False,
+        max_workers: int = 4,
+    ) -> Union[dict, TimeSeries]:
+        """This function returns the rows of the requested dates, keyed by date
+
+        This function is only for daily data. The dates are sorted and deduplicated, consecutive days
+        are merged into ranges and the ranges are requested concurrently, so two dates years apart
+        cost two small requests instead of the whole span between them.
 
         Parameters
         ----------
         symbol : str
             The symbol of the asset you want to get data for.
-        date : str | list
-            The date of the data you want to get. format: YYYY-MM-DD
+        dates : str | list
+            The date or dates of the data you want to get, in any order. format: YYYY-MM-DD
+        as_series : bool
+            If True the rows are returned as a columnar TimeSeries, oldest first, instead of a
+            dictionary.
+        max_workers : int
+            The number of threads requesting the date ranges.
 
         Returns
         -------
-            A dictionary of the data
+            A dictionary of the row of each requested date, keyed by date (YYYY-MM-DD), or a
+            TimeSeries if as_series is True. Dates without data are left out.
 
         """
         symbol, frequency = VinterValidation.validate_symbol_frequency(symbol)
@@ -383,26 +708,49 @@ class VinterAPI(VinterAPIABC):
         if isinstance(dates, str):
             dates = [dates]
 
-        # Validate Dates with regex pattern & Date validation
-        VinterValidation.validate_dates(dates)
+        # Validate, sort and dedupe the dates with a regex pattern & date validation
+        requested = VinterValidation.parse_dates(dates)
+        ranges = VinterTime.date_ranges(requested)
+
+        if not ranges:
+            raise ValueError("At least one date must be given.")
+
+        def fetch_range(date_range: tuple) -> list:
+            first, last = date_range
+            return list(
+                self.iter_data_by_time(
+                    symbol=symbol,
+                    start=first.isoformat(),
+                    end=(last + timedelta(days=1)).isoformat(),
+                )
+            )
 
-        start_date, last_date = dates[0], dates[-1]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(ranges))) as pool:
+            chunks = list(pool.map(fetch_range, ranges))
 
-        # Adding 1 day to the last date to get the data for the last date
-        last_date = datetime.strptime(last_date, "%Y-%m-%d") + timedelta(days=1)
+        wanted = {day.isoformat() for day in requested}
+        data = {}
+        for row in merge_rows(chunks):
+            # The end of a range is included by the API, keep only the requested days. The day comes
+            # from the timestamp as the date field may be a date or a datetime string
+            day = VinterTime.format_timestamp(VinterTime.row_timestamp(row))[:10]
+            if day in wanted:
+                data.setdefault(day, row)
 
-        # Converting the datetime object to string
-        last_date = last_date.strftime("%Y-%m-%d")
+        if len(data) == 0:
+            raise ValueError(
+                f"No data was found for the symbol: {symbol} for the dates: {dates}."
+            )
 
-        data = self.get_data_by_time(symbol=symbol, start=start_date, end=last_date)
+        if as_series:
+            return TimeSeries.from_rows(list(data.values()))
 
         return data
 
-    def get_data_by_time(
+    def _get_data_page(
         self, symbol: str, start: str, end: str = None, limit: int = 1000
-    ) -> dict:
-        """This function takes in a symbol and a start and end date and returns a dictionary of the data
-        for that period
+    ) -> list:
+        """This function requests one page of data for the symbol between start and end
 
         Parameters
         ----------
@@ -412,10 +760,12 @@ class VinterAPI(VinterAPIABC):
             The start datatime . format: YYYY-MM-DDTHH:MM:SSZ or YYYY-MM-DDTHH:MM:SS.sssZ
         end : str
             The end datatime. format: YYYY-MM-DDTHH:MM:SSZ or YYYY-MM-DDTHH:MM:SS.sssZ
+        limit : int
+            The maximum number of rows of the page.
 
         Returns
         -------
-            A dictionary of the data
+            A list of the rows of the page, oldest first
 
         """
         url = VinterUrl.get_url_by_symbol(asset_type=self.asset_type, symbol=symbol)
@@ -427,58 +777,420 @@ class VinterAPI(VinterAPIABC):
             "limit": limit,
         }
         headers = {"Authorization": self.api_key}
-        response = self.httpx_client.get(url, params=params, headers=headers)
 
-        response.raise_for_status()  # Raise an exception if the request fails
+        return self._get_json(url, params=params, headers=headers)["data"]
+
+    def _stream_data_page(
+        self, symbol: str, start: str, end: str = None, limit: int = 1000
+    ) -> Iterator[dict]:
+        """This function requests one page of data for the symbol between start and end and yields its
+        rows while the body is downloaded, without buffering the whole response
+
+        The request waits for the rate limiter and is retried like the other requests as long as no
+        row was yielded. Streamed responses are not revalidated nor coalesced.
 
-        data = response.json()["data"]
+        Parameters
+        ----------
+        symbol : str
+            The symbol of the asset you want to get data for.
+        start : str
+            The start datatime . format: YYYY-MM-DDTHH:MM:SSZ or YYYY-MM-DDTHH:MM:SS.sssZ
+        end : str
+            The end datatime. format: YYYY-MM-DDTHH:MM:SSZ or YYYY-MM-DDTHH:MM:SS.sssZ
+        limit : int
+            The maximum number of rows of the page.
+
+        Yields
+        ------
+            The rows of the page, oldest first
+
+        """
+        url = VinterUrl.get_url_by_symbol(asset_type=self.asset_type, symbol=symbol)
+
+        params = {
+            "symbol": symbol,
+            "start_time": start,
+            "end_time": end,
+            "limit": limit,
+        }
+        headers = {"Authorization": self.api_key}
+
+        started = self.retry.start() if self.retry is not None else None
+        attempt = 0
+        streaming = False
+
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            delay = None
+            try:
+                with self.httpx_client.stream(
+                    "GET", url, params=params, headers=headers
+                ) as response:
+                    if self.retry is not None:
+                        delay = self.retry.next_delay(
+                            attempt, started, response=response
+                        )
+
+                    if delay is None:
+                        response.raise_for_status()
+                        streaming = True
+                        yield from iter_json_array(response.iter_bytes())
+                        return
+            except httpx.TransportError as error:
+                # Rows already yielded can't be taken back, so only the opening of the stream is retried
+                if self.retry is None or streaming:
+                    raise
+
+                delay = self.retry.next_delay(attempt, started, error=error)
+                if delay is None:
+                    raise
+
+            attempt += 1
+            time.sleep(delay)
+
+    def _get_cached_range(
+        self, symbol: str, start: str, end: str = None, limit: int = 1000
+    ) -> list:
+        """This function returns every row of the symbol between start and end, reading the cached
+        windows from the window cache and requesting only the uncovered sub-ranges
+
+        The fetched rows are cached up to the last interval of the frequency before now, which may
+        still change.
+
+        Parameters
+        ----------
+        symbol : str
+            The symbol of the asset you want to get data for.
+        start : str
+            The start datatime . format: YYYY-MM-DDTHH:MM:SSZ or YYYY-MM-DDTHH:MM:SS.sssZ
+        end : str
+            The end datatime. format: YYYY-MM-DDTHH:MM:SSZ or YYYY-MM-DDTHH:MM:SS.sssZ
+        limit : int
+            The number of rows per request.
+
+        Returns
+        -------
+            A list of the rows, oldest first
+
+        """
+        symbol, frequency = VinterValidation.validate_symbol_frequency(symbol)
+
+        now_ms = int(time.time() * 1000)
+        start_ms = VinterTime.to_timestamp_ms(start)
+        # end is included by the API, the cache works on half-open ranges
+        end_ms = VinterTime.to_timestamp_ms(end) + 1 if end is not None else now_ms
+        settled_ms = now_ms - FREQUENCY_INTERVAL_MS[frequency]
+
+        chunks, gaps = self.window_cache.lookup(symbol, start_ms, end_ms)
+
+        for gap_start, gap_end in gaps:
+            rows = [
+                row
+                for row in self.iter_data_by_time(
+                    symbol=symbol,
+                    start=VinterTime.format_timestamp(gap_start),
+                    end=VinterTime.format_timestamp(gap_end - 1),
+                    limit=limit,
+                )
+                if gap_start <= VinterTime.row_timestamp(row) < gap_end
+            ]
+            chunks.append(rows)
+
+            closed_end = min(gap_end, settled_ms)
+            self.window_cache.put(symbol, gap_start, closed_end, rows)
+
+        return merge_rows(chunks)
+
+    def get_data_by_time(
+        self,
+        symbol: str,
+        start: str,
+        end: str = None,
+        limit: int = 1000,
+        paginate: bool = False,
+        as_series: bool = False,
+    ) -> Union[list, TimeSeries]:
+        """This function takes in a symbol and a start and end date and returns a dictionary of the data
+        for that period
+
+        Parameters
+        ----------
+        symbol : str
+            The symbol of the asset you want to get data for.
+        start : str
+            The start datatime . format: YYYY-MM-DDTHH:MM:SSZ or YYYY-MM-DDTHH:MM:SS.sssZ
+        end : str
+            The end datatime. format: YYYY-MM-DDTHH:MM:SSZ or YYYY-MM-DDTHH:MM:SS.sssZ
+        limit : int
+            The maximum number of rows per request.
+        paginate : bool
+            If True every page of the period is requested instead of only the first limit rows.
+        as_series : bool
+            If True the rows are returned as a columnar TimeSeries instead of a list of dictionaries.
+
+        Returns
+        -------
+            A list of the rows, or a TimeSeries if as_series is True
+
+        """
+        if paginate and self.window_cache is not None:
+            data = self._get_cached_range(
+                symbol=symbol, start=start, end=end, limit=limit
+            )
+        elif paginate:
+            data = list(
+                self.iter_data_by_time(symbol=symbol, start=start, end=end, limit=limit)
+            )
+        else:
+            data = self._get_data_page(symbol=symbol, start=start, end=end, limit=limit)
 
         if len(data) == 0:
             raise ValueError(
                 f"No data was found for the symbol: {symbol} between {start} and {end}."
             )
 
+        if as_series:
+            return TimeSeries.from_rows(data)
+
+        return data
+
+    def get_data_by_time_parallel(
+        self,
+        symbol: str,
+        start: str,
+        end: str = None,
+        limit: int = 1000,
+        window: int = None,
+        max_workers: int = 4,
+    ) -> list:
+        """This function splits the period into windows that fit in one request, fetches the windows
+        on a thread pool sharing the client's connection pool and returns their rows merged in
+        timestamp order
+
+        Parameters
+        ----------
+        symbol : str
+            The symbol of the asset you want to get data for.
+        start : str
+            The start datatime . format: YYYY-MM-DDTHH:MM:SSZ or YYYY-MM-DDTHH:MM:SS.sssZ
+        end : str
+            The end datatime. format: YYYY-MM-DDTHH:MM:SSZ or YYYY-MM-DDTHH:MM:SS.sssZ.
+            If None the current time is used.
+        limit : int
+            The number of rows per request.
+        window : int
+            The length of a window in milliseconds. By default a window is limit rows of the frequency
+            of the symbol. A window holding more rows is walked page by page.
+        max_workers : int
+            The number of threads fetching windows.
+
+        Returns
+        -------
+            A list of the rows of the period, oldest first, without duplicates
+
+        """
+        symbol, frequency = VinterValidation.validate_symbol_frequency(symbol)
+
+        windows = VinterTime.plan_windows(
+            frequency=frequency, start=start, end=end, limit=limit, window_ms=window
+        )
+
+        def fetch_window(window: tuple) -> list:
+            window_start, window_end = window
+            return [
+                row
+                for row in self.iter_data_by_time(
+                    symbol=symbol,
+                    start=VinterTime.format_timestamp(window_start),
+                    end=VinterTime.format_timestamp(window_end),
+                    limit=limit,
+                )
+                # Windows are half-open so boundary rows belong to one window only
+                if window_start <= VinterTime.row_timestamp(row) < window_end
+            ]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # map returns the windows in order whatever order they finish in
+            chunks = list(executor.map(fetch_window, windows))
+
+        data = merge_rows(chunks)
+
+        if len(data) == 0:
+            raise ValueError(
+                f"No data was found for the symbol: {symbol} between {start} and {end}."
+            )
+
+        return data
+
+    def iter_data_by_time(
+        self,
+        symbol: str,
+        start: str,
+        end: str = None,
+        limit: int = 1000,
+        stream: bool = False,
+    ) -> Iterator[dict]:
+        """This function yields the data of the symbol for the period page by page, oldest first
+
+        The timestamp of the last row of a page is the start of the next page, so a period of any
+        length is walked with at most limit rows in memory.
+
+        Parameters
+        ----------
+        symbol : str
+            The symbol of the asset you want to get data for.
+        start : str
+            The start datatime . format: YYYY-MM-DDTHH:MM:SSZ or YYYY-MM-DDTHH:MM:SS.sssZ
+        end : str
+            The end datatime. format: YYYY-MM-DDTHH:MM:SSZ or YYYY-MM-DDTHH:MM:SS.sssZ
+        limit : int
+            The number of rows per request.
+        stream : bool
+            If True the rows of each page are decoded while the page is downloaded, so only one row
+            is held in memory at a time instead of a whole page.
+
+        Yields
+        ------
+            The rows of the period as they arrive
+
+        """
+        cursor = start
+        last_timestamp = None
+        end_timestamp = VinterTime.to_timestamp_ms(end) if end is not None else None
+
+        while True:
+            if stream:
+                page = self._stream_data_page(
+                    symbol=symbol, start=cursor, end=end, limit=limit
+                )
+            else:
+                page = self._get_data_page(
+                    symbol=symbol, start=cursor, end=end, limit=limit
+                )
+
+            page_rows = 0
+            new_rows = 0
+            for row in page:
+                page_rows += 1
+                timestamp = VinterTime.row_timestamp(row)
+
+                # The cursor row is returned again if the API treats start as inclusive
+                if last_timestamp is not None and timestamp <= last_timestamp:
+                    continue
+
+                last_timestamp = timestamp
+                new_rows += 1
+                yield row
+
+            if page_rows < limit or new_rows == 0:
+                return
+
+            # A full page that reaches the end leaves nothing to request
+            if end_timestamp is not None and last_timestamp >= end_timestamp:
+                return
+
+            cursor = VinterTime.format_timestamp(last_timestamp)
+
+    def sync(
+        self, symbol: str, start: str, end: str = None, as_series: bool = False
+    ) -> Union[list, TimeSeries]:
+        """This function fetches the parts of the period missing from the history store and returns
+        the rows of the period from the store
+
+        Only the gaps between the intervals already synced are requested, so syncing the same period
+        again reads it locally and a nightly sync only transfers the new rows. The rows of the last
+        interval of the frequency before now may not be published yet, so a gap reaching into it is
+        only marked as synced up to its last row.
+
+        Parameters
+        ----------
+        symbol : str
+            The symbol of the asset you want to get data for.
+        start : str
+            The start datatime . format: YYYY-MM-DDTHH:MM:SSZ or YYYY-MM-DDTHH:MM:SS.sssZ
+        end : str
+            The end datatime, excluded. format: YYYY-MM-DDTHH:MM:SSZ or YYYY-MM-DDTHH:MM:SS.sssZ
+            If None the period ends now.
+        as_series : bool
+            If True the rows are returned as a columnar TimeSeries instead of a list of dictionaries.
+
+        Returns
+        -------
+            A list of the rows of the period, oldest first, or a TimeSeries if as_series is True
+
+        """
+        if self.history_store is None:
+            raise ValueError("A history_store must be set to use this function.")
+
+        symbol, frequency = VinterValidation.validate_symbol_frequency(symbol)
+
+        now_ms = int(time.time() * 1000)
+        start_ms = VinterTime.to_timestamp_ms(start)
+        end_ms = VinterTime.to_timestamp_ms(end) if end is not None else now_ms
+        settled_ms = now_ms - FREQUENCY_INTERVAL_MS[frequency]
+
+        for gap_start, gap_end in self.history_store.missing(symbol, start_ms, end_ms):
+            rows = [
+                row
+                for row in self.iter_data_by_time(
+                    symbol=symbol,
+                    start=VinterTime.format_timestamp(gap_start),
+                    end=VinterTime.format_timestamp(gap_end),
+                )
+                if gap_start <= VinterTime.row_timestamp(row) < gap_end
+            ]
+
+            if gap_end <= settled_ms:
+                covered_end = gap_end
+            elif rows:
+                covered_end = VinterTime.row_timestamp(rows[-1]) + 1
+            else:
+                covered_end = gap_start
+
+            self.history_store.add(symbol, rows, gap_start, covered_end)
+
+        data = self.history_store.read(symbol, start_ms, end_ms)
+
+        if as_series:
+            return TimeSeries.from_rows(data)
+
         return data
 
     def save_data_to_file(
-        self, data: dict, filename: str, file_type: str = "csv", seprator: str = ","
+        self,
+        data: Union[dict, Iterable[dict]],
+        filename: str,
+        file_type: str = "csv",
+        seprator: str = ",",
     ) -> None:  # pragma: no cover
-        """This function takes in a dictionary of data and a filename and saves the data to a csv file
+        """This function takes in data and a filename and saves the data to a csv, json or ndjson file
+
+        csv and ndjson files are appended to and are written row by row, so a generator like the one
+        of iter_data_by_time is exported in constant memory. An ndjson file is compressed with gzip if
+        its name ends with .gz and with zstd if it ends with .zst.
 
         Parameters
         ----------
-        data : dict
-            A dictionary of data to save to a csv file.
+        data : dict | Iterable[dict]
+            The rows to save, e.g. a list, a generator or a TimeSeries, or a dictionary.
         filename : str
             The name of the file to save the data to.
         file_type : str
             The type of file to save the data to. This can be one of the following:
-            ["csv", "json"]
+            ["csv", "json", "ndjson"]
         seprator : str
             The seprator to use when saving the data to the csv file.
 
         """
         file_type = file_type.lower()
-        if file_type not in ["csv", "json"]:
-            raise ValueError("The file type must be either csv or json")
+        if file_type not in ["csv", "json", "ndjson"]:
+            raise ValueError("The file type must be either csv, json or ndjson")
 
         if file_type == "json":
-            with open(filename, "w") as f:
-                json.dump(data, f, indent=4)
-            return
-
+            write_json(data, filename)
         elif file_type == "csv":
-            with open(filename, "a") as f:
-                csv.DictWriter(
-                    f, data[0].keys(), delimiter=seprator, lineterminator="\n"
-                ).writeheader()  # write the header
-
-                for row in data:
-                    # Make Sure dict and list are converted to JSON string
-                    for key, value in row.items():
-                        if isinstance(value, (dict, list)):
-                            row[key] = json.dumps(value)
-
-                    csv.DictWriter(
-                        f, row.keys(), delimiter=seprator, lineterminator="\n"
-                    ).writerow(row)
+            write_csv(data, filename, seprator=seprator)
+        elif file_type == "ndjson":
+            write_ndjson(data, filename, append=True)
@@ -1,10 +1,19 @@
 import websocket
+from . import codec
 from .utils import VinterUrl
 
 
 class VinterAPIWS:
     def __init__(
-        self, symbol, token, asset_type, on_message, on_error, on_close, on_open
+        self,
+        symbol,
+        token,
+        asset_type,
+        on_message,
+        on_error,
+        on_close,
+        on_open,
+        decode_messages=False,
     ):
         """The function takes in a symbol, token, asset type, and four callback functions. It then creates
         a websocket connection to the url for the symbol and asset type.
@@ -25,6 +34,9 @@ class VinterAPIWS:
             A function that will be called when the websocket is closed.
         on_open
             This is a callback function that will be called when the connection is opened.
+        decode_messages
+            If True on_message receives the decoded JSON message, decoded with the JSON backend of
+            the codec module, instead of the raw string.
 
         """
         self.ws = None
@@ -36,6 +48,7 @@ class VinterAPIWS:
         self.on_error = on_error
         self.on_close = on_close
         self.on_open = on_open
+        self.decode_messages = decode_messages
 
     def get_ws_url(self):
         """It takes the asset type and symbol and returns the websocket url
@@ -51,13 +64,19 @@ class VinterAPIWS:
         """The function opens a websocket connection to the url specified in the constructor"""
         self.ws = websocket.WebSocketApp(
             self.url,
-            on_message=self.on_message,
+            on_message=self._handle_message
+            if self.decode_messages
+            else self.on_message,
             on_error=self.on_error,
             on_close=self.on_close,
             on_open=self.on_open,
         )
         self.ws.run_forever()
 
+    def _handle_message(self, ws, message):
+        """The function decodes the message and passes it to the on_message callback"""
+        self.on_message(ws, codec.loads(message))
+
     def close(self):
         """The function closes the websocket connection"""
         self.ws.close()
@@ -0,0 +1,163 @@
+import asyncio
+from typing import Any
+from . import codec
+from .utils import VinterUrl
+
+try:
+    import websockets
+except ImportError:  # pragma: no cover
+    websockets = None
+
+# Put in the buffer once no more message will be received
+_CLOSED = object()
+
+
+class VinterAPIWSAsync:
+    def __init__(
+        self,
+        symbol: str,
+        token: str,
+        asset_type: str,
+        decode_messages: bool = False,
+        buffer_size: int = 256,
+        drop_oldest: bool = False,
+    ):
+        """The function takes in a symbol, token and asset type and creates an asyncio websocket client
+        for the symbol, read with async for.
+
+        It runs in the event loop of the caller, next to VinterAPIAsync, so hundreds of subscriptions
+        share one thread. A task receives the messages into a buffer until the connection closes.
+        It needs the websockets package (pip install vinterunofficial[websockets]).
+
+        Parameters
+        ----------
+        symbol : str
+            The symbol you want to subscribe to.
+        token : str
+            Your API token.
+        asset_type : str
+            The asset type of the symbol.
+        decode_messages : bool
+            If True the messages are decoded with the JSON backend of the codec module instead of
+            being returned as raw strings.
+        buffer_size : int
+            The number of received messages kept until they are read.
+        drop_oldest : bool
+            What to do when the buffer is full. If False the client stops receiving until a message is
+            read, so the server sees the backpressure. If True the oldest message is dropped, which
+            suits consumers that only need the latest values.
+        """
+        if buffer_size < 1:
+            raise ValueError("The buffer size must be at least 1")
+
+        self.ws = None
+        self.symbol = symbol
+        self.token = token
+        self.asset_type = asset_type
+        self.url = self.get_ws_url() + "/?token=" + self.token
+        self.decode_messages = decode_messages
+        self.buffer_size = buffer_size
+        self.drop_oldest = drop_oldest
+        self.dropped = 0
+        self._buffer = None
+        self._reader = None
+        self._error = None
+
+    def get_ws_url(self) -> str:
+        """It takes the asset type and symbol and returns the websocket url
+
+        Returns
+        -------
+            The websocket url for the asset type and symbol.
+
+        """
+        return VinterUrl.websocket_url(self.asset_type, self.symbol)
+
+    async def open(self) -> None:
+        """The function opens the websocket connection and starts receiving messages into the buffer"""
+        if websockets is None:
+            raise ImportError(
+                "VinterAPIWSAsync needs the websockets package. Install it with pip install vinterunofficial[websockets]"
+            )
+
+        if self.ws is not None:
+            raise RuntimeError("The websocket is already open")
+
+        self.ws = await websockets.connect(self.url)
+        self._buffer = asyncio.Queue(self.buffer_size)
+        self._error = None
+        self._reader = asyncio.ensure_future(self._receive())
+
+    async def _receive(self) -> None:
+        """The function moves the messages of the connection to the buffer until it closes"""
+        try:
+            async for message in self.ws:
+                if self.decode_messages:
+                    message = codec.loads(message)
+
+                if self.drop_oldest and self._buffer.full():
+                    self._buffer.get_nowait()
+                    self.dropped += 1
+
+                await self._buffer.put(message)
+        except Exception as error:
+            # Raised to the reader once the messages received before it were read
+            self._error = error
+
+        await self._buffer.put(_CLOSED)
+
+    async def close(self) -> None:
+        """The function closes the websocket connection and ends any iteration in progress
+
+        The messages still in the buffer are dropped.
+        """
+        if self._reader is not None:
+            self._reader.cancel()
+            # wait does not raise the cancellation of the reader but lets the caller be cancelled
+            await asyncio.wait([self._reader])
+
+        if self.ws is not None:
+            await self.ws.close()
+
+        if self._buffer is not None:
+            while not self._buffer.empty():
+                self._buffer.get_nowait()
+            self._buffer.put_nowait(_CLOSED)
+
+        self.ws = None
+        self._reader = None
+
+    def __aiter__(self) -> "VinterAPIWSAsync":
+        return self
+
+    async def __anext__(self) -> Any:
+        """The function returns the next message, waiting for one if the buffer is empty
+
+        Returns
+        -------
+            The message, as a string or decoded if decode_messages is True
+
+        """
+        if self._buffer is None:
+            raise RuntimeError(
+                "The websocket is not open, call open() or use async with first"
+            )
+
+        message = await self._buffer.get()
+
+        if message is _CLOSED:
+            # Keep the end marker for the next calls, the buffer has room as one item was just taken
+            self._buffer.put_nowait(_CLOSED)
+
+            if self._error is not None:
+                raise self._error
+            raise StopAsyncIteration
+
+        return message
+
+    async def __aenter__(self) -> "VinterAPIWSAsync":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()